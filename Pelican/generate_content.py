@@ -1,47 +1,46 @@
-"""Build the timeline HTML page."""
-
-import json
-import os
-import urllib.parse
-from datetime import datetime
-
-from contact_frequency_cache import ContactFrequencyCache
-
-
-
-from generate_html_timeline_item import generate_html_timeline_item
-from generate_html_dangling_audio import generate_html_dangling_audio
-from generate_html_dangling_transcripts import generate_html_dangling_transcripts
-from transcript_frequency import calculate_noun_frequency
+"""Build the timeline HTML page.
 
+Each matched recording is rendered as a timeline fragment through a
+:class:`~Pelican.incremental_build.FragmentCache`, so a rebuild only reads,
+tags and renders transcripts that are new or changed since the last run.
+Those transcripts are tagged together across a process pool, with noun
+counts cached by content hash, and the page is streamed to disk with
+:func:`~Pelican.html_writer.open_page`.
 
-# Load matches and dangling files
-with open("matches.json", "r") as f:
-    matches = json.load(f)
-
-cache = ContactFrequencyCache()
-
-cache = ContactFrequencyCache()
+Run from the repository root::
 
+    python -m Pelican.generate_content
+"""
 
-with open("dangling_audio.json", "r") as f:
-    dangling_audio = json.load(f)
+from __future__ import annotations
 
+import json
+import os
+from datetime import datetime
+from typing import List, Optional, Sequence
 
-print("Loaded dangling audio:", dangling_audio)  # Debug print
+from contact_frequency_cache import ContactFrequencyCache
 
-with open("dangling_transcripts.json", "r") as f:
-    dangling_transcripts = json.load(f)
+from .generate_html_dangling_audio import iter_html_dangling_audio
+from .generate_html_dangling_transcripts import iter_html_dangling_transcripts
+from .generate_html_timeline_item import generate_html_timeline_item
+from .html_writer import open_page
+from .incremental_build import FragmentCache
+from .transcript_frequency import (
+    NounFrequencyCache,
+    calculate_noun_frequencies,
+    calculate_noun_frequency,
+)
 
-with open("dangling_transcripts.json", "r") as f:
-    dangling_transcripts = json.load(f)
+SYMLINK_DIR = "output/symlinks"
+FRAGMENT_DIR = "output/.fragments/timeline"
+NOUN_CACHE_NAME = "noun_frequency.sqlite"
+OUTPUT_PATH = "content/timeline.html"
 
-# Create symbolic links directory if not exists
-symlink_dir = "output/symlinks"
-os.makedirs(symlink_dir, exist_ok=True)
+# Bump when the timeline item markup changes so cached fragments are rebuilt.
+FRAGMENT_VERSION = 1
 
-# Generate HTML content
-html_content = """
+PAGE_HEADER = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -60,79 +59,161 @@ html_content = """
             <div class="timeline-container">
 """
 
-for match in matches:
-    audio_file = match[0]
-    transcript_file = match[1]
-    platform = match[2]
-    contact = match[3]
-
-    timestamp = datetime.fromtimestamp(os.path.getmtime(audio_file))
-    cache.record(contact, timestamp)
-
-    # Create symbolic links
-    audio_symlink = os.path.join(symlink_dir, os.path.basename(audio_file))
-    transcript_symlink = os.path.join(symlink_dir, os.path.basename(transcript_file))
-
-    if not os.path.exists(audio_symlink):
-        os.symlink(audio_file, audio_symlink)
-    if not os.path.exists(transcript_symlink):
-        os.symlink(transcript_file, transcript_symlink)
-
-    # URL-encode the paths for HTML
-    encoded_audio_symlink = urllib.parse.quote(os.path.basename(audio_symlink))
-    encoded_transcript_symlink = urllib.parse.quote(
-        os.path.basename(transcript_symlink)
-    )
-
-
-    # Determine a frequency metric using noun detection for the transcript
-    frequency = calculate_noun_frequency(transcript_file)
-
-    html_content += generate_html_timeline_item(
-        os.path.basename(audio_symlink),
-        os.path.basename(transcript_symlink),
-        transcript_symlink,
-        platform,
-        contact,
-        frequency,
-    )
-
-daily_counts = cache.daily_counts()
-frequency_ranking = [
-    {"contact": c, "count": sum(days.values())} for c, days in daily_counts.items()
-]
-frequency_ranking.sort(key=lambda x: x["count"], reverse=True)
-
-frequency_ranking = [
-    {"contact": contact, "count": count} for contact, count in cache.frequency_ranking()
-]
-
-html_content += """
+DANGLING_HEADER = """
             </div>
         </section>
         <section id="dangling-files">
             <h2>Dangling Files</h2>
 """
 
-html_content += generate_html_dangling_audio(dangling_audio, symlink_dir)
-html_content += generate_html_dangling_transcripts(dangling_transcripts, symlink_dir)
 
-html_content += (
-    """
+def _page_footer(frequency_ranking: List[dict]) -> str:
+    return (
+        """
         </section>
     </main>
     <script>window.contactFrequencies = """
-    + json.dumps(frequency_ranking)
-    + """;</script>
+        + json.dumps(frequency_ranking)
+        + """;</script>
     <script src="scripts.js"></script>
     <script src="timeline3d.js"></script>
 </body>
 </html>
 """
-)
+    )
+
+
+def _ensure_symlink(source: str, link_name: str) -> None:
+    if not os.path.lexists(link_name):
+        os.symlink(source, link_name)
+
+
+def build_timeline_page(
+    matches: Sequence[Sequence],
+    dangling_audio: Sequence[str],
+    dangling_transcripts: Sequence[str],
+    output_path: str = OUTPUT_PATH,
+    symlink_dir: str = SYMLINK_DIR,
+    fragment_dir: str = FRAGMENT_DIR,
+    noun_cache_path: Optional[str] = None,
+    workers: Optional[int] = None,
+) -> FragmentCache:
+    """Write the timeline page, reusing cached fragments for unchanged matches.
+
+    Parameters
+    ----------
+    matches:
+        ``[audio_file, transcript_file, platform, contact]`` entries.
+    dangling_audio, dangling_transcripts:
+        Unmatched audio and transcript paths.
+    output_path:
+        Location of the generated page.
+    symlink_dir:
+        Directory receiving symlinks to the recordings and transcripts.
+    fragment_dir:
+        Directory of the fragment cache and its manifest.
+    noun_cache_path:
+        SQLite file caching noun counts per transcript content. Defaults to
+        a file in ``fragment_dir``.
+    workers:
+        Processes used to tag the transcripts of stale fragments.
+
+    Returns
+    -------
+    FragmentCache
+        The saved fragment cache; ``rendered`` and ``reused`` report how much
+        of the page was rebuilt.
+    """
+    os.makedirs(symlink_dir, exist_ok=True)
+    cache = ContactFrequencyCache(":memory:")
+    interactions = []
+    items = []
+
+    with FragmentCache(fragment_dir) as fragments:
+        stale = []
+        for audio_file, transcript_file, platform, contact in matches:
+            timestamp = datetime.fromtimestamp(os.path.getmtime(audio_file))
+            interactions.append((contact, timestamp))
+
+            audio_name = os.path.basename(audio_file)
+            transcript_name = os.path.basename(transcript_file)
+            transcript_symlink = os.path.join(symlink_dir, transcript_name)
+            _ensure_symlink(audio_file, os.path.join(symlink_dir, audio_name))
+            _ensure_symlink(transcript_file, transcript_symlink)
+
+            key = f"match:{audio_file}:{transcript_file}"
+            params = [
+                FRAGMENT_VERSION,
+                audio_name,
+                transcript_name,
+                transcript_symlink,
+                platform,
+                contact,
+            ]
+            if fragments.needs_render(key, [transcript_file], params):
+                stale.append(transcript_file)
+            items.append((key, transcript_file, params))
+
+        # Tag the transcripts of all stale fragments in one parallel batch
+        noun_cache = NounFrequencyCache(
+            noun_cache_path or os.path.join(fragment_dir, NOUN_CACHE_NAME)
+        )
+        try:
+            frequencies = calculate_noun_frequencies(stale, noun_cache, workers)
+
+            def render(transcript_file: str, params: list) -> str:
+                if transcript_file not in frequencies:
+                    frequencies[transcript_file] = calculate_noun_frequency(
+                        transcript_file, noun_cache
+                    )
+                return generate_html_timeline_item(
+                    *params[1:], frequencies[transcript_file]
+                )
+
+            with open_page(output_path, PAGE_HEADER) as page:
+                for key, transcript_file, params in items:
+                    page.write(
+                        fragments.fragment(
+                            key,
+                            lambda: render(transcript_file, params),
+                            inputs=[transcript_file],
+                            params=params,
+                        )
+                    )
+
+                page.write(DANGLING_HEADER)
+                page.writelines(iter_html_dangling_audio(dangling_audio, symlink_dir))
+                page.writelines(
+                    iter_html_dangling_transcripts(dangling_transcripts, symlink_dir)
+                )
+
+                cache.record_many(interactions)
+                frequency_ranking = [
+                    {"contact": contact, "count": count}
+                    for contact, count in cache.frequency_ranking()
+                ]
+                cache.close()
+                page.write(_page_footer(frequency_ranking))
+        finally:
+            noun_cache.close()
+    return fragments
+
+
+def main() -> None:
+    # Load matches and dangling files
+    with open("matches.json", "r") as f:
+        matches = json.load(f)
+    with open("dangling_audio.json", "r") as f:
+        dangling_audio = json.load(f)
+    with open("dangling_transcripts.json", "r") as f:
+        dangling_transcripts = json.load(f)
+
+    fragments = build_timeline_page(matches, dangling_audio, dangling_transcripts)
+    print(
+        f"HTML content generated successfully "
+        f"({fragments.rendered} items rendered, {fragments.reused} reused)."
+    )
 
-# Write the HTML content to a file
-with open("content/timeline.html", "w") as f:
-    f.write(html_content)
 
-print("HTML content generated successfully.")
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,11 @@ import os
 import json
 from generate_html_header import generate_html_header
 from generate_html_footer import generate_html_footer
-from generate_html_matches import generate_html_matches
-from generate_html_dangling_audio import generate_html_dangling_audio
-from generate_html_dangling_transcripts import generate_html_dangling_transcripts
+from generate_html_matches import iter_html_matches
+from html_writer import open_page
+from incremental_build import FragmentCache
+from generate_html_dangling_audio import iter_html_dangling_audio
+from generate_html_dangling_transcripts import iter_html_dangling_transcripts
 from generate_symlinks import create_symlinks
 from dir_traversal import perform_traversal, load_recordings_folders, save_traversal_results
 from match_files import match_files
@@ -45,14 +47,15 @@ print(f"Dangling transcripts count: {len(dangling_transcripts)}")  # Debug print
 # Create symlinks
 create_symlinks(matches, dangling_audio, dangling_transcripts, symlink_dir)
 
-# Generate HTML content
-html_content = generate_html_header()
+# Stream the page: header, timeline items reusing those whose transcripts
+# are unchanged, dangling file lists and footer
+with FragmentCache("output/.fragments/generate_html") as fragments, open_page(
+    "content/timeline.html", generate_html_header(), generate_html_footer()
+) as page:
+    page.writelines(iter_html_matches(matches, symlink_dir, fragments))
 
-# Generate HTML for matches
-html_content += generate_html_matches(matches, symlink_dir)
-
-# Close the timeline section and open dangling section
-html_content += """
+    # Close the timeline section and open dangling section
+    page.write("""
             </div>
         </section>
         <section id="dangling-files">
@@ -60,28 +63,24 @@ html_content += """
             <div>
                 <h3>Audio without Transcripts</h3>
                 <ul>
-"""
-html_content += generate_html_dangling_audio(dangling_audio, symlink_dir)
+""")
+    page.writelines(iter_html_dangling_audio(dangling_audio, symlink_dir))
 
-html_content += """
+    page.write("""
                 </ul>
             </div>
             <div>
                 <h3>Transcripts without Audio</h3>
                 <ul>
-"""
-html_content += generate_html_dangling_transcripts(dangling_transcripts, symlink_dir)
+""")
+    page.writelines(iter_html_dangling_transcripts(dangling_transcripts, symlink_dir))
 
-html_content += """
+    page.write("""
                 </ul>
             </div>
         </section>
-"""
-html_content += generate_html_footer()
-
-# Write the HTML content to a file
-with open("content/timeline.html", "w") as f:
-    f.write(html_content)
+""")
+print(f"Timeline items rendered: {fragments.rendered}, reused: {fragments.reused}")
 
 print("HTML content generated successfully.")
 
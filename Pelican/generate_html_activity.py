@@ -4,6 +4,7 @@ from datetime import datetime
 from pathlib import Path
 from generate_html_header import generate_html_header
 from generate_html_footer import generate_html_footer
+from html_writer import open_page
 from sort_audio_transcript import extract_date
 
 
@@ -104,7 +105,7 @@ const DATA = {json_data};
 const select = document.getElementById('scale');
 function render() {{
   const scale = select.value;
-  const rows = Object.keys(DATA[scale]).sort().map(k => `<tr><td>${k}</td><td>${DATA[scale][k]}</td></tr>`).join('');
+  const rows = Object.keys(DATA[scale]).sort().map(k => `<tr><td>${{k}}</td><td>${{DATA[scale][k]}}</td></tr>`).join('');
   document.getElementById('activity-body').innerHTML = rows;
 }}
 select.addEventListener('change', render);
@@ -125,12 +126,8 @@ def main(facebook_dir, transcripts_dir, output_file):
         'month': month_counts,
         'year': year_counts,
     }
-    html_content = generate_html_header()
-    html_content += generate_table_script(data)
-    html_content += generate_html_footer()
-    output_path = Path(output_file)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(html_content, encoding='utf-8')
+    with open_page(output_file, generate_html_header(), generate_html_footer()) as page:
+        page.write(generate_table_script(data))
 
 
 if __name__ == '__main__':
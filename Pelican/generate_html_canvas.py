@@ -11,6 +11,7 @@ MEDIUM_Z_LAYERS = {
 
 from generate_html_header import generate_html_header
 from generate_html_footer import generate_html_footer
+from html_writer import iter_json_array, open_page
 from sort_audio_transcript import extract_date
 
 
@@ -104,10 +105,7 @@ def build_points(items):
     return points
 
 
-def generate_canvas_script(points):
-    """Generate the HTML/JS snippet for the 3D scene."""
-    data_json = json.dumps(points)
-    return f"""
+_CANVAS_HEAD = """
             </div>
         </section>
         <section id=\"cloud\">
@@ -116,48 +114,62 @@ def generate_canvas_script(points):
         <script src=\"https://cdnjs.cloudflare.com/ajax/libs/three.js/r134/three.min.js\"></script>
         <script src=\"https://cdnjs.cloudflare.com/ajax/libs/three.js/r134/examples/js/controls/OrbitControls.js\"></script>
         <script>
-        const DATA = {data_json};
+        const DATA = """
+
+_CANVAS_TAIL = """;
         const scene = new THREE.Scene();
         const camera = new THREE.PerspectiveCamera(75, window.innerWidth / window.innerHeight, 0.1, 1000);
         const renderer = new THREE.WebGLRenderer();
         renderer.setSize(window.innerWidth, window.innerHeight);
         document.getElementById('scene-container').appendChild(renderer.domElement);
         const controls = new THREE.OrbitControls(camera, renderer.domElement);
-        DATA.forEach(d => {{
+        DATA.forEach(d => {
             const geo = new THREE.SphereGeometry(d.size, 16, 16);
-            const mat = new THREE.MeshBasicMaterial({{color: d.color}});
+            const mat = new THREE.MeshBasicMaterial({color: d.color});
             const mesh = new THREE.Mesh(geo, mat);
             mesh.position.set(d.x, d.y, d.z);
             scene.add(mesh);
-        }});
+        });
         camera.position.z = 30;
 
         // Scroll wheel traverses layers along the Z axis
-        window.addEventListener('wheel', (event) => {{
+        window.addEventListener('wheel', (event) => {
             camera.position.z += event.deltaY * 0.01;
-        }});
+        });
 
-        function pollGamepad() {{
+        function pollGamepad() {
             const [gp] = navigator.getGamepads();
-            if (gp) {{
+            if (gp) {
                 const tiltX = gp.axes[2] || 0; // right stick horizontal
                 const tiltY = gp.axes[3] || 0; // right stick vertical
                 camera.rotation.y -= tiltX * 0.05;
                 camera.rotation.x -= tiltY * 0.05;
-            }}
-        }}
+            }
+        }
 
-        function animate() {{
+        function animate() {
             requestAnimationFrame(animate);
             pollGamepad();
             controls.update();
             renderer.render(scene, camera);
-        }}
+        }
         animate();
         </script>
     """
 
 
+def iter_canvas_script(points):
+    """Yield the HTML/JS snippet for the 3D scene, one point at a time."""
+    yield _CANVAS_HEAD
+    yield from iter_json_array(points)
+    yield _CANVAS_TAIL
+
+
+def generate_canvas_script(points):
+    """Generate the HTML/JS snippet for the 3D scene."""
+    return "".join(iter_canvas_script(points))
+
+
 def main(facebook_dir, transcripts_dir, output_file):
     """Entry point for generating the 3D bubble visualisation."""
     items = []
@@ -165,12 +177,8 @@ def main(facebook_dir, transcripts_dir, output_file):
     load_facebook_messages(Path(facebook_dir) / "messages", items)
     load_facebook_posts(Path(facebook_dir) / "posts/your_posts.json", items)
     points = build_points(items)
-    html_content = generate_html_header()
-    html_content += generate_canvas_script(points)
-    html_content += generate_html_footer()
-    output_path = Path(output_file)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text(html_content, encoding="utf-8")
+    with open_page(output_file, generate_html_header(), generate_html_footer()) as page:
+        page.writelines(iter_canvas_script(points))
 
 
 if __name__ == "__main__":
@@ -6,9 +6,11 @@ from match_audio_transcript import load_recordings_folders, get_all_files, extra
 from process_audio_files import process_audio_files
 from process_transcript_files import process_transcript_files
 from match_files import match_files
-from generate_html_matches import generate_html_matches
-from generate_html_dangling_audio import generate_html_dangling_audio
-from generate_html_dangling_transcripts import generate_html_dangling_transcripts
+from generate_html_matches import iter_html_matches
+from html_writer import open_page
+from incremental_build import FragmentCache
+from generate_html_dangling_audio import iter_html_dangling_audio
+from generate_html_dangling_transcripts import iter_html_dangling_transcripts
 
 results_file = 'traversal_results.json'
 recordings_folders_file = 'folders_file.json'
@@ -59,14 +61,15 @@ matches, dangling_audio, dangling_transcripts = match_files(audio_dict, transcri
 # Sort matches using extract_date
 matches.sort(key=lambda x: extract_date(x[0]))
 
-# Generate HTML content
-html_content = generate_html_header()
+# Stream the page: header, timeline items reusing those whose transcripts
+# are unchanged, dangling file lists and footer
+with FragmentCache("output/.fragments/generate_html_content") as fragments, open_page(
+    "content/timeline.html", generate_html_header(), generate_html_footer()
+) as page:
+    page.writelines(iter_html_matches(matches, symlink_dir, fragments))
 
-# Generate HTML for matches
-html_content += generate_html_matches(matches, symlink_dir)
-
-# Close the timeline section and open dangling section
-html_content += """
+    # Close the timeline section and open dangling section
+    page.write("""
             </div>
         </section>
         <section id="dangling-files">
@@ -74,28 +77,24 @@ html_content += """
             <div>
                 <h3>Audio without Transcripts</h3>
                 <ul>
-"""
-html_content += generate_html_dangling_audio(dangling_audio, symlink_dir)
+""")
+    page.writelines(iter_html_dangling_audio(dangling_audio, symlink_dir))
 
-html_content += """
+    page.write("""
                 </ul>
             </div>
             <div>
                 <h3>Transcripts without Audio</h3>
                 <ul>
-"""
-html_content += generate_html_dangling_transcripts(dangling_transcripts, symlink_dir)
+""")
+    page.writelines(iter_html_dangling_transcripts(dangling_transcripts, symlink_dir))
 
-html_content += """
+    page.write("""
                 </ul>
             </div>
         </section>
-"""
-html_content += generate_html_footer()
-
-# Write the HTML content to a file
-with open("content/timeline.html", "w") as f:
-    f.write(html_content)
+""")
+print(f"Timeline items rendered: {fragments.rendered}, reused: {fragments.reused}")
 
 print("HTML content generated successfully.")
 
@@ -5,6 +5,7 @@ from datetime import datetime
 from pathlib import Path
 from generate_html_header import generate_html_header
 from generate_html_footer import generate_html_footer
+from html_writer import open_page
 from sort_audio_transcript import extract_date
 
 AUDIO_EXTS = {'.wav', '.flac', '.mp3', '.ogg'}
@@ -70,20 +71,22 @@ def load_posts(posts_json, by_day):
         by_day[day]['posts'].append(html.escape(text) if text else '[post]')
 
 
-def generate_table(by_day):
-    """Return an HTML table for the aggregated day data."""
-    lines = [
-        '<table>',
-        '<thead><tr><th>Date</th><th>Recordings</th><th>Messages</th><th>Posts</th></tr></thead>',
-        '<tbody>'
-    ]
+def iter_table(by_day):
+    """Yield the lines of the HTML table for the aggregated day data."""
+    yield '<table>'
+    yield '\n<thead><tr><th>Date</th><th>Recordings</th><th>Messages</th><th>Posts</th></tr></thead>'
+    yield '\n<tbody>'
     for day in sorted(by_day):
         rec_html = '<br>'.join(by_day[day]['recordings'])
         msg_html = '<br>'.join(by_day[day]['messages'])
         post_html = '<br>'.join(by_day[day]['posts'])
-        lines.append(f'<tr><td>{day}</td><td>{rec_html}</td><td>{msg_html}</td><td>{post_html}</td></tr>')
-    lines.append('</tbody></table>')
-    return '\n'.join(lines)
+        yield f'\n<tr><td>{day}</td><td>{rec_html}</td><td>{msg_html}</td><td>{post_html}</td></tr>'
+    yield '\n</tbody></table>'
+
+
+def generate_table(by_day):
+    """Return an HTML table for the aggregated day data."""
+    return ''.join(iter_table(by_day))
 
 
 def main(facebook_dir, recordings_dir, output_file):
@@ -92,14 +95,8 @@ def main(facebook_dir, recordings_dir, output_file):
     load_messages(Path(facebook_dir) / 'messages', by_day)
     load_posts(Path(facebook_dir) / 'posts/your_posts.json', by_day)
 
-    html_content = generate_html_header()
-    html_content += generate_table(by_day)
-    html_content += generate_html_footer()
-
-    output_path = Path(output_file)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    with open_page(output_file, generate_html_header(), generate_html_footer()) as page:
+        page.writelines(iter_table(by_day))
 
 
 if __name__ == '__main__':
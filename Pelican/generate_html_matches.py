@@ -4,26 +4,54 @@ import html
 from read_file_with_fallback import read_file_with_fallback
 
 
-def generate_html_matches(matches, symlink_dir):
-    html_content = ""
-    for match in matches:
-        audio_file, transcript_file = match
-        audio_symlink = os.path.join(symlink_dir, os.path.basename(audio_file))
+# Bump when the match markup changes so cached fragments are rebuilt.
+FRAGMENT_VERSION = 1
+
+
+def generate_html_matches(matches, symlink_dir, fragments=None):
+    """Return timeline items for ``matches`` as one string.
+
+    See :func:`iter_html_matches`; prefer it when streaming a page.
+    """
+    return "".join(iter_html_matches(matches, symlink_dir, fragments))
+
+
+def iter_html_matches(matches, symlink_dir, fragments=None):
+    """Yield the timeline item for each of ``matches``.
+
+    When a :class:`incremental_build.FragmentCache` is given as ``fragments``,
+    items whose transcript is unchanged are taken from the cache.
+    """
+    for audio_file, transcript_file in matches:
+        if fragments is None:
+            yield _render_match(audio_file, transcript_file, symlink_dir)
+            continue
         transcript_symlink = os.path.join(
             symlink_dir, os.path.basename(transcript_file)
         )
-
-        encoded_audio_symlink = urllib.parse.quote(os.path.basename(audio_symlink))
-        encoded_transcript_symlink = urllib.parse.quote(
-            os.path.basename(transcript_symlink)
+        yield fragments.fragment(
+            f"match:{audio_file}:{transcript_file}",
+            lambda: _render_match(audio_file, transcript_file, symlink_dir),
+            inputs=[transcript_symlink],
+            params=[FRAGMENT_VERSION, audio_file, transcript_file, symlink_dir],
         )
 
-        transcript_content = read_file_with_fallback(transcript_symlink)
-        transcript_content = html.escape(transcript_content)
 
-        print(f"Generating HTML for {audio_file} and {transcript_file}")  # Debug print
+def _render_match(audio_file, transcript_file, symlink_dir):
+    audio_symlink = os.path.join(symlink_dir, os.path.basename(audio_file))
+    transcript_symlink = os.path.join(symlink_dir, os.path.basename(transcript_file))
+
+    encoded_audio_symlink = urllib.parse.quote(os.path.basename(audio_symlink))
+    encoded_transcript_symlink = urllib.parse.quote(
+        os.path.basename(transcript_symlink)
+    )
+
+    transcript_content = read_file_with_fallback(transcript_symlink)
+    transcript_content = html.escape(transcript_content)
+
+    print(f"Generating HTML for {audio_file} and {transcript_file}")  # Debug print
 
-        html_content += f"""
+    return f"""
             <div class="timeline-item" role="listitem">
                 <a href="#" class="label" aria-describedby="timeline-instructions" data-audio="symlinks/{encoded_audio_symlink}" data-transcript="symlinks/{encoded_transcript_symlink}">{os.path.basename(audio_file)}</a>
                 <div class="audio-player" style="display:none;" aria-hidden="true">
@@ -35,4 +63,3 @@ def generate_html_matches(matches, symlink_dir):
                 </div>
             </div>
         """
-    return html_content
@@ -0,0 +1,101 @@
+"""Streaming output for generated HTML pages.
+
+Generators used to build a page with ``html += item`` in a loop, copying the
+whole page for every item. :class:`PageWriter` collects fragments in a small
+buffer and writes them to the output file in chunks of about ``chunk_size``
+characters, so the cost is linear and only one chunk is held in memory.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, TextIO
+
+CHUNK_SIZE = 64 * 1024
+
+
+class PageWriter:
+    """Buffered writer of HTML fragments to a text stream.
+
+    Parameters
+    ----------
+    out:
+        Text stream receiving the page, such as an open file or
+        :class:`io.StringIO`.
+    chunk_size:
+        Number of buffered characters that triggers a write to ``out``.
+    """
+
+    def __init__(self, out: TextIO, chunk_size: int = CHUNK_SIZE):
+        self._out = out
+        self.chunk_size = chunk_size
+        self._buffer: List[str] = []
+        self._buffered = 0
+        self.written = 0
+
+    def write(self, html: str) -> None:
+        """Append ``html`` to the page."""
+        if not html:
+            return
+        self._buffer.append(html)
+        self._buffered += len(html)
+        if self._buffered >= self.chunk_size:
+            self.flush()
+
+    def writelines(self, fragments: Iterable[str]) -> None:
+        """Append each fragment of ``fragments`` to the page."""
+        for html in fragments:
+            self.write(html)
+
+    def flush(self) -> None:
+        """Write the buffered fragments to the stream."""
+        if self._buffer:
+            self._out.write("".join(self._buffer))
+            self.written += self._buffered
+            self._buffer.clear()
+            self._buffered = 0
+
+
+def iter_json_array(items: Iterable[Any]) -> Iterator[str]:
+    """Yield ``json.dumps(list(items))`` in pieces, one item at a time."""
+    separator = "["
+    for item in items:
+        yield separator + json.dumps(item)
+        separator = ", "
+    yield "]" if separator == ", " else "[]"
+
+
+@contextmanager
+def open_page(
+    path: str | os.PathLike,
+    header: str = "",
+    footer: str = "",
+    encoding: str = "utf-8",
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[PageWriter]:
+    """Stream a page to ``path`` between ``header`` and ``footer``.
+
+    The page is written to a temporary file next to ``path`` and moved into
+    place when the ``with`` block completes, so an error part-way through
+    leaves the previous page intact.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    try:
+        with open(tmp, "w", encoding=encoding) as f:
+            page = PageWriter(f, chunk_size)
+            page.write(header)
+            yield page
+            page.write(footer)
+            page.flush()
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+__all__ = ["CHUNK_SIZE", "PageWriter", "iter_json_array", "open_page"]
@@ -0,0 +1,202 @@
+"""Incremental page builds from cached HTML fragments.
+
+A generated page is assembled from fragments, for example one per matched
+recording. Each fragment is rendered once and stored in a cache directory
+next to a ``manifest.json`` entry recording its input files (``mtime``, size
+and SHA-256 of the content) and a digest of its render parameters.
+
+On the next build a fragment is rendered again only when its parameters
+changed or one of its inputs changed content. Inputs whose ``mtime`` and size
+match the manifest are not read at all, so an unchanged tree costs one
+``stat`` per input. Fragments not requested during a build are pruned when
+the manifest is saved, so every page needs a cache directory of its own.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+
+_READ_SIZE = 1 << 20
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_READ_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _params_digest(params: Any) -> str:
+    encoded = json.dumps(params, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _content(inputs: Dict[str, Optional[List]]) -> Dict[str, Optional[str]]:
+    return {path: state and state[2] for path, state in inputs.items()}
+
+
+def _fragment_name(key: str) -> str:
+    return hashlib.sha1(key.encode("utf-8")).hexdigest() + ".html"
+
+
+class FragmentCache:
+    """Cache of rendered HTML fragments keyed by their inputs.
+
+    Parameters
+    ----------
+    cache_dir:
+        Directory holding the manifest and one ``.html`` file per fragment.
+
+    Attributes
+    ----------
+    rendered, reused:
+        Number of fragments rendered and served from the cache since the
+        cache was opened.
+    """
+
+    def __init__(self, cache_dir: str | os.PathLike):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._manifest_path = self.cache_dir / MANIFEST
+        self._fragments: Dict[str, Dict[str, Any]] = self._load()
+        self._used: set[str] = set()
+        self._checked: Dict[str, Tuple] = {}
+        self._dirty = False
+        self.rendered = 0
+        self.reused = 0
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("fragments", {})
+
+    @staticmethod
+    def _input_state(path: str, previous: Optional[List]) -> Optional[List]:
+        """Return ``[mtime_ns, size, sha256]`` for ``path`` or ``None`` if missing.
+
+        The content is only hashed when the ``mtime`` or size differ from
+        ``previous``.
+        """
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if previous and previous[0] == st.st_mtime_ns and previous[1] == st.st_size:
+            return previous
+        return [st.st_mtime_ns, st.st_size, _file_digest(path)]
+
+    def _check(self, key: str, inputs: Tuple[str, ...], digest: str) -> Tuple:
+        entry = self._fragments.get(key)
+        previous = entry["inputs"] if entry else {}
+        state = {path: self._input_state(path, previous.get(path)) for path in inputs}
+        current = (
+            entry is not None
+            and entry["params"] == digest
+            and _content(state) == _content(previous)
+        )
+        return inputs, digest, entry, state, current
+
+    def needs_render(
+        self, key: str, inputs: Iterable[str] = (), params: Any = None
+    ) -> bool:
+        """Return whether :meth:`fragment` would render ``key``.
+
+        Lets callers batch expensive work for stale fragments before
+        rendering them. The inputs are checked once; a following
+        :meth:`fragment` call with the same arguments reuses the result.
+        """
+        inputs = tuple(inputs)
+        checked = self._check(key, inputs, _params_digest(params))
+        self._checked[key] = checked
+        return not checked[4] or not (self.cache_dir / _fragment_name(key)).exists()
+
+    def fragment(
+        self,
+        key: str,
+        render: Callable[[], str],
+        inputs: Iterable[str] = (),
+        params: Any = None,
+    ) -> str:
+        """Return the HTML fragment ``key``, rendering it only when stale.
+
+        Parameters
+        ----------
+        key:
+            Identifier of the fragment, unique within the page.
+        render:
+            Callable producing the fragment HTML.
+        inputs:
+            Files the fragment is generated from.
+        params:
+            JSON-serialisable values the output depends on besides the input
+            files, such as names and a markup version.
+        """
+        self._used.add(key)
+        inputs = tuple(inputs)
+        digest = _params_digest(params)
+        checked = self._checked.pop(key, None)
+        if checked is None or checked[:2] != (inputs, digest):
+            checked = self._check(key, inputs, digest)
+        _, _, entry, state, current = checked
+        path = self.cache_dir / _fragment_name(key)
+
+        if current:
+            try:
+                html = path.read_text(encoding="utf-8")
+            except OSError:
+                pass
+            else:
+                if state != entry["inputs"]:
+                    # Touched but not modified: remember the new stat.
+                    entry["inputs"] = state
+                    self._dirty = True
+                self.reused += 1
+                return html
+
+        html = render()
+        path.write_text(html, encoding="utf-8")
+        self._fragments[key] = {"inputs": state, "params": digest}
+        self._dirty = True
+        self.rendered += 1
+        return html
+
+    def save(self, prune: bool = True) -> None:
+        """Write the manifest, removing fragments unused in this build."""
+        if prune:
+            for key in set(self._fragments) - self._used:
+                del self._fragments[key]
+                try:
+                    (self.cache_dir / _fragment_name(key)).unlink()
+                except FileNotFoundError:
+                    pass
+                self._dirty = True
+        if not self._dirty:
+            return
+        tmp = self._manifest_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": MANIFEST_VERSION, "fragments": self._fragments}, f)
+        os.replace(tmp, self._manifest_path)
+        self._dirty = False
+
+    def __enter__(self) -> "FragmentCache":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is None:
+            self.save()
+
+
+__all__ = ["FragmentCache"]
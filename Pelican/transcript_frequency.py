@@ -5,20 +5,27 @@ transcript based on noun detection. When the ``nltk`` package is available,
 part-of-speech tagging is used to count noun tokens. Otherwise a fallback
 heuristic filters out common stop words and counts remaining tokens.
 
+:func:`calculate_noun_frequencies` handles many transcripts at once: counts
+are cached in SQLite under the SHA-256 of each transcript's content, and only
+new or changed transcripts are tagged, spread over a process pool whose
+workers load the tagger model once each.
+
 The logic remains in-tree as migration/reference material while web-facing
 behavior moves to ``itir-svelte/``.
 """
 
 from __future__ import annotations
 
+import hashlib
 import os
 import re
-from collections import Counter
-from typing import Iterable
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
 
 try:  # pragma: no cover - exercised via functional tests
     import nltk
-    from nltk import pos_tag
+    from nltk.tag.perceptron import PerceptronTagger
     from nltk.tokenize import wordpunct_tokenize
 
     _HAS_NLTK = True
@@ -91,11 +98,33 @@ _STOPWORDS: set[str] = {
 _VERBS: set[str] = {"saw", "met", "see", "meet"}
 
 
+# Counts depend on how nouns are detected, so cached entries are per method.
+METHOD = "nltk-perceptron" if _HAS_NLTK else "stopwords"
+CACHE_PATH = "noun_frequency_cache.sqlite"
+CHUNK_SIZE = 8
+
+_SQL_VARIABLES = 500
+_tagger = None
+
+
+def _load_tagger():
+    """Return this process's part-of-speech tagger, loading it on first use."""
+    global _tagger
+    if _tagger is None:
+        _tagger = PerceptronTagger()
+    return _tagger
+
+
+def _init_worker() -> None:
+    if _HAS_NLTK:
+        _load_tagger()
+
+
 def _extract_nouns(text: str) -> Iterable[str]:
     """Return a list of noun-like tokens from ``text``."""
     if _HAS_NLTK:
         tokens = wordpunct_tokenize(text)
-        tagged = pos_tag(tokens)
+        tagged = _load_tagger().tag(tokens)
         return [word.lower() for word, tag in tagged if tag.startswith("NN")]
     words = re.findall(r"\b[a-zA-Z]+\b", text)
     return [
@@ -105,7 +134,136 @@ def _extract_nouns(text: str) -> Iterable[str]:
     ]
 
 
-def calculate_noun_frequency(path: str) -> int | None:
+def _count_nouns(data: bytes) -> int:
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        text = data.decode("iso-8859-1")
+    return len(_extract_nouns(text))
+
+
+class NounFrequencyCache:
+    """Persistent noun counts keyed by transcript content hash.
+
+    Parameters
+    ----------
+    db_path: str, optional
+        Location of the SQLite database file. Use ``":memory:"`` for an
+        in-memory cache.
+    """
+
+    def __init__(self, db_path: str = CACHE_PATH):
+        self.conn = sqlite3.connect(db_path)
+        self._init_db()
+
+    def _init_db(self) -> None:
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS noun_counts (
+                content_hash TEXT NOT NULL,
+                method TEXT NOT NULL,
+                nouns INTEGER NOT NULL,
+                PRIMARY KEY (content_hash, method)
+            ) WITHOUT ROWID
+            """
+        )
+        self.conn.commit()
+
+    def lookup(self, digests: Iterable[str]) -> Dict[str, int]:
+        """Return the cached counts among ``digests``."""
+        digests = list(digests)
+        found: Dict[str, int] = {}
+        for i in range(0, len(digests), _SQL_VARIABLES):
+            chunk = digests[i : i + _SQL_VARIABLES]
+            rows = self.conn.execute(
+                "SELECT content_hash, nouns FROM noun_counts "
+                f"WHERE method = ? AND content_hash IN ({','.join('?' * len(chunk))})",
+                (METHOD, *chunk),
+            )
+            found.update(rows)
+        return found
+
+    def store(self, counts: Dict[str, int]) -> None:
+        """Cache ``counts`` of content hashes to noun counts."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO noun_counts(content_hash, method, nouns) "
+                "VALUES (?, ?, ?)",
+                ((digest, METHOD, nouns) for digest, nouns in counts.items()),
+            )
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def _tag_many(
+    todo: List[Tuple[str, bytes]], workers: Optional[int], chunksize: int
+) -> Dict[str, int]:
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(todo))
+    if workers <= 1:
+        return {digest: _count_nouns(data) for digest, data in todo}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        counts = pool.map(_count_nouns, (data for _, data in todo), chunksize=chunksize)
+        return {digest: nouns for (digest, _), nouns in zip(todo, counts)}
+
+
+def calculate_noun_frequencies(
+    paths: Iterable[str],
+    cache: Optional[NounFrequencyCache] = None,
+    workers: Optional[int] = None,
+    chunksize: int = CHUNK_SIZE,
+) -> Dict[str, Optional[int]]:
+    """Calculate noun frequency metrics for many transcript files.
+
+    Parameters
+    ----------
+    paths:
+        Transcript file paths.
+    cache:
+        Optional :class:`NounFrequencyCache`. Transcripts whose content hash
+        is cached are not tagged again, and new counts are added to it.
+    workers:
+        Number of worker processes for tagging. Defaults to the CPU count;
+        ``1`` tags in this process.
+    chunksize:
+        Number of transcripts sent to a worker at a time.
+
+    Returns
+    -------
+    dict[str, int | None]
+        Number of noun tokens per path, ``None`` for missing files.
+    """
+    digests: Dict[str, Optional[str]] = {}
+    contents: Dict[str, bytes] = {}
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            digests[path] = None
+            continue
+        digest = hashlib.sha256(data).hexdigest()
+        digests[path] = digest
+        contents.setdefault(digest, data)
+
+    counts = cache.lookup(contents) if cache is not None else {}
+    todo = [(digest, data) for digest, data in contents.items() if digest not in counts]
+    if todo:
+        tagged = _tag_many(todo, workers, chunksize)
+        if cache is not None:
+            cache.store(tagged)
+        counts.update(tagged)
+    return {
+        path: None if digest is None else counts[digest]
+        for path, digest in digests.items()
+    }
+
+
+def calculate_noun_frequency(
+    path: str, cache: Optional[NounFrequencyCache] = None
+) -> int | None:
     """Calculate a noun-based frequency metric for a transcript file.
 
     Parameters
@@ -113,18 +271,19 @@ def calculate_noun_frequency(path: str) -> int | None:
     path:
         Path to a transcript file. If the file does not exist, ``None`` is
         returned.
+    cache:
+        Optional :class:`NounFrequencyCache` consulted before tagging.
 
     Returns
     -------
     int | None
         Number of noun tokens detected, or ``None`` if the file is missing.
     """
-    if not os.path.exists(path):
-        return None
-    with open(path, "r", encoding="utf-8") as f:
-        text = f.read()
-    nouns = _extract_nouns(text)
-    return sum(Counter(nouns).values())
+    return calculate_noun_frequencies([path], cache, workers=1)[path]
 
 
-__all__ = ["calculate_noun_frequency"]
+__all__ = [
+    "NounFrequencyCache",
+    "calculate_noun_frequencies",
+    "calculate_noun_frequency",
+]
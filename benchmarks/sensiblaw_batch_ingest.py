@@ -0,0 +1,137 @@
+"""Compare per-transcript and batched SensibLaw ingestion.
+
+SensibLaw itself is not required: :class:`StandInStorage` mimics the costs
+that matter here (opening the database, checking the schema and an fsync'd
+commit per write) using a local SQLite file.
+
+Usage::
+
+    python benchmarks/sensiblaw_batch_ingest.py --transcripts 500 --batch 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Mapping
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tircorder.sensiblaw_batch import SensibLawBatchSink  # noqa: E402
+
+
+class StandInStorage:
+    """Local SQLite substitute for SensibLaw's ``storage.core.Storage``."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS envelopes (
+                id INTEGER PRIMARY KEY,
+                audio_path TEXT,
+                payload TEXT
+            )
+            """
+        )
+        self.conn.execute("PRAGMA quick_check").fetchall()
+        self._batched = False
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        self._batched = True
+        try:
+            yield
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self._batched = False
+
+    def commit(self) -> None:
+        if not self._batched:
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+
+def standin_import(
+    store: StandInStorage, transcript_payload: Mapping[str, Any], *, audio_path: str
+) -> int:
+    """Stand-in for ``import_whisperx_transcript``; commits unless batched."""
+
+    cur = store.conn.execute(
+        "INSERT INTO envelopes (audio_path, payload) VALUES (?, ?)",
+        (audio_path, json.dumps(transcript_payload)),
+    )
+    store.commit()
+    return cur.lastrowid
+
+
+def _transcript(idx: int) -> Dict[str, Any]:
+    return {
+        "text": f"transcript {idx}",
+        "segments": [
+            {"text": f"segment {n}", "start": n, "end": n + 1} for n in range(20)
+        ],
+    }
+
+
+def run_unbatched(storage_path: Path, count: int) -> float:
+    start = time.perf_counter()
+    for idx in range(count):
+        store = StandInStorage(storage_path)
+        try:
+            standin_import(store, _transcript(idx), audio_path=f"{idx}.wav")
+        finally:
+            store.close()
+    return time.perf_counter() - start
+
+
+def run_batched(storage_path: Path, count: int, batch: int) -> float:
+    start = time.perf_counter()
+    with SensibLawBatchSink(
+        max_items=batch,
+        max_wait_seconds=0.05,
+        storage_factory=StandInStorage,
+        importer=standin_import,
+    ) as sink:
+        futures = [
+            sink.submit(
+                _transcript(idx), audio_path=f"{idx}.wav", storage_path=storage_path
+            )
+            for idx in range(count)
+        ]
+        for future in futures:
+            future.result()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transcripts", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        unbatched = run_unbatched(Path(tmp) / "unbatched.db", args.transcripts)
+        batched = run_batched(Path(tmp) / "batched.db", args.transcripts, args.batch)
+
+    print(f"transcripts: {args.transcripts}")
+    print(f"per-file storage: {unbatched:.3f}s")
+    print(f"batched (N={args.batch}): {batched:.3f}s")
+    print(f"speedup: {unbatched / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare story validation strategies.
+
+Modes measured:
+
+* ``jsonschema.validate`` per event (the previous behaviour),
+* the cached validator via ``validate_story`` per event,
+* ``validate_stories`` with full validation,
+* ``validate_stories`` with the trusted-connector sampling policy.
+
+Usage::
+
+    python benchmarks/story_validation.py --events 50000
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from jsonschema import validate  # noqa: E402
+
+from tircorder.schemas import (  # noqa: E402
+    TRUSTED_CONNECTOR,
+    load_schema,
+    validate_stories,
+    validate_story,
+)
+
+
+def make_events(count: int) -> List[Dict[str, object]]:
+    return [
+        {
+            "event_id": f"event-{i}",
+            "timestamp": "2024-01-01T00:00:00Z",
+            "actor": "user",
+            "action": "heart_rate",
+            "details": {"value": 60 + i % 40, "unit": "count/min"},
+        }
+        for i in range(count)
+    ]
+
+
+def _time(label: str, func: Callable[[], object], events: int) -> None:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.3f}s  {events / elapsed:12.0f} events/s")
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args(argv)
+
+    events = make_events(args.events)
+    schema = load_schema("story")
+
+    def uncached() -> None:
+        for event in events:
+            validate(instance=event, schema=schema)
+
+    def cached() -> None:
+        for event in events:
+            validate_story(event)
+
+    _time("jsonschema.validate per event", uncached, args.events)
+    _time("validate_story (cached)", cached, args.events)
+    _time("validate_stories (full)", lambda: validate_stories(events), args.events)
+    _time(
+        "validate_stories (trusted)",
+        lambda: validate_stories(events, TRUSTED_CONNECTOR),
+        args.events,
+    )
+
+
+if __name__ == "__main__":
+    main()
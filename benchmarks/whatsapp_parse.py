@@ -0,0 +1,105 @@
+"""Compare WhatsApp plain-text parsing strategies.
+
+The ``tests/data`` chat sample is repeated (with multi-line messages mixed
+in) until the corpus reaches ``--lines`` lines; ``--day-first`` rewrites the
+timestamps in the 24-hour day-first format used by most non-US locales,
+which the previous parser only reached after several failed patterns.
+Modes measured:
+
+* the previous per-line parser, trying every ``strptime`` pattern,
+* :class:`WhatsAppBackupConnector` with the sniffed, per-file regex.
+
+Usage::
+
+    python benchmarks/whatsapp_parse.py --lines 2000000 [--day-first]
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import tempfile
+import time
+from itertools import cycle, islice
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from integrations.event_ids import EventIdMinter  # noqa: E402
+from integrations.whatsapp_backup import (  # noqa: E402
+    WhatsAppBackupConnector,
+    _build_event,
+    _parse_timestamp,
+)
+
+SAMPLE = Path(__file__).resolve().parents[1] / "tests" / "data" / "whatsapp_plain.txt"
+
+
+def make_corpus(path: Path, lines: int, day_first: bool = False) -> None:
+    sample = SAMPLE.read_text(encoding="utf-8").splitlines()
+    sample += ["1/2/21, 9:30 PM - Alice: Plans for tomorrow:", "- lunch", "- film"]
+    if day_first:
+        sample = [_day_first(line) for line in sample]
+    with path.open("w", encoding="utf-8") as fh:
+        for line in islice(cycle(sample), lines):
+            fh.write(line + "\n")
+
+
+def _day_first(line: str) -> str:
+    ts, sep, rest = line.partition(" - ")
+    if not sep:
+        return line
+    return _parse_timestamp(ts).strftime("%d/%m/%Y, %H:%M") + sep + rest
+
+
+def legacy_parse(path: Path) -> int:
+    pattern = re.compile(r"^(?P<ts>[^-]+) - (?P<rest>.+)$")
+    count = 0
+    mint = EventIdMinter()
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip()
+        match = pattern.match(line) if line else None
+        if match is None:
+            continue
+        rest = match.group("rest")
+        sender, message = rest.split(": ", 1) if ": " in rest else ("system", rest)
+        try:
+            timestamp = _parse_timestamp(match.group("ts").strip())
+        except ValueError:
+            continue
+        _build_event(mint, timestamp, sender, message, None)
+        count += 1
+    return count
+
+
+def sniffed_parse(path: Path) -> int:
+    return sum(1 for _ in WhatsAppBackupConnector().iter_events(path))
+
+
+def _time(label: str, func: Callable[[], int], lines: int) -> None:
+    start = time.perf_counter()
+    messages = func()
+    elapsed = time.perf_counter() - start
+    print(
+        f"{label:<28} {elapsed:8.3f}s  {lines / elapsed:12.0f} lines/s"
+        f"  {messages} messages"
+    )
+
+
+def main(argv: List[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1_000_000)
+    parser.add_argument("--day-first", action="store_true")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp) / "chat.txt"
+        make_corpus(corpus, args.lines, args.day_first)
+        _time("per-line strptime patterns", lambda: legacy_parse(corpus), args.lines)
+        _time("sniffed format", lambda: sniffed_parse(corpus), args.lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,23 @@
-from collections import defaultdict
-from datetime import datetime, date
-from typing import Dict
+"""Persistent counts of contact interactions per day, with rankings.
 
-"""Helpers for counting contact occurrences across days."""
-
-from collections import defaultdict
-from datetime import date, datetime
-
-
-class ContactFrequencyCache:
-    """Cache counting contact occurrences by day."""
-
-    def __init__(self) -> None:
-        self._data: Dict[str, Dict[date, int]] = defaultdict(lambda: defaultdict(int))
-
-        self._data: dict[str, dict[date, int]] = defaultdict(lambda: defaultdict(int))
-
-    def record(self, contact: str, ts: datetime) -> None:
-        """Record a contact occurrence for the given timestamp."""
-        day = ts.date()
-        self._data[contact][day] += 1
-
-    def daily_counts(self) -> Dict[str, Dict[date, int]]:
-
-    def daily_counts(self) -> dict[str, dict[date, int]]:
-        """Return a mapping of contacts to their per-day counts."""
-        return {c: dict(days) for c, days in self._data.items()}
-
-    def frequency_ranking(self) -> list[tuple[str, int]]:
-        """Return contacts sorted by total frequency descending."""
-        totals = {c: sum(days.values()) for c, days in self._data.items()}
-        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+Interactions are stored per ``(day, contact)`` in ``contact_counts``, where
+``day`` is an ISO date string. A ``contact_totals`` table is kept in step
+with it in the same transaction and indexed by total, so the top ``k``
+contacts are read from the index without scanning every row. Rankings for a
+date window aggregate only the rows of that window through a covering index
+on ``(day, contact, count)``. Read results are kept in a small in-memory LRU
+cache that is cleared whenever counts are written.
+"""
 
+from __future__ import annotations
 
 import sqlite3
+from collections import Counter, OrderedDict
 from datetime import date, datetime, timedelta
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+DB_PATH = "contact_frequency_cache.sqlite"
+LRU_SIZE = 256
 
 
 class ContactFrequencyCache:
@@ -45,10 +28,14 @@ class ContactFrequencyCache:
     db_path: str, optional
         Location of the SQLite database file. Use ``":memory:"`` for an
         in-memory cache.
+    lru_size: int, optional
+        Number of query results kept in memory; ``0`` disables the layer.
     """
 
-    def __init__(self, db_path: str = "contact_frequency_cache.sqlite"):
+    def __init__(self, db_path: str = DB_PATH, lru_size: int = LRU_SIZE):
         self.conn = sqlite3.connect(db_path)
+        self.lru_size = lru_size
+        self._lru: "OrderedDict[Hashable, Any]" = OrderedDict()
         self._init_db()
 
     def _init_db(self) -> None:
@@ -63,43 +50,191 @@ class ContactFrequencyCache:
             )
             """
         )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_contact_counts_day "
+            "ON contact_counts(day, contact, count)"
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_contact_counts_contact "
+            "ON contact_counts(contact, day, count)"
+        )
+        exists = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='contact_totals'"
+        ).fetchone()
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS contact_totals (
+                contact TEXT PRIMARY KEY,
+                total INTEGER NOT NULL
+            )
+            """
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_contact_totals_total "
+            "ON contact_totals(total DESC, contact)"
+        )
+        if not exists:
+            # Databases from before the totals table get it backfilled once.
+            cur.execute(
+                """
+                INSERT INTO contact_totals(contact, total)
+                SELECT contact, SUM(count) FROM contact_counts GROUP BY contact
+                """
+            )
         self.conn.commit()
 
     @staticmethod
-    def _day_key(ts: datetime) -> str:
-        return ts.strftime("%Y-%m-%d")
+    def _day_key(ts: datetime | date) -> str:
+        if isinstance(ts, datetime):
+            ts = ts.date()
+        return ts.isoformat()
+
+    # ------------------------------------------------------------------
+    def record(self, contact: str, ts: datetime, count: int = 1) -> None:
+        """Record ``count`` interactions for ``contact`` at ``ts``."""
+        self._write(Counter({(self._day_key(ts), contact): count}))
+
+    def record_many(self, interactions: Iterable[Tuple[str, datetime]]) -> int:
+        """Record ``(contact, timestamp)`` pairs in one transaction.
+
+        Pairs are aggregated per day and contact first, so each distinct
+        pair costs one upsert into ``contact_counts`` and each contact one
+        into ``contact_totals``. Returns the number of interactions recorded.
+        """
+        return self._write(
+            Counter((self._day_key(ts), contact) for contact, ts in interactions)
+        )
 
-    def record(self, contact: str, ts: datetime) -> None:
-        """Record an interaction for ``contact`` at ``ts``."""
-        key = self._day_key(ts)
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO contact_counts(day, contact, count) VALUES(?, ?, 1)
-            ON CONFLICT(day, contact) DO UPDATE SET count=count+1
-            """,
-            (key, contact),
+    def _write(self, per_day: Counter) -> int:
+        if not per_day:
+            return 0
+        totals: Counter = Counter()
+        for (_, contact), count in per_day.items():
+            totals[contact] += count
+        with self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO contact_counts(day, contact, count) VALUES(?, ?, ?)
+                ON CONFLICT(day, contact) DO UPDATE SET count=count+excluded.count
+                """,
+                ((day, contact, count) for (day, contact), count in per_day.items()),
+            )
+            self.conn.executemany(
+                """
+                INSERT INTO contact_totals(contact, total) VALUES(?, ?)
+                ON CONFLICT(contact) DO UPDATE SET total=total+excluded.total
+                """,
+                totals.items(),
+            )
+        self._lru.clear()
+        return sum(totals.values())
+
+    # ------------------------------------------------------------------
+    def _cached(self, key: Hashable, load):
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            return self._lru[key]
+        value = load()
+        if self.lru_size > 0:
+            self._lru[key] = value
+            if len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+        return value
+
+    def frequency_ranking(self, k: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Return the ``k`` most frequent contacts (all when ``None``).
+
+        Served from the ``contact_totals`` index, so the cost depends on
+        ``k`` rather than on the number of recorded days.
+        """
+
+        def load() -> Tuple[Tuple[str, int], ...]:
+            rows = self.conn.execute(
+                "SELECT contact, total FROM contact_totals "
+                "ORDER BY total DESC, contact LIMIT ?",
+                (-1 if k is None else k,),
+            )
+            return tuple(rows)
+
+        return list(self._cached(("ranking", k), load))
+
+    def ranking_between(
+        self, start: date, end: date, k: Optional[int] = None
+    ) -> List[Tuple[str, int]]:
+        """Return the ``k`` most frequent contacts from ``start`` to ``end``."""
+
+        def load() -> Tuple[Tuple[str, int], ...]:
+            rows = self.conn.execute(
+                """
+                SELECT contact, SUM(count) AS total FROM contact_counts
+                WHERE day BETWEEN ? AND ?
+                GROUP BY contact
+                ORDER BY total DESC, contact
+                LIMIT ?
+                """,
+                (self._day_key(start), self._day_key(end), -1 if k is None else k),
+            )
+            return tuple(rows)
+
+        return list(self._cached(("between", start, end, k), load))
+
+    def total(self, contact: str) -> int:
+        """Return the number of interactions recorded for ``contact``."""
+
+        def load() -> int:
+            row = self.conn.execute(
+                "SELECT total FROM contact_totals WHERE contact=?", (contact,)
+            ).fetchone()
+            return row[0] if row else 0
+
+        return self._cached(("total", contact), load)
+
+    def contact_days(
+        self, contact: str, start: Optional[date] = None, end: Optional[date] = None
+    ) -> Dict[date, int]:
+        """Return ``contact``'s non-zero counts per day, optionally in a range."""
+
+        def load() -> Tuple[Tuple[str, int], ...]:
+            rows = self.conn.execute(
+                "SELECT day, count FROM contact_counts "
+                "WHERE contact=? AND day BETWEEN ? AND ? ORDER BY day",
+                (
+                    contact,
+                    self._day_key(start) if start else "",
+                    self._day_key(end) if end else "9999-12-31",
+                ),
+            )
+            return tuple(rows)
+
+        rows = self._cached(("days", contact, start, end), load)
+        return {date.fromisoformat(day): count for day, count in rows}
+
+    def daily_counts(self) -> Dict[str, Dict[date, int]]:
+        """Return a mapping of contacts to their per-day counts."""
+        counts: Dict[str, Dict[date, int]] = {}
+        rows = self.conn.execute(
+            "SELECT contact, day, count FROM contact_counts ORDER BY contact, day"
         )
-        self.conn.commit()
+        for contact, day, count in rows:
+            counts.setdefault(contact, {})[date.fromisoformat(day)] = count
+        return counts
 
     def day_counts(self, start: date, end: date) -> dict[date, dict[str, int]]:
         """Return per-contact counts for each day between ``start`` and ``end``."""
-        start_key = start.strftime("%Y-%m-%d")
-        end_key = end.strftime("%Y-%m-%d")
         cur = self.conn.cursor()
         cur.execute(
             "SELECT day, contact, count FROM contact_counts WHERE day BETWEEN ? AND ?",
-            (start_key, end_key),
+            (self._day_key(start), self._day_key(end)),
         )
-        rows = cur.fetchall()
         day_counts: dict[date, dict[str, int]] = {
             start + timedelta(days=i): {} for i in range((end - start).days + 1)
         }
-        for day_str, contact, count in rows:
-            day = datetime.strptime(day_str, "%Y-%m-%d").date()
-            day_counts[day][contact] = count
+        for day_str, contact, count in cur:
+            day_counts[date.fromisoformat(day_str)][contact] = count
         return day_counts
 
+    def close(self) -> None:
+        self.conn.close()
 
 
 __all__ = ["ContactFrequencyCache"]
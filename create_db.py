@@ -1,6 +1,7 @@
 import sqlite3
 
 from tircorder.chat_storage import ensure_chat_events_schema
+from tircorder.story_storage import ensure_story_events_schema
 
 def create_tables():
     conn = sqlite3.connect('state.db')
@@ -96,6 +97,7 @@ def create_tables():
     ''')
 
     ensure_chat_events_schema(conn)
+    ensure_story_events_schema(conn)
 
     conn.commit()
     conn.close()
@@ -1,93 +1,323 @@
+"""Persistent multi-resolution event counts for calendar views.
+
+Events are counted in minute, hour, day and month rollup tables that are
+maintained together, keyed by integer buckets of wall-clock time:
+
+* minute, hour and day buckets are whole minutes, hours and days since
+  1970-01-01;
+* month buckets are ``year * 12 + month - 1``.
+
+``record`` only updates an in-memory buffer of minute counts. The buffer is
+written to all four tables in one transaction when it holds
+``flush_size`` buckets, when ``flush_interval`` seconds have passed, before
+every query, and on :meth:`HourlyEventCache.flush` or ``close``.
+"""
+
 import sqlite3
-from datetime import datetime, date, timedelta
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+_ONE_MINUTE = timedelta(minutes=1)
+
+RESOLUTIONS = ("minute", "hour", "day", "month")
+MAX_BUCKETS = 400
+
+_SECONDS = {"minute": 60, "hour": 3600, "day": 86400}
+
+
+def _table(resolution: str) -> str:
+    return f"rollup_{resolution}"
+
+
+def _minute_key(ts: datetime) -> int:
+    if ts.tzinfo is not None:
+        ts = ts.replace(tzinfo=None)
+    return (ts - _EPOCH) // _ONE_MINUTE
+
+
+def _month_of_day(day_key: int) -> int:
+    day = date.fromordinal(_EPOCH_ORDINAL + day_key)
+    return day.year * 12 + day.month - 1
+
+
+def _first_day_of_month(month_key: int) -> int:
+    year, month = divmod(month_key, 12)
+    return date(year, month + 1, 1).toordinal() - _EPOCH_ORDINAL
+
+
+def _bucket_start(resolution: str, key: int) -> datetime:
+    if resolution == "month":
+        year, month = divmod(key, 12)
+        return datetime(year, month + 1, 1)
+    return _EPOCH + timedelta(seconds=key * _SECONDS[resolution])
+
+
+def _key(resolution: str, ts: datetime) -> int:
+    minute = _minute_key(ts)
+    if resolution == "minute":
+        return minute
+    if resolution == "hour":
+        return minute // 60
+    day = minute // 1440
+    return day if resolution == "day" else _month_of_day(day)
+
+
+# For each resolution below "month": the key of the enclosing coarser bucket
+# and the first finer key inside a coarser bucket.
+_UP = {
+    "minute": lambda key: key // 60,
+    "hour": lambda key: key // 24,
+    "day": _month_of_day,
+}
+_FIRST = {
+    "minute": lambda key: key * 60,
+    "hour": lambda key: key * 24,
+    "day": _first_day_of_month,
+}
+
+
+def _plan(resolution: str, lo: int, hi: int) -> List[Tuple[str, int, int]]:
+    """Split buckets ``[lo, hi)`` into ranges of the coarsest covering tables."""
+
+    if lo >= hi or resolution == "month":
+        return [(resolution, lo, hi)] if lo < hi else []
+    up, first = _UP[resolution], _FIRST[resolution]
+    coarse_lo = up(lo) if first(up(lo)) == lo else up(lo) + 1
+    coarse_hi = up(hi)
+    if coarse_lo >= coarse_hi:
+        return [(resolution, lo, hi)]
+    coarser = RESOLUTIONS[RESOLUTIONS.index(resolution) + 1]
+    pieces = [
+        (resolution, lo, first(coarse_lo)),
+        (resolution, first(coarse_hi), hi),
+    ]
+    return [p for p in pieces if p[1] < p[2]] + _plan(coarser, coarse_lo, coarse_hi)
+
 
 class HourlyEventCache:
-    """Persistent cache of event counts binned by hour.
+    """Persistent cache of event counts binned by minute, hour, day and month.
 
     Parameters
     ----------
     db_path: str, optional
         Location of the SQLite database file. Use ``":memory:"`` for an
         in-memory cache.
+    flush_size: int, optional
+        Number of buffered minute buckets that triggers a write.
+    flush_interval: float, optional
+        Seconds after which ``record`` writes the buffer regardless of size.
     """
 
-    def __init__(self, db_path: str = "hourly_cache.sqlite"):
+    def __init__(
+        self,
+        db_path: str = "hourly_cache.sqlite",
+        flush_size: int = 1000,
+        flush_interval: float = 5.0,
+    ):
         self.conn = sqlite3.connect(db_path)
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._pending: Counter = Counter()
+        self._last_flush = time.monotonic()
         self._init_db()
 
     def _init_db(self) -> None:
         cur = self.conn.cursor()
-        cur.execute(
-            """
-            CREATE TABLE IF NOT EXISTS hour_counts (
-                hour TEXT PRIMARY KEY,
-                count INTEGER NOT NULL
+        for resolution in RESOLUTIONS:
+            cur.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {_table(resolution)} (
+                    bucket INTEGER PRIMARY KEY,
+                    count INTEGER NOT NULL
+                )
+                """
             )
-            """
-        )
+        legacy = cur.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='hour_counts'"
+        ).fetchone()
+        if legacy:
+            self._migrate_hour_counts(cur)
         self.conn.commit()
 
-    @staticmethod
-    def _hour_key(ts: datetime) -> str:
-        return ts.strftime("%Y-%m-%dT%H")
+    def _migrate_hour_counts(self, cur: sqlite3.Cursor) -> None:
+        """Fold the old text-keyed ``hour_counts`` table into the rollups.
+
+        Only hourly detail exists for those events, so each hour's count is
+        placed in the minute bucket at the start of the hour.
+        """
 
+        pending: Counter = Counter()
+        for hour, count in cur.execute("SELECT hour, count FROM hour_counts"):
+            pending[_minute_key(datetime.strptime(hour, "%Y-%m-%dT%H"))] += count
+        self._write(cur, pending)
+        cur.execute("DROP TABLE hour_counts")
+
+    # ------------------------------------------------------------------
     def record(self, ts: datetime, count: int = 1) -> None:
-        """Record an event for the given timestamp."""
-        key = self._hour_key(ts)
-        cur = self.conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO hour_counts(hour, count) VALUES(?, ?)
-            ON CONFLICT(hour) DO UPDATE SET count=count+?
-            """,
-            (key, count, count),
-        )
-        self.conn.commit()
+        """Record an event for the given timestamp.
 
-    def bulk_record(self, timestamps) -> None:
-        """Record multiple timestamps efficiently."""
-        cur = self.conn.cursor()
-        counts: dict[str, int] = {}
-        for ts in timestamps:
-            key = self._hour_key(ts)
-            counts[key] = counts.get(key, 0) + 1
-        cur.executemany(
-            """
-            INSERT INTO hour_counts(hour, count) VALUES(?, ?)
-            ON CONFLICT(hour) DO UPDATE SET count=count+excluded.count
-            """,
-            list(counts.items()),
-        )
-        self.conn.commit()
+        The count is buffered; see the module documentation for when it is
+        written.
+        """
+        self._pending[_minute_key(ts)] += count
+        if (
+            len(self._pending) >= self.flush_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def bulk_record(self, timestamps: Iterable[datetime]) -> None:
+        """Record multiple timestamps and write them immediately."""
+        self._pending.update(_minute_key(ts) for ts in timestamps)
+        self.flush()
+
+    def flush(self) -> None:
+        """Write buffered counts to every rollup table in one transaction."""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, Counter()
+        with self.conn:
+            self._write(self.conn.cursor(), pending)
+
+    @staticmethod
+    def _write(cur: sqlite3.Cursor, minutes: Counter) -> None:
+        levels: Dict[str, Counter] = {"minute": minutes}
+        hours: Counter = Counter()
+        for minute, count in minutes.items():
+            hours[minute // 60] += count
+        days: Counter = Counter()
+        for hour, count in hours.items():
+            days[hour // 24] += count
+        months: Counter = Counter()
+        for day, count in days.items():
+            months[_month_of_day(day)] += count
+        levels.update(hour=hours, day=days, month=months)
+        for resolution, counts in levels.items():
+            cur.executemany(
+                f"""
+                INSERT INTO {_table(resolution)}(bucket, count) VALUES(?, ?)
+                ON CONFLICT(bucket) DO UPDATE SET count=count+excluded.count
+                """,
+                counts.items(),
+            )
+
+    # ------------------------------------------------------------------
+    def _sum(self, resolution: str, lo: int, hi: int) -> int:
+        row = self.conn.execute(
+            f"SELECT SUM(count) FROM {_table(resolution)} "
+            "WHERE bucket >= ? AND bucket < ?",
+            (lo, hi),
+        ).fetchone()
+        return row[0] or 0
+
+    def count_between(self, start: datetime, end: datetime) -> int:
+        """Return the number of events in ``[start, end)``.
+
+        The range is split into the coarsest buckets that tile it, for
+        example whole months in the middle and days, hours and minutes at
+        the edges, so a year is answered from about a dozen month rows.
+        Minutes partly inside the range are counted in full.
+        """
+        self.flush()
+        lo = _minute_key(start)
+        hi = -(-(end.replace(tzinfo=None) - _EPOCH) // _ONE_MINUTE)
+        return sum(self._sum(*piece) for piece in _plan("minute", lo, hi))
+
+    def count_range(self, start: date, end: date) -> int:
+        """Return total number of events between ``start`` and ``end``."""
+        self.flush()
+        lo = start.toordinal() - _EPOCH_ORDINAL
+        hi = end.toordinal() - _EPOCH_ORDINAL + 1
+        return sum(self._sum(*piece) for piece in _plan("day", lo, hi))
 
     def day_counts(self, start: date, end: date) -> dict[date, int]:
         """Return counts per day between ``start`` and ``end`` inclusive."""
-        start_dt = datetime.combine(start, datetime.min.time())
-        end_dt = datetime.combine(end, datetime.max.time())
-        cur = self.conn.cursor()
-        cur.execute(
-            "SELECT hour, count FROM hour_counts WHERE hour BETWEEN ? AND ?",
-            (self._hour_key(start_dt), self._hour_key(end_dt)),
-        )
-        rows = cur.fetchall()
+        self.flush()
+        first = start.toordinal() - _EPOCH_ORDINAL
+        last = end.toordinal() - _EPOCH_ORDINAL
         day_counts: dict[date, int] = {
             start + timedelta(days=i): 0 for i in range((end - start).days + 1)
         }
-        for hour_str, count in rows:
-            day = datetime.strptime(hour_str, "%Y-%m-%dT%H").date()
-            day_counts[day] += count
+        rows = self.conn.execute(
+            "SELECT bucket, count FROM rollup_day WHERE bucket BETWEEN ? AND ?",
+            (first, last),
+        )
+        for bucket, count in rows:
+            day_counts[date.fromordinal(_EPOCH_ORDINAL + bucket)] = count
         return day_counts
 
-    def count_range(self, start: date, end: date) -> int:
-        """Return total number of events between ``start`` and ``end``."""
-        start_dt = datetime.combine(start, datetime.min.time())
-        end_dt = datetime.combine(end, datetime.max.time())
-        cur = self.conn.cursor()
-        cur.execute(
-            "SELECT SUM(count) FROM hour_counts WHERE hour BETWEEN ? AND ?",
-            (self._hour_key(start_dt), self._hour_key(end_dt)),
+    @staticmethod
+    def pick_resolution(
+        start: datetime, end: datetime, max_buckets: int = MAX_BUCKETS
+    ) -> str:
+        """Return the resolution to read for a view of ``[start, end)``.
+
+        This is the finest resolution with at most ``max_buckets`` buckets
+        in the range, or ``"month"`` when even days are too many.
+        """
+        for resolution in RESOLUTIONS[:-1]:
+            last = _key(resolution, end - timedelta(microseconds=1))
+            buckets = last - _key(resolution, start) + 1
+            if buckets <= max_buckets:
+                return resolution
+        return "month"
+
+    def counts(
+        self,
+        start: datetime,
+        end: datetime,
+        resolution: Optional[str] = None,
+        max_buckets: int = MAX_BUCKETS,
+    ) -> Dict[datetime, int]:
+        """Return counts per bucket overlapping ``[start, end)``.
+
+        Parameters
+        ----------
+        start, end: datetime.datetime
+            Range of the view.
+        resolution: str, optional
+            ``"minute"``, ``"hour"``, ``"day"`` or ``"month"``. By default
+            :meth:`pick_resolution` chooses it, so a year view reads a few
+            hundred day rows and a day view 24 hour rows.
+        max_buckets: int, optional
+            Upper bound on buckets when choosing the resolution.
+
+        Returns
+        -------
+        dict[datetime.datetime, int]
+            Start of each bucket mapped to its count, including empty buckets.
+        """
+        if resolution is None:
+            resolution = self.pick_resolution(start, end, max_buckets)
+        elif resolution not in RESOLUTIONS:
+            raise ValueError(f"unknown resolution: {resolution}")
+        self.flush()
+        lo = _key(resolution, start)
+        hi = _key(resolution, end - timedelta(microseconds=1)) + 1
+        counts = dict.fromkeys(range(lo, hi), 0)
+        rows = self.conn.execute(
+            f"SELECT bucket, count FROM {_table(resolution)} "
+            "WHERE bucket >= ? AND bucket < ?",
+            (lo, hi),
         )
-        result = cur.fetchone()[0]
-        return result or 0
+        counts.update(rows)
+        return {_bucket_start(resolution, key): n for key, n in counts.items()}
+
+    def close(self) -> None:
+        """Flush buffered counts and close the database."""
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self) -> "HourlyEventCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
 
-__all__ = ["HourlyEventCache"]
+__all__ = ["HourlyEventCache", "RESOLUTIONS"]
@@ -6,6 +6,7 @@ import signal
 import sys
 from tircorder.state import export_queues_and_files, load_state
 from tircorder.chat_storage import ensure_chat_events_schema
+from tircorder.story_storage import ensure_story_events_schema
 
 DB_PATH = 'state.db'
 
@@ -43,6 +44,7 @@ def check_and_create_db():
             ''')
 
         ensure_chat_events_schema(conn)
+        ensure_story_events_schema(conn)
 
         conn.commit()
         conn.close()
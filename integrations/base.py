@@ -0,0 +1,38 @@
+"""Common streaming interface for integration connectors."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, Protocol, Union, runtime_checkable
+
+
+@runtime_checkable
+class Connector(Protocol):
+    """Anything that yields story events from an export.
+
+    ``iter_events`` yields events one at a time so that consumers never hold
+    a whole archive in memory. Connectors configured with their source in the
+    constructor take no arguments; file-oriented connectors accept the path
+    of the export. The older list-returning methods (``load``, ``parse`` ...)
+    are thin ``list(self.iter_events(...))`` wrappers.
+    """
+
+    def iter_events(self, *args: Any, **kwargs: Any) -> Iterator[Dict[str, Any]]:
+        ...  # pragma: no cover - interface
+
+
+EventSource = Union[Connector, Iterable[Dict[str, Any]]]
+
+
+def iter_source_events(source: EventSource) -> Iterator[Dict[str, Any]]:
+    """Return an iterator over ``source``.
+
+    ``source`` may be a configured :class:`Connector` (its ``iter_events()``
+    is called without arguments) or any iterable of events.
+    """
+
+    if isinstance(source, Connector):
+        return iter(source.iter_events())
+    return iter(source)
+
+
+__all__ = ["Connector", "EventSource", "iter_source_events"]
@@ -0,0 +1,192 @@
+"""Per-source checkpoints for incremental connector re-imports.
+
+A checkpoint records how far a source has been imported: the newest event
+timestamp and, for append-only files, the file and byte offset to resume
+from. Checkpoints live in the ``connector_checkpoints`` table of the state
+database. Together with content-derived event ids (see
+:mod:`integrations.event_ids`) and upserts, a refresh only parses and writes
+records added since the previous run::
+
+    store = CheckpointStore()
+    events = store.new_events("slack:acme", SlackBackupConnector(path).iter_events())
+    upsert_chat_events(events)
+    store.commit("slack:acme")
+
+The checkpoint only advances on :meth:`CheckpointStore.commit`, after the
+caller has stored the events, so a crash before then repeats the import
+instead of skipping it.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional
+
+DB_PATH = "state.db"
+
+
+@dataclass
+class Checkpoint:
+    """Import progress for one source.
+
+    Attributes
+    ----------
+    last_timestamp:
+        ISO timestamp of the newest event imported.
+    last_file:
+        Resolved path of the file ``last_offset`` refers to.
+    last_offset:
+        Byte offset in ``last_file`` at which to resume parsing.
+    """
+
+    last_timestamp: Optional[str] = None
+    last_file: Optional[str] = None
+    last_offset: int = 0
+
+
+def ensure_checkpoint_schema(conn: sqlite3.Connection) -> None:
+    """Ensure the ``connector_checkpoints`` table exists."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS connector_checkpoints (
+            source TEXT PRIMARY KEY,
+            last_timestamp TEXT,
+            last_file TEXT,
+            last_offset INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL
+        )
+        """
+    )
+
+
+def _sort_key(timestamp: Any) -> Optional[float]:
+    """Return ``timestamp`` as epoch seconds; naive values are taken as UTC."""
+
+    try:
+        when = datetime.fromisoformat(str(timestamp).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.timestamp()
+
+
+class CheckpointStore:
+    """SQLite-backed checkpoints keyed by source name.
+
+    Parameters
+    ----------
+    db_path: str, optional
+        Location of the SQLite database file. Ignored when ``conn`` is given.
+    conn: sqlite3.Connection, optional
+        Existing connection to use instead of opening ``db_path``.
+    """
+
+    def __init__(
+        self, db_path: str = DB_PATH, *, conn: Optional[sqlite3.Connection] = None
+    ) -> None:
+        self.conn = conn if conn is not None else sqlite3.connect(db_path)
+        self._owns_connection = conn is None
+        self._pending: Dict[str, Checkpoint] = {}
+        ensure_checkpoint_schema(self.conn)
+        self.conn.commit()
+
+    def get(self, source: str) -> Optional[Checkpoint]:
+        """Return the checkpoint stored for ``source`` or ``None``."""
+
+        row = self.conn.execute(
+            "SELECT last_timestamp, last_file, last_offset "
+            "FROM connector_checkpoints WHERE source=?",
+            (source,),
+        ).fetchone()
+        return Checkpoint(*row) if row else None
+
+    def save(self, source: str, checkpoint: Optional[Checkpoint]) -> None:
+        """Store ``checkpoint`` for ``source``; ``None`` is ignored."""
+
+        if checkpoint is None:
+            return
+        self.conn.execute(
+            """
+            INSERT INTO connector_checkpoints
+                (source, last_timestamp, last_file, last_offset, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(source) DO UPDATE SET
+                last_timestamp=excluded.last_timestamp,
+                last_file=excluded.last_file,
+                last_offset=excluded.last_offset,
+                updated_at=excluded.updated_at
+            """,
+            (
+                source,
+                checkpoint.last_timestamp,
+                checkpoint.last_file,
+                checkpoint.last_offset,
+                datetime.now(timezone.utc).isoformat(),
+            ),
+        )
+        self.conn.commit()
+
+    def reset(self, source: str) -> None:
+        """Forget the checkpoint for ``source`` so the next run is a full one."""
+
+        self.conn.execute("DELETE FROM connector_checkpoints WHERE source=?", (source,))
+        self.conn.commit()
+
+    def new_events(
+        self, source: str, events: Iterable[Mapping[str, Any]]
+    ) -> Iterator[Mapping[str, Any]]:
+        """Yield events of ``source`` not older than its checkpoint.
+
+        Events at exactly the checkpoint timestamp are yielded again, since
+        an export may have gained records at that instant; with content ids
+        the repeat is an idempotent upsert. Events whose timestamp cannot be
+        parsed are always yielded. Once ``events`` is exhausted the newest
+        timestamp seen becomes the pending checkpoint of ``source``; call
+        :meth:`commit` after the events are stored to save it.
+        """
+
+        checkpoint = self.get(source) or Checkpoint()
+        floor = _sort_key(checkpoint.last_timestamp)
+        newest_key: Optional[float] = None
+        newest: Optional[str] = None
+        for event in events:
+            key = _sort_key(event.get("timestamp"))
+            if key is not None:
+                if floor is not None and key < floor:
+                    continue
+                if newest_key is None or key > newest_key:
+                    newest_key, newest = key, str(event["timestamp"])
+            yield event
+        if newest is not None:
+            checkpoint.last_timestamp = newest
+            self._pending[source] = checkpoint
+
+    def commit(self, source: str) -> Optional[Checkpoint]:
+        """Save the pending checkpoint of ``source`` and return it.
+
+        Returns ``None`` when :meth:`new_events` has not finished a run for
+        ``source`` or saw no timestamped events.
+        """
+
+        checkpoint = self._pending.pop(source, None)
+        self.save(source, checkpoint)
+        return checkpoint
+
+    def discard(self, source: str) -> None:
+        """Drop the pending checkpoint of ``source``, e.g. after a failed write."""
+
+        self._pending.pop(source, None)
+
+    def close(self) -> None:
+        if self._owns_connection:
+            self.conn.close()
+
+
+__all__ = [
+    "Checkpoint",
+    "CheckpointStore",
+    "ensure_checkpoint_schema",
+]
@@ -0,0 +1,65 @@
+"""Content-derived story event ids.
+
+Connectors derive ``event_id`` from what an event says rather than from
+``uuid4()`` or its position in a file, so parsing the same record twice -
+for example when an updated export is re-imported - yields the same id and
+``upsert_chat_events``-style upserts overwrite instead of duplicating.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from tircorder.hashing import sha256_json
+
+DIGEST_LENGTH = 16
+
+
+def content_event_id(source: str, timestamp: str, actor: Any, payload: Any) -> str:
+    """Return ``"<source>_<digest>"`` for an event.
+
+    Parameters
+    ----------
+    source:
+        Connector-specific prefix such as ``"slack"`` or
+        ``"apple_health_steps"``; it is part of the hash as well.
+    timestamp:
+        ISO timestamp of the event.
+    actor:
+        Event actor.
+    payload:
+        JSON-serialisable content identifying the record, usually the
+        event's ``details``.
+    """
+
+    digest = sha256_json(
+        {"source": source, "timestamp": timestamp, "actor": actor, "payload": payload}
+    )
+    return f"{source}_{digest[:DIGEST_LENGTH]}"
+
+
+class EventIdMinter:
+    """Mint content ids that stay unique for repeated identical records.
+
+    Exports with coarse timestamps (WhatsApp text files use minutes) can hold
+    several identical records, e.g. the same short reply sent twice in a
+    minute. The n-th repeat of an id within one timestamp gets a ``-n``
+    suffix, so ids remain stable across re-imports of an append-only export.
+    Only the current timestamp's ids are remembered.
+    """
+
+    def __init__(self) -> None:
+        self._timestamp: Optional[str] = None
+        self._seen: Dict[str, int] = {}
+
+    def __call__(self, source: str, timestamp: str, actor: Any, payload: Any) -> str:
+        if timestamp != self._timestamp:
+            self._timestamp = timestamp
+            self._seen = {}
+        event_id = content_event_id(source, timestamp, actor, payload)
+        count = self._seen.get(event_id, 0) + 1
+        self._seen[event_id] = count
+        return event_id if count == 1 else f"{event_id}-{count}"
+
+
+__all__ = ["DIGEST_LENGTH", "EventIdMinter", "content_event_id"]
@@ -3,11 +3,12 @@
 from __future__ import annotations
 
 import json
-import uuid
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Iterator, List
 
+from integrations.event_ids import content_event_id
+
 
 class FacebookBackupConnector:
     """Connector for Facebook "Download Your Information" archives.
@@ -31,9 +32,14 @@ class FacebookBackupConnector:
     def _make_event(
         self, dt: datetime, actor: str, action: str, details: Dict[str, Any]
     ) -> Dict[str, Any]:
+        timestamp = dt.replace(tzinfo=timezone.utc).isoformat()
+        # Media paths depend on where the archive was extracted.
+        payload = {k: v for k, v in details.items() if k != "media"}
         event = {
-            "event_id": str(uuid.uuid4()),
-            "timestamp": dt.replace(tzinfo=timezone.utc).isoformat(),
+            "event_id": content_event_id(
+                f"facebook_{action}", timestamp, actor, payload
+            ),
+            "timestamp": timestamp,
             "actor": actor,
             "action": action,
             "details": details,
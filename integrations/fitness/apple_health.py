@@ -1,29 +1,58 @@
-"""Apple Health integration utilities."""
+"""Apple Health integration utilities.
+
+HealthKit ``export.xml`` files routinely reach several gigabytes, so exports
+are read with :func:`xml.etree.ElementTree.iterparse`: each top-level
+``Record``/``Workout`` element is converted as soon as it has been parsed and
+then cleared, keeping memory use flat regardless of file size.
+"""
 
 from __future__ import annotations
 
-from datetime import datetime
-from typing import Dict, List
-from uuid import uuid4
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
 from xml.etree import ElementTree as ET
 
-from tircorder.schemas import validate_story
+from integrations.event_ids import content_event_id
+from tircorder.schemas import FULL_VALIDATION, StoryCheck, StoryValidationPolicy
+
+WORKOUT_TYPE = "Workout"
 
 
 class AppleHealthConnector:
-    """Parse data from Apple Health exports or a native bridge."""
+    """Parse data from Apple Health exports or a native bridge.
+
+    Parameters
+    ----------
+    validation:
+        Story validation policy for the converted records. Every event is
+        validated by default; pass :data:`~tircorder.schemas.TRUSTED_CONNECTOR`
+        to check only the first events of an export and a random sample after
+        that.
+    """
+
+    def __init__(self, validation: StoryValidationPolicy = FULL_VALIDATION) -> None:
+        self.validation = validation
 
     def fetch_bridge(self) -> List[Dict]:
         """Placeholder for a native bridge integration."""
         raise NotImplementedError("Native bridge integration not yet implemented")
 
-    def load_export(self, path: str) -> List[Dict]:
+    def load_export(
+        self,
+        path: str,
+        *,
+        types: Optional[Iterable[str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> List[Dict]:
         """Load events from a HealthKit ``export.xml`` file.
 
         Parameters
         ----------
         path:
             Location of the ``export.xml`` file.
+        types, since, until:
+            Optional filters, see :meth:`iter_events`.
 
         Returns
         -------
@@ -36,96 +65,204 @@ class AppleHealthConnector:
             If the XML is malformed or cannot be read.
         """
 
-        try:
-            root = ET.parse(path).getroot()
-        except (
-            ET.ParseError,
-            FileNotFoundError,
-        ) as exc:  # pragma: no cover - file missing
-            raise ValueError("Invalid HealthKit export") from exc
+        return list(self.iter_events(path, types=types, since=since, until=until))
 
-        events: List[Dict] = []
-
-        for record in root.findall("Record"):
-            rtype = record.get("type")
-            start = record.get("startDate")
-            end = record.get("endDate")
-            if not rtype or not start:
-                continue
-            try:
-                ts = datetime.fromisoformat(start.replace("Z", "+00:00"))
-            except ValueError:
-                continue
-
-            if rtype == "HKQuantityTypeIdentifierStepCount":
-                value = record.get("value")
-                if value is None:
-                    continue
-                event = {
-                    "event_id": f"apple_health_steps_{uuid4()}",
-                    "timestamp": ts.isoformat(),
-                    "actor": "user",
-                    "action": "steps",
-                    "details": {"count": int(value), "start": start, "end": end},
-                }
-                validate_story(event)
-                events.append(event)
-
-            elif rtype == "HKQuantityTypeIdentifierHeartRate":
-                value = record.get("value")
-                unit = record.get("unit")
-                if value is None:
+    def iter_events(
+        self,
+        path: str,
+        *,
+        types: Optional[Iterable[str]] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ) -> Iterator[Dict]:
+        """Stream events from a HealthKit ``export.xml`` file.
+
+        Parameters
+        ----------
+        path:
+            Location of the ``export.xml`` file.
+        types:
+            Restrict output to these record types. Accepts HealthKit
+            identifiers (``HKQuantityTypeIdentifierHeartRate``), ``"Workout"``
+            or story actions (``"heart_rate"``, ``"workout"`` ...).
+        since, until:
+            Only yield records starting at or after ``since`` and before
+            ``until``. Naive bounds are treated as UTC.
+
+        Yields
+        ------
+        dict
+            Story events in document order.
+
+        Raises
+        ------
+        ValueError
+            If the XML is malformed or cannot be read.
+        """
+
+        wanted = _resolve_types(types)
+        check = StoryCheck(self.validation)
+        since = _as_utc(since) if since else None
+        until = _as_utc(until) if until else None
+
+        try:
+            context = ET.iterparse(path, events=("start", "end"))
+            depth = 0
+            root = None
+            for kind, elem in context:
+                if kind == "start":
+                    if root is None:
+                        root = elem
+                    depth += 1
                     continue
-                event = {
-                    "event_id": f"apple_health_hr_{uuid4()}",
-                    "timestamp": ts.isoformat(),
-                    "actor": "user",
-                    "action": "heart_rate",
-                    "details": {"bpm": float(value), "unit": unit},
-                }
-                validate_story(event)
-                events.append(event)
-
-            elif rtype == "HKCategoryTypeIdentifierSleepAnalysis":
-                state = record.get("value")
-                if state is None:
+                depth -= 1
+                if depth != 1:
                     continue
-                event = {
-                    "event_id": f"apple_health_sleep_{uuid4()}",
-                    "timestamp": ts.isoformat(),
-                    "actor": "user",
-                    "action": "sleep",
-                    "details": {"state": state, "start": start, "end": end},
-                }
-                validate_story(event)
-                events.append(event)
-
-        for workout in root.findall("Workout"):
-            start = workout.get("startDate")
-            if not start:
-                continue
-            try:
-                ts = datetime.fromisoformat(start.replace("Z", "+00:00"))
-            except ValueError:
-                continue
-            activity = workout.get("workoutActivityType", "")
-            details = {
-                "activity": activity.replace("HKWorkoutActivityType", "").lower(),
-                "duration": _to_float(workout.get("duration")),
-                "energy_burned": _to_float(workout.get("totalEnergyBurned")),
-                "distance": _to_float(workout.get("totalDistance")),
-            }
-            event = {
-                "event_id": f"apple_health_workout_{uuid4()}",
-                "timestamp": ts.isoformat(),
-                "actor": "user",
-                "action": "workout",
-                "details": details,
-            }
-            validate_story(event)
-            events.append(event)
-
-        return events
+                event = self._convert(elem, wanted, since, until)
+                if event is not None:
+                    check(event)
+                # Drop the finished element so the tree never grows.
+                elem.clear()
+                root.clear()
+                if event is not None:
+                    yield event
+        except (ET.ParseError, FileNotFoundError) as exc:
+            raise ValueError("Invalid HealthKit export") from exc
+
+    @staticmethod
+    def _convert(
+        elem: ET.Element,
+        wanted: Optional[frozenset],
+        since: Optional[datetime],
+        until: Optional[datetime],
+    ) -> Optional[Dict]:
+        if elem.tag == "Record":
+            rtype = elem.get("type")
+        elif elem.tag == WORKOUT_TYPE:
+            rtype = WORKOUT_TYPE
+        else:
+            return None
+        handler = _HANDLERS.get(rtype) if rtype else None
+        if handler is None or (wanted is not None and rtype not in wanted):
+            return None
+
+        start = elem.get("startDate")
+        if not start:
+            return None
+        try:
+            ts = datetime.fromisoformat(start.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+        if since is not None or until is not None:
+            ts_utc = _as_utc(ts)
+            if (since is not None and ts_utc < since) or (
+                until is not None and ts_utc >= until
+            ):
+                return None
+
+        return handler(elem, ts)
+
+
+def _steps(record: ET.Element, ts: datetime) -> Optional[Dict]:
+    value = record.get("value")
+    if value is None:
+        return None
+    details = {
+        "count": int(value),
+        "start": record.get("startDate"),
+        "end": record.get("endDate"),
+    }
+    return {
+        "event_id": content_event_id(
+            "apple_health_steps", ts.isoformat(), "user", details
+        ),
+        "timestamp": ts.isoformat(),
+        "actor": "user",
+        "action": "steps",
+        "details": details,
+    }
+
+
+def _heart_rate(record: ET.Element, ts: datetime) -> Optional[Dict]:
+    value = record.get("value")
+    if value is None:
+        return None
+    details = {"bpm": float(value), "unit": record.get("unit")}
+    return {
+        "event_id": content_event_id(
+            "apple_health_hr", ts.isoformat(), "user", details
+        ),
+        "timestamp": ts.isoformat(),
+        "actor": "user",
+        "action": "heart_rate",
+        "details": details,
+    }
+
+
+def _sleep(record: ET.Element, ts: datetime) -> Optional[Dict]:
+    state = record.get("value")
+    if state is None:
+        return None
+    details = {
+        "state": state,
+        "start": record.get("startDate"),
+        "end": record.get("endDate"),
+    }
+    return {
+        "event_id": content_event_id(
+            "apple_health_sleep", ts.isoformat(), "user", details
+        ),
+        "timestamp": ts.isoformat(),
+        "actor": "user",
+        "action": "sleep",
+        "details": details,
+    }
+
+
+def _workout(workout: ET.Element, ts: datetime) -> Dict:
+    activity = workout.get("workoutActivityType", "")
+    details = {
+        "activity": activity.replace("HKWorkoutActivityType", "").lower(),
+        "duration": _to_float(workout.get("duration")),
+        "energy_burned": _to_float(workout.get("totalEnergyBurned")),
+        "distance": _to_float(workout.get("totalDistance")),
+    }
+    return {
+        "event_id": content_event_id(
+            "apple_health_workout", ts.isoformat(), "user", details
+        ),
+        "timestamp": ts.isoformat(),
+        "actor": "user",
+        "action": "workout",
+        "details": details,
+    }
+
+
+_HANDLERS: Dict[str, Callable[[ET.Element, datetime], Optional[Dict]]] = {
+    "HKQuantityTypeIdentifierStepCount": _steps,
+    "HKQuantityTypeIdentifierHeartRate": _heart_rate,
+    "HKCategoryTypeIdentifierSleepAnalysis": _sleep,
+    WORKOUT_TYPE: _workout,
+}
+
+_ACTION_TYPES = {
+    "steps": "HKQuantityTypeIdentifierStepCount",
+    "heart_rate": "HKQuantityTypeIdentifierHeartRate",
+    "sleep": "HKCategoryTypeIdentifierSleepAnalysis",
+    "workout": WORKOUT_TYPE,
+}
+
+
+def _resolve_types(types: Optional[Iterable[str]]) -> Optional[frozenset]:
+    if types is None:
+        return None
+    return frozenset(_ACTION_TYPES.get(t, t) for t in types)
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
 
 
 def _to_float(value: str | None) -> float | None:
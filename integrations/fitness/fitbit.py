@@ -4,10 +4,10 @@ from __future__ import annotations
 
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
-from uuid import uuid4
 
 import requests
 
+from integrations.event_ids import content_event_id
 from tircorder.schemas import validate_story
 
 
@@ -93,12 +93,15 @@ class FitbitConnector:
         events: List[Dict] = []
         for item in data.get("activities-steps", []):
             dt = datetime.fromisoformat(item["dateTime"])
+            details = {"count": int(item.get("value", 0))}
             event = {
-                "event_id": f"fitbit_steps_{uuid4()}",
+                "event_id": content_event_id(
+                    "fitbit_steps", dt.isoformat(), "fitbit", details
+                ),
                 "timestamp": dt.isoformat(),
                 "actor": "fitbit",
                 "action": "steps",
-                "details": {"count": int(item.get("value", 0))},
+                "details": details,
             }
             validate_story(event)
             events.append(event)
@@ -112,12 +115,15 @@ class FitbitConnector:
         for item in data.get("activities-heart", []):
             dt = datetime.fromisoformat(item["dateTime"])
             resting = item.get("value", {}).get("restingHeartRate")
+            details = {"resting_heart_rate": resting}
             event = {
-                "event_id": f"fitbit_hr_{uuid4()}",
+                "event_id": content_event_id(
+                    "fitbit_hr", dt.isoformat(), "fitbit", details
+                ),
                 "timestamp": dt.isoformat(),
                 "actor": "fitbit",
                 "action": "heart_rate",
-                "details": {"resting_heart_rate": resting},
+                "details": details,
             }
             validate_story(event)
             events.append(event)
@@ -130,12 +136,15 @@ class FitbitConnector:
         events: List[Dict] = []
         for item in data.get("sleep", []):
             dt = datetime.fromisoformat(item.get("dateOfSleep"))
+            details = {"minutes_asleep": item.get("minutesAsleep")}
             event = {
-                "event_id": f"fitbit_sleep_{uuid4()}",
+                "event_id": content_event_id(
+                    "fitbit_sleep", dt.isoformat(), "fitbit", details
+                ),
                 "timestamp": dt.isoformat(),
                 "actor": "fitbit",
                 "action": "sleep",
-                "details": {"minutes_asleep": item.get("minutesAsleep")},
+                "details": details,
             }
             validate_story(event)
             events.append(event)
@@ -22,7 +22,6 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
-from uuid import uuid4
 
 try:  # pragma: no cover - import exercised in tests
     import requests
@@ -32,6 +31,7 @@ except ImportError as exc:  # pragma: no cover - handled via tests
         "Install it with `pip install requests`."
     ) from exc
 
+from integrations.event_ids import content_event_id
 from tircorder.schemas import validate_story
 
 
@@ -75,12 +75,15 @@ class GoogleFitConnector:
                     val = value_field.get("intVal")
                     if val is None:
                         val = value_field.get("fpVal")
+                    details = {"metric": metric, "value": val}
                     event = {
-                        "event_id": f"google_fit_{metric}_{uuid4()}",
+                        "event_id": content_event_id(
+                            f"google_fit_{metric}", ts, "user", details
+                        ),
                         "timestamp": ts,
                         "actor": "user",
                         "action": "measure",
-                        "details": {"metric": metric, "value": val},
+                        "details": details,
                     }
                     validate_story(event)
                     events.append(event)
@@ -1,9 +1,9 @@
 """Parse Google search history exports."""
 import json
 from datetime import datetime
-from typing import Dict, List
-from uuid import uuid4
+from typing import Dict, Iterator, List
 
+from integrations.event_ids import content_event_id
 from tircorder.schemas import validate_story
 
 
@@ -22,10 +22,15 @@ def load_search_history(path: str) -> List[Dict]:
         ``details`` keys.
     """
 
+    return list(iter_search_history(path))
+
+
+def iter_search_history(path: str) -> Iterator[Dict]:
+    """Yield search events from a Google Takeout JSON export at ``path``."""
+
     with open(path, "r", encoding="utf-8") as fh:
         raw_items = json.load(fh)
 
-    events: List[Dict] = []
     for item in raw_items:
         time_str = item.get("time") or item.get("timestamp")
         if not time_str:
@@ -39,13 +44,14 @@ def load_search_history(path: str) -> List[Dict]:
             query = title.replace("Searched for", "").strip().strip('"')
         else:
             query = title
+        timestamp = dt.isoformat()
+        details = {"query": query, "url": item.get("titleUrl")}
         event = {
-            "event_id": f"google_search_{uuid4()}",
-            "timestamp": dt.isoformat(),
+            "event_id": content_event_id("google_search", timestamp, "user", details),
+            "timestamp": timestamp,
             "actor": "user",
             "action": "search",
-            "details": {"query": query, "url": item.get("titleUrl")},
+            "details": details,
         }
         validate_story(event)
-        events.append(event)
-    return events
+        yield event
@@ -5,9 +5,9 @@ from __future__ import annotations
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Iterator
-from uuid import uuid4
 import json
 
+from integrations.event_ids import content_event_id
 from tircorder.schemas import validate_story
 
 
@@ -73,15 +73,19 @@ class GoogleTakeoutConnector:
                 dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
             except ValueError:
                 continue
+            timestamp = dt.isoformat()
+            actor = item.get("from", "unknown")
+            details = {"subject": item.get("subject"), "snippet": item.get("snippet")}
+            if item.get("id"):
+                event_id = f"gmail_{item['id']}"
+            else:
+                event_id = content_event_id("gmail", timestamp, actor, details)
             event = {
-                "event_id": f"gmail_{item.get('id', uuid4())}",
-                "timestamp": dt.isoformat(),
-                "actor": item.get("from", "unknown"),
+                "event_id": event_id,
+                "timestamp": timestamp,
+                "actor": actor,
                 "action": "email",
-                "details": {
-                    "subject": item.get("subject"),
-                    "snippet": item.get("snippet"),
-                },
+                "details": details,
             }
             try:
                 validate_story(event)
@@ -99,11 +103,16 @@ class GoogleTakeoutConnector:
                 dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
             except ValueError:
                 continue
+            timestamp = dt.isoformat()
+            actor = item.get("actor", "user")
+            action = item.get("action", "activity")
             event = {
-                "event_id": f"drive_{uuid4()}",
-                "timestamp": dt.isoformat(),
-                "actor": item.get("actor", "user"),
-                "action": item.get("action", "activity"),
+                "event_id": content_event_id(
+                    "drive", timestamp, actor, [action, item.get("target")]
+                ),
+                "timestamp": timestamp,
+                "actor": actor,
+                "action": action,
                 "details": {"target": item.get("target")},
             }
             try:
@@ -122,12 +131,14 @@ class GoogleTakeoutConnector:
                 dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
             except ValueError:
                 continue
+            timestamp = dt.isoformat()
+            details = {"file_name": item.get("fileName")}
             event = {
-                "event_id": f"photo_{uuid4()}",
-                "timestamp": dt.isoformat(),
+                "event_id": content_event_id("photo", timestamp, "user", details),
+                "timestamp": timestamp,
                 "actor": "user",
                 "action": "photo",
-                "details": {"file_name": item.get("fileName")},
+                "details": details,
             }
             try:
                 validate_story(event)
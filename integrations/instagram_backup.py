@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 
 from tircorder.schemas import validate_story
 
@@ -18,19 +18,20 @@ class InstagramBackupConnector:
 
     def load(self) -> List[Dict[str, Any]]:
         """Return validated story events from the export directory."""
-        events: List[Dict[str, Any]] = []
-        events.extend(self._load_items(self.base_path / "posts.json", "post"))
-        events.extend(self._load_items(self.base_path / "stories.json", "story"))
-        events.extend(self._load_items(self.base_path / "messages.json", "message"))
-        return events
+        return list(self.iter_events())
 
-    def _load_items(self, filepath: Path, action: str) -> List[Dict[str, Any]]:
+    def iter_events(self) -> Iterator[Dict[str, Any]]:
+        """Yield validated story events one export file at a time."""
+        yield from self._iter_items(self.base_path / "posts.json", "post")
+        yield from self._iter_items(self.base_path / "stories.json", "story")
+        yield from self._iter_items(self.base_path / "messages.json", "message")
+
+    def _iter_items(self, filepath: Path, action: str) -> Iterator[Dict[str, Any]]:
         """Parse *filepath* for events with the given *action*."""
         if not filepath.exists():
-            return []
+            return
         with open(filepath, "r", encoding="utf-8") as fh:
             data = json.load(fh)
-        events: List[Dict[str, Any]] = []
         for item in data:
             timestamp = item.get("timestamp")
             if not timestamp:
@@ -47,5 +48,4 @@ class InstagramBackupConnector:
                 },
             }
             validate_story(event)
-            events.append(event)
-        return events
+            yield event
@@ -6,9 +6,9 @@ import csv
 import json
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List
-from uuid import uuid4
+from typing import Dict, Iterator, List
 
+from integrations.event_ids import content_event_id
 from tircorder.schemas import validate_story
 
 
@@ -21,86 +21,78 @@ class LinkedInBackupConnector:
     def load_events(self) -> List[Dict]:
         """Return story events from the export directory."""
 
-        events: List[Dict] = []
-        events.extend(self._load_messages())
-        events.extend(self._load_profile_updates())
-        events.extend(self._load_posts())
-        return events
+        return list(self.iter_events())
 
-    def _load_messages(self) -> List[Dict]:
+    def iter_events(self) -> Iterator[Dict]:
+        """Yield story events from the export directory file by file."""
+
+        yield from self._iter_messages()
+        yield from self._iter_profile_updates()
+        yield from self._iter_posts()
+
+    def _iter_messages(self) -> Iterator[Dict]:
         path = self.export_dir / "messages.csv"
         if not path.exists():
-            return []
-        events: List[Dict] = []
+            return
         with open(path, newline="", encoding="utf-8") as fh:
             reader = csv.DictReader(fh)
             for row in reader:
                 ts = self._parse_ts(row.get("Date"))
                 if not ts:
                     continue
+                actor = row.get("From") or "unknown"
+                details = {"to": row.get("To"), "text": row.get("Message", "")}
                 event = {
-                    "event_id": f"linkedin_msg_{uuid4()}",
+                    "event_id": content_event_id("linkedin_msg", ts, actor, details),
                     "timestamp": ts,
-                    "actor": row.get("From") or "unknown",
+                    "actor": actor,
                     "action": "message",
-                    "details": {
-                        "to": row.get("To"),
-                        "text": row.get("Message", ""),
-                    },
+                    "details": details,
                 }
                 validate_story(event)
-                events.append(event)
-        return events
+                yield event
 
-    def _load_profile_updates(self) -> List[Dict]:
+    def _iter_profile_updates(self) -> Iterator[Dict]:
         path = self.export_dir / "profile_updates.json"
         if not path.exists():
-            return []
+            return
         with open(path, "r", encoding="utf-8") as fh:
             raw_items = json.load(fh)
-        events: List[Dict] = []
         for item in raw_items:
             ts = self._parse_ts(item.get("timestamp"))
             if not ts:
                 continue
+            details = {"update": item.get("update"), "location": item.get("location")}
             event = {
-                "event_id": f"linkedin_profile_{uuid4()}",
+                "event_id": content_event_id("linkedin_profile", ts, "user", details),
                 "timestamp": ts,
                 "actor": "user",
                 "action": "profile_update",
-                "details": {
-                    "update": item.get("update"),
-                    "location": item.get("location"),
-                },
+                "details": details,
             }
             validate_story(event)
-            events.append(event)
-        return events
+            yield event
 
-    def _load_posts(self) -> List[Dict]:
+    def _iter_posts(self) -> Iterator[Dict]:
         path = self.export_dir / "posts.json"
         if not path.exists():
-            return []
+            return
         with open(path, "r", encoding="utf-8") as fh:
             raw_items = json.load(fh)
-        events: List[Dict] = []
         for item in raw_items:
             ts = self._parse_ts(item.get("timestamp"))
             if not ts:
                 continue
+            details = {"text": item.get("text"), "url": item.get("url")}
             event = {
-                "event_id": f"linkedin_post_{uuid4()}",
+                "event_id": content_event_id("linkedin_post", ts, "user", details),
                 "timestamp": ts,
                 "actor": "user",
                 "action": "post",
-                "details": {
-                    "text": item.get("text"),
-                    "url": item.get("url"),
-                },
+                "details": details,
             }
             validate_story(event)
-            events.append(event)
-        return events
+            yield event
 
     @staticmethod
     def _parse_ts(ts: str | None) -> str | None:
@@ -0,0 +1,81 @@
+"""Incremental reading of large JSON arrays.
+
+Location exports are a single JSON object holding one huge array
+(``{"locations": [...]}``). :func:`iter_json_array` reads the file in chunks
+and decodes one array element at a time with :meth:`json.JSONDecoder.raw_decode`,
+so only the current chunk and element are held in memory.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import IO, Any, Iterator
+
+CHUNK_SIZE = 1 << 20
+_WHITESPACE = " \t\r\n"
+
+
+def iter_json_array(
+    fh: IO[str], key: str, *, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Any]:
+    """Yield the elements of the array stored under ``key`` in ``fh``.
+
+    The first occurrence of ``"key": [`` in the document is used, which for
+    exports such as ``Records.json`` is the top-level array. Nothing is
+    yielded when the key is absent.
+
+    Raises
+    ------
+    json.JSONDecodeError
+        If an element is malformed or the array is truncated.
+    """
+
+    opener = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    decoder = json.JSONDecoder()
+    keep = len(key) + 64
+
+    buf = ""
+    eof = False
+    while True:
+        match = opener.search(buf)
+        if match is not None:
+            pos = match.end()
+            break
+        if eof:
+            return
+        chunk = fh.read(chunk_size)
+        eof = not chunk
+        # Retain a tail in case the key straddles two chunks.
+        buf = buf[-keep:] + chunk
+
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        if pos < len(buf) and buf[pos] == ",":
+            pos += 1
+            continue
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        if pos < len(buf):
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # A scalar ending at the buffer edge may continue in the
+                # next chunk; objects and arrays are always complete.
+                if end < len(buf) or eof or buf[pos] in "{[":
+                    yield item
+                    pos = end
+                    continue
+        elif eof:
+            raise json.JSONDecodeError("Unterminated array", buf, pos)
+        chunk = fh.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+__all__ = ["iter_json_array"]
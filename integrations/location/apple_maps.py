@@ -4,10 +4,10 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
-from uuid import uuid4
+from typing import Dict, Iterator, List, Optional
 import plistlib
 
+from integrations.event_ids import content_event_id
 from tircorder.schemas import validate_story
 
 
@@ -28,15 +28,19 @@ class AppleMapsConnector:
             Story events extracted from the history file.
         """
 
+        return list(self.iter_events(backup_dir))
+
+    def iter_events(self, backup_dir: str | Path) -> Iterator[Dict]:
+        """Yield story events from the maps history in ``backup_dir``."""
+
         history_file = self._find_history_file(Path(backup_dir))
         if history_file is None:
-            return []
+            return
 
         with open(history_file, "rb") as fh:
             raw = plistlib.load(fh)
 
         items = raw.get("historyItems") or raw.get("MSPHistoryItems") or []
-        events: List[Dict] = []
         for item in items:
             if item.get("isPrivate"):
                 continue
@@ -59,17 +63,16 @@ class AppleMapsConnector:
                 if query:
                     details["query"] = query
 
+            timestamp = dt.isoformat()
             event = {
-                "event_id": f"apple_maps_{uuid4()}",
-                "timestamp": dt.isoformat(),
+                "event_id": content_event_id("apple_maps", timestamp, "user", details),
+                "timestamp": timestamp,
                 "actor": "user",
                 "action": action,
                 "details": details,
             }
             validate_story(event)
-            events.append(event)
-
-        return events
+            yield event
 
     def _find_history_file(self, root: Path) -> Optional[Path]:
         """Locate the maps history file within ``root``."""
@@ -1,18 +1,92 @@
-"""Parse Google Maps location history exports."""
+"""Parse Google Maps location history exports.
+
+``Location History.json``/``Records.json`` exports can hold tens of millions
+of fixes. They are read incrementally, and :meth:`GoogleMapsConnector.load_columns`
+returns them as NumPy columns so analytics never build a dict per point; only
+points that reach the story timeline are turned into events.
+"""
 
 from __future__ import annotations
 
 import json
+from array import array
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
-from uuid import uuid4
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from integrations.event_ids import content_event_id
+from tircorder.schemas import FULL_VALIDATION, StoryCheck, StoryValidationPolicy
+
+from ._json_stream import iter_json_array
+
+MISSING_ACCURACY = -1
+
+
+class LocationPoint(NamedTuple):
+    """A single raw fix from a location history export."""
+
+    timestamp_ms: int
+    lat_e7: int
+    lon_e7: int
+    accuracy: int
+    source: str
+
+
+@dataclass
+class LocationColumns:
+    """Columnar location history.
+
+    Attributes
+    ----------
+    timestamp_ms:
+        ``int64`` milliseconds since the epoch (UTC).
+    lat_e7, lon_e7:
+        ``int32`` coordinates in degrees * 1e7.
+    accuracy:
+        ``int32`` accuracy in metres, ``MISSING_ACCURACY`` when absent.
+    source_code:
+        ``int16`` index into ``sources`` for each point.
+    sources:
+        Distinct ``source`` values in order of first appearance.
+    """
+
+    timestamp_ms: np.ndarray
+    lat_e7: np.ndarray
+    lon_e7: np.ndarray
+    accuracy: np.ndarray
+    source_code: np.ndarray
+    sources: List[str]
 
-from tircorder.schemas import validate_story
+    def __len__(self) -> int:
+        return int(self.timestamp_ms.shape[0])
+
+    @property
+    def lat(self) -> np.ndarray:
+        return self.lat_e7 / 1e7
+
+    @property
+    def lon(self) -> np.ndarray:
+        return self.lon_e7 / 1e7
 
 
 class GoogleMapsConnector:
-    """Normalize Google Maps Takeout location history."""
+    """Normalize Google Maps Takeout location history.
+
+    Parameters
+    ----------
+    validation:
+        Story validation policy for the generated events. Invalid events are
+        dropped. Every event is validated by default; pass
+        :data:`~tircorder.schemas.TRUSTED_CONNECTOR` to check only the first
+        events of an export and a random sample after that.
+    """
+
+    def __init__(self, validation: StoryValidationPolicy = FULL_VALIDATION) -> None:
+        self.validation = validation
+        self._check_story = StoryCheck(validation)
 
     def load(self, path: str | Path) -> List[Dict]:
         """Load events from a Takeout export.
@@ -28,35 +102,132 @@ class GoogleMapsConnector:
             Story events with ``timestamp``, ``lat``, ``lon`` and ``place`` details.
         """
 
+        return list(self.iter_events(path))
+
+    def iter_events(self, path: str | Path) -> Iterator[Dict]:
+        """Yield events from a Takeout export one record at a time."""
+
+        p = Path(path)
+        self._check_story = StoryCheck(self.validation)
+        if p.is_dir():
+            return self._iter_semantic(p)
+        return self._iter_location_history(p)
+
+    def iter_points(
+        self,
+        path: str | Path,
+        *,
+        since_ms: Optional[int] = None,
+        until_ms: Optional[int] = None,
+    ) -> Iterator[LocationPoint]:
+        """Yield raw fixes from ``Location History.json``/``Records.json``.
+
+        The file is parsed incrementally. Points outside
+        ``[since_ms, until_ms)`` or lacking a timestamp or coordinates are
+        skipped.
+        """
+
+        with open(path, "r", encoding="utf-8") as fh:
+            for item in iter_json_array(fh, "locations"):
+                point = _parse_point(item)
+                if point is None:
+                    continue
+                if since_ms is not None and point.timestamp_ms < since_ms:
+                    continue
+                if until_ms is not None and point.timestamp_ms >= until_ms:
+                    continue
+                yield point
+
+    def load_columns(
+        self,
+        path: str | Path,
+        *,
+        since_ms: Optional[int] = None,
+        until_ms: Optional[int] = None,
+    ) -> LocationColumns:
+        """Load a location history export into NumPy columns."""
+
+        timestamps = array("q")
+        lats = array("i")
+        lons = array("i")
+        accuracies = array("i")
+        codes = array("h")
+        source_index: Dict[str, int] = {}
+        for point in self.iter_points(path, since_ms=since_ms, until_ms=until_ms):
+            timestamps.append(point.timestamp_ms)
+            lats.append(point.lat_e7)
+            lons.append(point.lon_e7)
+            accuracies.append(point.accuracy)
+            code = source_index.get(point.source)
+            if code is None:
+                code = source_index[point.source] = len(source_index)
+            codes.append(code)
+        return LocationColumns(
+            timestamp_ms=np.frombuffer(timestamps, dtype=np.int64),
+            lat_e7=np.frombuffer(lats, dtype=np.int32),
+            lon_e7=np.frombuffer(lons, dtype=np.int32),
+            accuracy=np.frombuffer(accuracies, dtype=np.int32),
+            source_code=np.frombuffer(codes, dtype=np.int16),
+            sources=list(source_index),
+        )
+
+    def events_from_columns(
+        self, columns: LocationColumns, mask: Optional[np.ndarray] = None
+    ) -> Iterator[Dict]:
+        """Yield story events for the points selected by ``mask``.
+
+        ``mask`` may be a boolean array or an index array; all points are
+        used when it is omitted.
+        """
+
+        indices = np.arange(len(columns)) if mask is None else np.asarray(mask)
+        if indices.dtype == bool:
+            indices = np.flatnonzero(indices)
+        for i in indices.tolist():
+            event = self._build_event(
+                int(columns.timestamp_ms[i]),
+                int(columns.lat_e7[i]),
+                int(columns.lon_e7[i]),
+                columns.sources[columns.source_code[i]],
+            )
+            if event:
+                yield event
+
+    def load_summarised(self, path: str | Path, **kwargs) -> List[Dict]:
+        """Return stay and trip events instead of one event per fix.
+
+        ``Location History.json`` files go through :meth:`load_columns`;
+        semantic history folders have their per-point events summarised.
+        Keyword arguments are forwarded to
+        :func:`integrations.location.trajectory.summarise_points`.
+        """
+
+        from .trajectory import summarise_location_events, summarise_points
+
+        kwargs.setdefault("source", "google_maps")
         p = Path(path)
         if p.is_dir():
-            return self._load_semantic(p)
-        return self._load_location_history(p)
+            return summarise_location_events(self._iter_semantic(p), **kwargs)
+        columns = self.load_columns(p)
+        return summarise_points(
+            columns.timestamp_ms, columns.lat, columns.lon, **kwargs
+        )
 
     # ------------------------------------------------------------------
-    def _load_location_history(self, file_path: Path) -> List[Dict]:
+    def _iter_location_history(self, file_path: Path) -> Iterator[Dict]:
         """Parse ``Location History.json`` exports."""
 
-        with open(file_path, "r", encoding="utf-8") as fh:
-            data = json.load(fh)
-
-        events: List[Dict] = []
-        for item in data.get("locations", []):
+        for point in self.iter_points(file_path):
             event = self._build_event(
-                item.get("timestampMs"),
-                item.get("latitudeE7"),
-                item.get("longitudeE7"),
-                item.get("source", ""),
+                point.timestamp_ms, point.lat_e7, point.lon_e7, point.source
             )
             if event:
-                events.append(event)
-        return events
+                yield event
 
     # ------------------------------------------------------------------
-    def _load_semantic(self, folder: Path) -> List[Dict]:
+    def _iter_semantic(self, folder: Path) -> Iterator[Dict]:
         """Parse ``Semantic Location History`` directories."""
 
-        events: List[Dict] = []
         for json_file in sorted(folder.glob("**/*.json")):
             try:
                 with open(json_file, "r", encoding="utf-8") as fh:
@@ -75,7 +246,7 @@ class GoogleMapsConnector:
                         loc.get("name", ""),
                     )
                     if event:
-                        events.append(event)
+                        yield event
                 elif "activitySegment" in obj:
                     seg = obj["activitySegment"]
                     dur = seg.get("duration", {})
@@ -88,7 +259,7 @@ class GoogleMapsConnector:
                         start.get("name", ""),
                     )
                     if event:
-                        events.append(event)
+                        yield event
                     event_end = self._build_event(
                         dur.get("endTimestampMs"),
                         end.get("latitudeE7"),
@@ -96,7 +267,7 @@ class GoogleMapsConnector:
                         end.get("name", ""),
                     )
                     if event_end:
-                        events.append(event_end)
+                        yield event_end
                     for point in seg.get("waypointPath", {}).get("points", []):
                         wp_event = self._build_event(
                             dur.get("startTimestampMs"),
@@ -105,8 +276,7 @@ class GoogleMapsConnector:
                             "",
                         )
                         if wp_event:
-                            events.append(wp_event)
-        return events
+                            yield wp_event
 
     # ------------------------------------------------------------------
     def _build_event(
@@ -126,15 +296,51 @@ class GoogleMapsConnector:
             lon = int(lon_e7) / 1e7
         except (ValueError, TypeError):
             return None
+        timestamp = dt.isoformat() + "+00:00"
+        details = {"lat": lat, "lon": lon, "place": place}
         event = {
-            "event_id": f"google_maps_{uuid4()}",
-            "timestamp": dt.isoformat() + "+00:00",
+            "event_id": content_event_id("google_maps", timestamp, "user", details),
+            "timestamp": timestamp,
             "actor": "user",
             "action": "location",
-            "details": {"lat": lat, "lon": lon, "place": place},
+            "details": details,
         }
         try:
-            validate_story(event)
+            self._check_story(event)
         except Exception:
             return None
         return event
+
+
+def _parse_point(item: object) -> Optional[LocationPoint]:
+    """Return a :class:`LocationPoint` for a raw export record, if valid."""
+
+    if not isinstance(item, dict):
+        return None
+    try:
+        lat_e7 = int(item["latitudeE7"])
+        lon_e7 = int(item["longitudeE7"])
+        if "timestampMs" in item:
+            timestamp_ms = int(item["timestampMs"])
+        else:
+            # ``Records.json`` (2022+) stores ISO 8601 timestamps.
+            raw = str(item["timestamp"]).replace("Z", "+00:00")
+            timestamp_ms = int(datetime.fromisoformat(raw).timestamp() * 1000)
+    except (KeyError, TypeError, ValueError):
+        return None
+    accuracy = item.get("accuracy")
+    try:
+        accuracy = int(accuracy) if accuracy is not None else MISSING_ACCURACY
+    except (TypeError, ValueError):
+        accuracy = MISSING_ACCURACY
+    return LocationPoint(
+        timestamp_ms, lat_e7, lon_e7, accuracy, str(item.get("source", ""))
+    )
+
+
+__all__ = [
+    "GoogleMapsConnector",
+    "LocationColumns",
+    "LocationPoint",
+    "MISSING_ACCURACY",
+]
@@ -0,0 +1,337 @@
+"""Offline place index and reverse-geocoding for location events.
+
+Places named in the exports themselves (Google Maps place visits, Foursquare
+check-ins, ...) are stored in a SQLite ``places`` table together with a
+geohash of their coordinates. Geohash prefixes of nearby points are shared,
+so "nearest place" and "everything within X metres" become a handful of
+indexed prefix range scans followed by an exact haversine check. No network
+service is used.
+"""
+
+from __future__ import annotations
+
+import math
+import sqlite3
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+DB_PATH = "state.db"
+GEOHASH_PRECISION = 9
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_METRES_PER_DEGREE = 111_320.0
+_EARTH_RADIUS_M = 6_371_008.8
+
+# Google Maps Location History stores the fix source of raw points in
+# ``details.place``; these are not place names. Compared case-insensitively.
+_FIX_SOURCES = frozenset({"GPS", "WIFI", "CELL", "UNKNOWN"})
+
+# (coordinate key, place id key) pairs tagged by ``PlaceIndex.tag_event``.
+_POINT_FIELDS = (
+    ("start_point", "start_place_id"),
+    ("end_point", "end_place_id"),
+    ("pickup_location", "pickup_place_id"),
+    ("dropoff_location", "dropoff_place_id"),
+)
+
+
+def encode_geohash(lat: float, lon: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Return the geohash of ``lat``/``lon`` with ``precision`` characters."""
+
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                value = value * 2 + 1
+                lon_lo = mid
+            else:
+                value *= 2
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                value = value * 2 + 1
+                lat_lo = mid
+            else:
+                value *= 2
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def _cell_size_m(precision: int, lat: float) -> Tuple[float, float]:
+    """Return the (height, width) in metres of a geohash cell at ``lat``."""
+
+    lon_bits = math.ceil(5 * precision / 2)
+    lat_bits = 5 * precision // 2
+    height = 180.0 / 2**lat_bits * _METRES_PER_DEGREE
+    width = 360.0 / 2**lon_bits * _METRES_PER_DEGREE * math.cos(math.radians(lat))
+    return height, width
+
+
+def covering_cells(lat: float, lon: float, radius_m: float) -> List[str]:
+    """Return geohash prefixes whose cells cover a circle of ``radius_m``.
+
+    Uses the finest precision whose cells are at least ``radius_m`` across,
+    so the centre cell and its eight neighbours always contain the circle.
+    """
+
+    precision = 1
+    for candidate in range(GEOHASH_PRECISION, 0, -1):
+        if min(_cell_size_m(candidate, lat)) >= radius_m:
+            precision = candidate
+            break
+    height, width = _cell_size_m(precision, lat)
+    dlat = height / _METRES_PER_DEGREE
+    dlon = width / max(_METRES_PER_DEGREE * math.cos(math.radians(lat)), 1e-9)
+    cells = set()
+    for i in (-1, 0, 1):
+        for j in (-1, 0, 1):
+            plat = min(max(lat + i * dlat, -90.0), 90.0)
+            plon = (lon + j * dlon + 180.0) % 360.0 - 180.0
+            cells.add(encode_geohash(plat, plon, precision))
+    return sorted(cells)
+
+
+def haversine_m(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in metres."""
+
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * _EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _is_fix_source(name: Any) -> bool:
+    return isinstance(name, str) and name.strip().upper() in _FIX_SOURCES
+
+
+def _place_name(details: Mapping[str, Any]) -> Optional[str]:
+    """Return the place name an event's ``details`` carry, if any."""
+
+    name = details.get("place")
+    if _is_fix_source(name):
+        name = None
+    name = name or details.get("venue")
+    return str(name) if name else None
+
+
+def _coords(value: Any) -> Optional[Tuple[float, float]]:
+    if not isinstance(value, Mapping):
+        return None
+    lat = value.get("lat")
+    lon = value.get("lon", value.get("lng"))
+    if isinstance(lat, (int, float)) and isinstance(lon, (int, float)):
+        return float(lat), float(lon)
+    return None
+
+
+@dataclass
+class Place:
+    """A known place and, for query results, its distance from the query."""
+
+    place_id: int
+    name: str
+    lat: float
+    lon: float
+    visits: int = 1
+    distance_m: float = 0.0
+
+
+class PlaceIndex:
+    """SQLite-backed spatial index of places seen in exports.
+
+    Parameters
+    ----------
+    db_path: str, optional
+        Location of the SQLite database file. Use ``":memory:"`` for an
+        in-memory index.
+    merge_radius_m: float, optional
+        Places with the same name closer than this are merged into one.
+    """
+
+    def __init__(self, db_path: str = DB_PATH, merge_radius_m: float = 50.0):
+        self.conn = sqlite3.connect(db_path)
+        self.merge_radius_m = merge_radius_m
+        self._init_db()
+
+    def _init_db(self) -> None:
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS places (
+                place_id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                lat REAL NOT NULL,
+                lon REAL NOT NULL,
+                geohash TEXT NOT NULL,
+                visits INTEGER NOT NULL DEFAULT 1
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_places_geohash ON places(geohash)"
+        )
+        self.conn.commit()
+
+    # ------------------------------------------------------------------
+    def add_place(
+        self, name: str, lat: float, lon: float, *, commit: bool = True
+    ) -> int:
+        """Add a place (or count a visit to an existing one); return its id."""
+
+        for place in self.within(lat, lon, self.merge_radius_m):
+            if place.name == name:
+                self.conn.execute(
+                    "UPDATE places SET visits = visits + 1 WHERE place_id=?",
+                    (place.place_id,),
+                )
+                if commit:
+                    self.conn.commit()
+                return place.place_id
+        cur = self.conn.execute(
+            "INSERT INTO places(name, lat, lon, geohash) VALUES(?, ?, ?, ?)",
+            (name, lat, lon, encode_geohash(lat, lon)),
+        )
+        if commit:
+            self.conn.commit()
+        return int(cur.lastrowid)
+
+    def add_places_from_events(self, events: Iterable[Mapping[str, Any]]) -> int:
+        """Index every event carrying a place name and coordinates.
+
+        Recognises ``details.place`` (Google Maps place visits) and
+        ``details.venue`` (Foursquare). Location fix sources such as ``GPS``
+        or ``wifi``, which raw Location History points carry in
+        ``details.place``, are skipped whatever their case. Returns the number of place
+        observations added.
+        """
+
+        added = 0
+        for event in events:
+            added += self._index_event(event)
+        self.conn.commit()
+        return added
+
+    def _index_event(self, event: Mapping[str, Any]) -> bool:
+        details = event.get("details")
+        if not isinstance(details, Mapping):
+            return False
+        name = _place_name(details)
+        coords = _coords(details)
+        if name and coords:
+            self.add_place(name, *coords, commit=False)
+            return True
+        return False
+
+    # ------------------------------------------------------------------
+    def within(self, lat: float, lon: float, radius_m: float) -> List[Place]:
+        """Return places within ``radius_m`` of a point, nearest first."""
+
+        clauses = []
+        params: List[str] = []
+        for cell in covering_cells(lat, lon, radius_m):
+            clauses.append("(geohash >= ? AND geohash < ?)")
+            params.extend([cell, cell + "{"])
+        rows = self.conn.execute(
+            "SELECT place_id, name, lat, lon, visits FROM places WHERE "
+            + " OR ".join(clauses),
+            params,
+        ).fetchall()
+        found = []
+        for place_id, name, plat, plon, visits in rows:
+            distance = haversine_m(lat, lon, plat, plon)
+            if distance <= radius_m:
+                found.append(Place(place_id, name, plat, plon, visits, distance))
+        found.sort(key=lambda p: p.distance_m)
+        return found
+
+    def nearest(
+        self, lat: float, lon: float, max_distance_m: float = 100.0
+    ) -> Optional[Place]:
+        """Return the closest place within ``max_distance_m`` or ``None``."""
+
+        found = self.within(lat, lon, max_distance_m)
+        return found[0] if found else None
+
+    # ------------------------------------------------------------------
+    def tag_event(
+        self, event: Dict[str, Any], max_distance_m: float = 100.0
+    ) -> Dict[str, Any]:
+        """Add ``place_id`` keys to ``event`` for each coordinate it carries.
+
+        ``details.lat``/``details.lon`` yield ``details.place_id`` (and fill
+        an empty ``details.place`` or replace a location fix source). Waze ``start_point``/``end_point`` and
+        Uber ``pickup_location``/``dropoff_location`` yield
+        ``*_place_id`` keys alongside them. The event is modified in place
+        and returned.
+        """
+
+        details = event.get("details")
+        if isinstance(details, dict):
+            coords = _coords(details)
+            if coords:
+                place = self.nearest(*coords, max_distance_m=max_distance_m)
+                if place is not None:
+                    details["place_id"] = place.place_id
+                    if not _place_name(details):
+                        details["place"] = place.name
+            self._tag_points(details, max_distance_m)
+        self._tag_points(event, max_distance_m)
+        return event
+
+    def _tag_points(self, container: Dict[str, Any], max_distance_m: float) -> None:
+        for source_key, id_key in _POINT_FIELDS:
+            coords = _coords(container.get(source_key))
+            if coords:
+                place = self.nearest(*coords, max_distance_m=max_distance_m)
+                if place is not None:
+                    container[id_key] = place.place_id
+
+    def tag_events(
+        self,
+        events: Iterable[Dict[str, Any]],
+        max_distance_m: float = 100.0,
+        *,
+        learn: bool = False,
+        commit_every: int = 1000,
+    ) -> Iterator[Dict[str, Any]]:
+        """Lazily tag ``events`` with :meth:`tag_event`.
+
+        With ``learn`` the places named by the events themselves are added
+        to the index as they go by, as in :meth:`add_places_from_events`,
+        committing every ``commit_every`` additions and at the end.
+        """
+
+        pending = 0
+        try:
+            for event in events:
+                if learn and self._index_event(event):
+                    pending += 1
+                    if pending >= commit_every:
+                        self.conn.commit()
+                        pending = 0
+                yield self.tag_event(event, max_distance_m)
+        finally:
+            if pending:
+                self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+__all__ = [
+    "Place",
+    "PlaceIndex",
+    "covering_cells",
+    "encode_geohash",
+    "haversine_m",
+]
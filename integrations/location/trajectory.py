@@ -0,0 +1,387 @@
+"""Trajectory simplification and stay-point detection for location fixes.
+
+Location connectors produce one fix per GPS sample, which floods the story
+timeline. This stage groups a time-ordered series of fixes into:
+
+* **stay points** - runs of fixes that remain within ``stay_radius_m`` of
+  their first fix for at least ``min_stay_s`` seconds, summarised by their
+  centroid and time span;
+* **trips** - the movement between stays, simplified with Douglas-Peucker
+  (tolerance ``epsilon_m``) so the route keeps its shape with a fraction of
+  the vertices.
+
+One story event is emitted per stay or trip. Its id is derived from the kind,
+start time and source, so re-summarising a grown history updates the last
+stay or trip in place. When a SQLite connection is given the raw fixes are
+written to the ``location_raw_points`` side table, keyed by the ``event_id``
+of the summary they belong to. Connectors that already emit one event per
+route, such as :class:`~integrations.location.waze.WazeConnector`, use
+:func:`douglas_peucker` and :func:`store_raw_points` directly.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+
+from integrations.event_ids import content_event_id
+from tircorder.schemas import validate_story
+
+EARTH_RADIUS_M = 6_371_008.8
+RAW_POINTS_TABLE = "location_raw_points"
+
+
+@dataclass
+class StayPoint:
+    """Indices ``[start, end)`` of fixes forming a stay."""
+
+    start: int
+    end: int
+
+
+def haversine_m(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray
+) -> np.ndarray:
+    """Great-circle distance in metres between arrays of coordinates."""
+
+    lat1, lon1, lat2, lon2 = (np.radians(a) for a in (lat1, lon1, lat2, lon2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _project(lat: np.ndarray, lon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Equirectangular projection to metres around the mean latitude."""
+
+    scale = np.radians(1.0) * EARTH_RADIUS_M
+    x = lon * scale * np.cos(np.radians(float(np.mean(lat))))
+    y = lat * scale
+    return x, y
+
+
+def douglas_peucker(lat: np.ndarray, lon: np.ndarray, epsilon_m: float) -> np.ndarray:
+    """Return the indices of the vertices kept by Douglas-Peucker.
+
+    The first and last fixes are always kept. Distances for each split are
+    computed for the whole segment at once.
+    """
+
+    n = len(lat)
+    if n <= 2:
+        return np.arange(n)
+    x, y = _project(np.asarray(lat, float), np.asarray(lon, float))
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        dx, dy = x[last] - x[first], y[last] - y[first]
+        px, py = x[first + 1 : last] - x[first], y[first + 1 : last] - y[first]
+        length = np.hypot(dx, dy)
+        if length == 0.0:
+            dist = np.hypot(px, py)
+        else:
+            dist = np.abs(dx * py - dy * px) / length
+        idx = int(np.argmax(dist))
+        if dist[idx] > epsilon_m:
+            split = first + 1 + idx
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return np.flatnonzero(keep)
+
+
+def detect_stay_points(
+    timestamp_ms: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+    *,
+    stay_radius_m: float = 200.0,
+    min_stay_s: float = 600.0,
+) -> List[StayPoint]:
+    """Find stays in time-ordered fixes.
+
+    A stay starts at fix ``i`` and extends while fixes stay within
+    ``stay_radius_m`` of it; it is kept when it lasts at least
+    ``min_stay_s``. Distances from each anchor are computed in vectorised
+    windows that grow until a fix leaves the radius.
+    """
+
+    n = len(timestamp_ms)
+    stays: List[StayPoint] = []
+    min_stay_ms = min_stay_s * 1000.0
+    i = 0
+    while i < n - 1:
+        window = 64
+        while True:
+            stop = min(n, i + 1 + window)
+            dist = haversine_m(lat[i], lon[i], lat[i + 1 : stop], lon[i + 1 : stop])
+            outside = np.flatnonzero(dist > stay_radius_m)
+            if outside.size or stop == n:
+                break
+            window *= 4
+        end = i + 1 + int(outside[0]) if outside.size else n
+        if timestamp_ms[end - 1] - timestamp_ms[i] >= min_stay_ms:
+            stays.append(StayPoint(i, end))
+            i = end
+        else:
+            i += 1
+    return stays
+
+
+def ensure_raw_points_schema(conn: sqlite3.Connection) -> None:
+    """Ensure the ``location_raw_points`` side table exists."""
+    conn.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {RAW_POINTS_TABLE} (
+            event_id TEXT NOT NULL,
+            timestamp_ms INTEGER NOT NULL,
+            lat_e7 INTEGER NOT NULL,
+            lon_e7 INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE INDEX IF NOT EXISTS idx_{RAW_POINTS_TABLE}_event
+        ON {RAW_POINTS_TABLE}(event_id, timestamp_ms)
+        """
+    )
+
+
+def store_raw_points(
+    conn: sqlite3.Connection,
+    event_id: str,
+    timestamp_ms: np.ndarray,
+    lat: np.ndarray,
+    lon: np.ndarray,
+) -> None:
+    """Replace the fixes stored for ``event_id``; the caller commits.
+
+    The schema must already exist, see :func:`ensure_raw_points_schema`.
+    """
+    conn.execute(f"DELETE FROM {RAW_POINTS_TABLE} WHERE event_id=?", (event_id,))
+    conn.executemany(
+        f"INSERT INTO {RAW_POINTS_TABLE} "
+        "(event_id, timestamp_ms, lat_e7, lon_e7) VALUES (?, ?, ?, ?)",
+        zip(
+            [event_id] * len(timestamp_ms),
+            np.asarray(timestamp_ms, dtype=np.int64).tolist(),
+            np.rint(np.asarray(lat) * 1e7).astype(np.int64).tolist(),
+            np.rint(np.asarray(lon) * 1e7).astype(np.int64).tolist(),
+        ),
+    )
+
+
+def load_raw_points(
+    conn: sqlite3.Connection, event_id: str
+) -> List[Tuple[int, float, float]]:
+    """Return ``(timestamp_ms, lat, lon)`` fixes stored for ``event_id``."""
+    rows = conn.execute(
+        f"SELECT timestamp_ms, lat_e7, lon_e7 FROM {RAW_POINTS_TABLE} "
+        "WHERE event_id=? ORDER BY timestamp_ms",
+        (event_id,),
+    ).fetchall()
+    return [(ts, lat / 1e7, lon / 1e7) for ts, lat, lon in rows]
+
+
+def _iso(ms: float) -> str:
+    return datetime.fromtimestamp(ms / 1000.0, tz=timezone.utc).isoformat()
+
+
+def summarise_points(
+    timestamp_ms: Iterable[int],
+    lat: Iterable[float],
+    lon: Iterable[float],
+    *,
+    source: str = "location",
+    stay_radius_m: float = 200.0,
+    min_stay_s: float = 600.0,
+    epsilon_m: float = 25.0,
+    conn: Optional[sqlite3.Connection] = None,
+) -> List[Dict[str, Any]]:
+    """Collapse raw fixes into stay and trip story events.
+
+    Parameters
+    ----------
+    timestamp_ms, lat, lon:
+        Fix times in epoch milliseconds and coordinates in degrees. They are
+        sorted by time before processing.
+    source:
+        Recorded in each event's details.
+    stay_radius_m, min_stay_s:
+        Stay-point thresholds, see :func:`detect_stay_points`.
+    epsilon_m:
+        Douglas-Peucker tolerance used for trip paths.
+    conn:
+        Optional SQLite connection receiving raw fixes in
+        ``location_raw_points``. The caller commits.
+
+    Returns
+    -------
+    list of dict
+        ``stay`` and ``trip`` events in chronological order.
+    """
+
+    ts = np.asarray(timestamp_ms, dtype=np.int64)
+    lat_arr = np.asarray(lat, dtype=float)
+    lon_arr = np.asarray(lon, dtype=float)
+    order = np.argsort(ts, kind="stable")
+    ts, lat_arr, lon_arr = ts[order], lat_arr[order], lon_arr[order]
+    n = len(ts)
+    if n == 0:
+        return []
+
+    stays = detect_stay_points(
+        ts, lat_arr, lon_arr, stay_radius_m=stay_radius_m, min_stay_s=min_stay_s
+    )
+
+    # Alternate trips and stays covering every fix exactly once.
+    spans: List[Tuple[str, int, int]] = []
+    cursor = 0
+    for stay in stays:
+        if stay.start > cursor:
+            spans.append(("trip", cursor, stay.start))
+        spans.append(("stay", stay.start, stay.end))
+        cursor = stay.end
+    if cursor < n:
+        spans.append(("trip", cursor, n))
+
+    if conn is not None:
+        ensure_raw_points_schema(conn)
+
+    events: List[Dict[str, Any]] = []
+    for kind, start, end in spans:
+        if kind == "stay":
+            event = {
+                "event_id": content_event_id(
+                    "location_stay", _iso(ts[start]), "user", {"source": source}
+                ),
+                "timestamp": _iso(ts[start]),
+                "actor": "user",
+                "action": "stay",
+                "details": {
+                    "lat": float(lat_arr[start:end].mean()),
+                    "lon": float(lon_arr[start:end].mean()),
+                    "start": _iso(ts[start]),
+                    "end": _iso(ts[end - 1]),
+                    "duration_s": int((ts[end - 1] - ts[start]) // 1000),
+                    "point_count": end - start,
+                    "source": source,
+                },
+            }
+        else:
+            # Anchor the path on the neighbouring stays so routes connect.
+            lo, hi = max(start - 1, 0), min(end + 1, n)
+            path_idx = lo + douglas_peucker(lat_arr[lo:hi], lon_arr[lo:hi], epsilon_m)
+            steps = haversine_m(
+                lat_arr[lo : hi - 1],
+                lon_arr[lo : hi - 1],
+                lat_arr[lo + 1 : hi],
+                lon_arr[lo + 1 : hi],
+            )
+            event = {
+                "event_id": content_event_id(
+                    "location_trip", _iso(ts[lo]), "user", {"source": source}
+                ),
+                "timestamp": _iso(ts[lo]),
+                "actor": "user",
+                "action": "trip",
+                "details": {
+                    "start": _iso(ts[lo]),
+                    "end": _iso(ts[hi - 1]),
+                    "duration_s": int((ts[hi - 1] - ts[lo]) // 1000),
+                    "distance_m": float(steps.sum()),
+                    "path": [
+                        [float(lat_arr[i]), float(lon_arr[i])]
+                        for i in path_idx.tolist()
+                    ],
+                    "point_count": end - start,
+                    "source": source,
+                },
+            }
+        if conn is not None:
+            event["details"]["raw_points_table"] = RAW_POINTS_TABLE
+            store_raw_points(
+                conn,
+                event["event_id"],
+                ts[start:end],
+                lat_arr[start:end],
+                lon_arr[start:end],
+            )
+        validate_story(event)
+        events.append(event)
+    return events
+
+
+def summarise_location_events(
+    events: Iterable[Dict[str, Any]], **kwargs: Any
+) -> List[Dict[str, Any]]:
+    """Replace per-fix location events with stay and trip summaries.
+
+    Events carrying numeric ``details.lat``/``details.lon`` and a parsable
+    ``timestamp`` are summarised with :func:`summarise_points`; all other
+    events are passed through unchanged. The result is in chronological
+    order, with passed-through events whose timestamp cannot be parsed at
+    the end. Keyword arguments are forwarded.
+    """
+
+    passthrough: List[Tuple[Optional[int], Dict[str, Any]]] = []
+    times: List[int] = []
+    lats: List[float] = []
+    lons: List[float] = []
+    for event in events:
+        details = event.get("details") or {}
+        lat, lon = details.get("lat"), details.get("lon")
+        when = _epoch_ms(event.get("timestamp"))
+        if (
+            when is None
+            or not isinstance(lat, (int, float))
+            or not isinstance(lon, (int, float))
+        ):
+            passthrough.append((when, event))
+            continue
+        times.append(when)
+        lats.append(float(lat))
+        lons.append(float(lon))
+    if not passthrough:
+        return summarise_points(times, lats, lons, **kwargs)
+    merged = passthrough + [
+        (_epoch_ms(event["timestamp"]), event)
+        for event in summarise_points(times, lats, lons, **kwargs)
+    ]
+    merged.sort(key=lambda item: (item[0] is None, item[0] or 0))
+    return [event for _, event in merged]
+
+
+def _epoch_ms(value: Any) -> Optional[int]:
+    """Return an ISO timestamp as epoch ms, naive times taken as UTC."""
+
+    try:
+        when = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return int(when.timestamp() * 1000)
+
+
+__all__ = [
+    "RAW_POINTS_TABLE",
+    "StayPoint",
+    "detect_stay_points",
+    "douglas_peucker",
+    "ensure_raw_points_schema",
+    "haversine_m",
+    "load_raw_points",
+    "store_raw_points",
+    "summarise_location_events",
+    "summarise_points",
+]
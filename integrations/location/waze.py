@@ -3,15 +3,42 @@
 from __future__ import annotations
 
 import json
+import sqlite3
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
-from uuid import uuid4
+from typing import Any, Dict, Iterator, List, Optional
 
+import numpy as np
+
+from integrations.event_ids import content_event_id
 from tircorder.schemas import validate_story
 
+from .trajectory import (
+    RAW_POINTS_TABLE,
+    douglas_peucker,
+    ensure_raw_points_schema,
+    store_raw_points,
+)
+
 
 class WazeConnector:
-    """Parse Waze drive history exports."""
+    """Parse Waze drive history exports.
+
+    Parameters
+    ----------
+    epsilon_m:
+        Douglas-Peucker tolerance for the simplified ``path`` of each drive.
+    conn:
+        Optional SQLite connection receiving every route point in
+        ``location_raw_points``, keyed by the drive's ``event_id``. Points
+        are timed by interpolating between the drive's start and end. The
+        caller commits.
+    """
+
+    def __init__(
+        self, epsilon_m: float = 25.0, conn: Optional[sqlite3.Connection] = None
+    ) -> None:
+        self.epsilon_m = epsilon_m
+        self.conn = conn
 
     def parse_drive_history(self, path: str) -> List[Dict[str, Any]]:
         """Return story events for each drive in the Waze export at ``path``.
@@ -29,14 +56,21 @@ class WazeConnector:
         Notes
         -----
         Drives missing timestamps or distance are skipped. Segments with
-        missing coordinates are ignored when determining start and end points.
+        missing coordinates are ignored when determining start and end points
+        and the route ``path``.
         """
 
+        return list(self.iter_events(path))
+
+    def iter_events(self, path: str) -> Iterator[Dict[str, Any]]:
+        """Yield a story event for each drive in the Waze export at ``path``."""
+
         with open(path, "r", encoding="utf-8") as fh:
             data = json.load(fh)
 
         drives = data.get("drives") or data.get("userTrips") or []
-        events: List[Dict[str, Any]] = []
+        if self.conn is not None:
+            ensure_raw_points_schema(self.conn)
         for drive in drives:
             start = self._parse_time(
                 drive.get("startTime") or drive.get("startTimeMillis")
@@ -48,24 +82,51 @@ class WazeConnector:
 
             duration_s = int((end - start).total_seconds())
             distance_m = float(length)
-            start_point, end_point = self._extract_points(
+            points = self._extract_points(
                 drive.get("segments") or drive.get("path") or []
             )
+            details: Dict[str, Any] = {
+                "distance_m": distance_m,
+                "duration_s": duration_s,
+                "start_point": points[0] if points else None,
+                "end_point": points[-1] if points else None,
+            }
+            # The id predates ``path``; keep it stable across re-imports.
+            event_id = content_event_id(
+                "waze_drive", start.isoformat(), "user", details
+            )
+            if points:
+                self._add_path(event_id, details, points, start, end)
             event: Dict[str, Any] = {
-                "event_id": f"waze_drive_{uuid4()}",
+                "event_id": event_id,
                 "timestamp": start.isoformat(),
                 "actor": "user",
                 "action": "drive",
-                "details": {
-                    "distance_m": distance_m,
-                    "duration_s": duration_s,
-                    "start_point": start_point,
-                    "end_point": end_point,
-                },
+                "details": details,
             }
             validate_story(event)
-            events.append(event)
-        return events
+            yield event
+
+    def _add_path(
+        self,
+        event_id: str,
+        details: Dict[str, Any],
+        points: List[Dict[str, float]],
+        start: datetime,
+        end: datetime,
+    ) -> None:
+        """Add the simplified route to ``details`` and store the raw points."""
+
+        lat = np.array([point["lat"] for point in points], dtype=float)
+        lon = np.array([point["lon"] for point in points], dtype=float)
+        kept = douglas_peucker(lat, lon, self.epsilon_m)
+        details["path"] = [[float(lat[i]), float(lon[i])] for i in kept.tolist()]
+        if self.conn is not None:
+            start_ms = start.timestamp() * 1000
+            end_ms = end.timestamp() * 1000
+            times = np.rint(np.linspace(start_ms, end_ms, len(points)))
+            store_raw_points(self.conn, event_id, times, lat, lon)
+            details["raw_points_table"] = RAW_POINTS_TABLE
 
     @staticmethod
     def _parse_time(value: Any) -> Optional[datetime]:
@@ -85,11 +146,9 @@ class WazeConnector:
         return None
 
     @staticmethod
-    def _extract_points(
-        segments: List[Any],
-    ) -> Tuple[Optional[Dict[str, float]], Optional[Dict[str, float]]]:
-        """Return the first and last valid coordinates from ``segments``."""
-        points = [
+    def _extract_points(segments: List[Any]) -> List[Dict[str, float]]:
+        """Return the valid coordinates from ``segments`` in route order."""
+        return [
             {
                 "lat": seg.get("lat") or seg.get("latitude"),
                 "lon": seg.get("lon") or seg.get("longitude"),
@@ -99,6 +158,3 @@ class WazeConnector:
             and isinstance(seg.get("lat") or seg.get("latitude"), (int, float))
             and isinstance(seg.get("lon") or seg.get("longitude"), (int, float))
         ]
-        if not points:
-            return None, None
-        return points[0], points[-1]
@@ -6,20 +6,14 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
+from tircorder.hashing import sha256_file
+
 
 _TS_PREFIX_ISO_Z_RE = re.compile(r"^(?P<ts>\d{4}-\d{2}-\d{2}T\d{6}Z)(?:[_-].*)?$")
 _TS_PREFIX_DATE_DASH_RE = re.compile(r"^(?P<y>\d{4})-(?P<m>\d{2})-(?P<d>\d{2})(?:[_-].*)?$")
 _TS_PREFIX_DATE_COMPACT_RE = re.compile(r"^(?P<y>\d{4})(?P<m>\d{2})(?P<d>\d{2})(?:[_-].*)?$")
 
 
-def sha256_file(path: str | Path) -> str:
-    h = hashlib.sha256()
-    with Path(path).open("rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
-
 def sha256_text(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
@@ -11,7 +11,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
 
 from tircorder.schemas import validate_story
 
@@ -34,6 +34,9 @@ class DoctorNotesFolderConnector:
     doc_kind: str = "doctor_note"
 
     def load(self, *, collected_at: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return list(self.iter_events(collected_at=collected_at))
+
+    def iter_events(self, *, collected_at: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
         base = Path(self.root)
         if collected_at is None:
             collected_at = datetime.now(timezone.utc)
@@ -46,7 +49,6 @@ class DoctorNotesFolderConnector:
         else:
             files = (p for p in base.glob("*") if p.is_file())
 
-        events: List[Dict[str, Any]] = []
         for path in sorted(files):
             if path.suffix.lower() not in exts:
                 continue
@@ -78,9 +80,7 @@ class DoctorNotesFolderConnector:
                 "details": details,
             }
             validate_story(event)
-            events.append(event)
-
-        return events
+            yield event
 
 
 __all__ = ["DoctorNotesFolderConnector"]
@@ -178,11 +178,13 @@ class FHIRExportConnector:
     hash_salt: str = ""
 
     def load(self, path: str | Path, *, collected_at: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return list(self.iter_events(path, collected_at=collected_at))
+
+    def iter_events(self, path: str | Path, *, collected_at: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
         root = Path(path)
         if collected_at is None:
             collected_at = datetime.now(timezone.utc)
 
-        events: List[Dict[str, Any]] = []
         for resource in _iter_resources(root):
             resource_type = str(resource.get("resourceType") or "Unknown")
             rid = resource.get("id")
@@ -201,8 +203,7 @@ class FHIRExportConnector:
                 "details": details,
             }
             validate_story(event)
-            events.append(event)
-        return events
+            yield event
 
 
 __all__ = ["FHIRExportConnector"]
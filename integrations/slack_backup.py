@@ -1,11 +1,11 @@
 """Parse Slack workspace export archives."""
 
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List
-from uuid import uuid4
+from typing import Dict, Iterator, List, Optional
 
+from integrations.event_ids import content_event_id
 from tircorder.schemas import validate_story
 
 
@@ -22,14 +22,27 @@ class SlackBackupConnector:
         folder and its daily JSON message files. Messages are converted
         into story events compatible with ``story.schema.yaml``.
         """
-        events: List[Dict] = []
+        return list(self.iter_events())
+
+    def iter_events(self, since: Optional[str] = None) -> Iterator[Dict]:
+        """Yield story events one daily message file at a time.
+
+        Event ids are derived from the channel and Slack's ``ts`` message
+        key, so edited messages keep their id. When ``since`` (an ISO
+        timestamp, e.g. a checkpoint's ``last_timestamp``) is given, daily
+        files dated more than a day before it are not opened; the margin
+        covers the workspace and local time zones differing.
+        """
         if not self.export_path.exists():
-            return events
+            return
+        first_day = _page_floor(since)
         for channel_dir in sorted(self.export_path.iterdir()):
             if not channel_dir.is_dir() or channel_dir.name == "files":
                 continue
             channel = channel_dir.name
             for page in sorted(channel_dir.glob("*.json")):
+                if first_day is not None and page.stem < first_day:
+                    continue
                 with page.open("r", encoding="utf-8") as fh:
                     messages = json.load(fh)
                 for msg in messages:
@@ -59,12 +72,25 @@ class SlackBackupConnector:
                     if files:
                         details["files"] = files
                     event = {
-                        "event_id": f"slack_{uuid4()}",
+                        "event_id": content_event_id(
+                            "slack", timestamp, actor, {"channel": channel, "ts": ts}
+                        ),
                         "timestamp": timestamp,
                         "actor": actor,
                         "action": "message",
                         "details": details,
                     }
                     validate_story(event)
-                    events.append(event)
-        return events
+                    yield event
+
+
+def _page_floor(since: Optional[str]) -> Optional[str]:
+    """Return the oldest ``YYYY-MM-DD`` page name to read for ``since``."""
+
+    if not since:
+        return None
+    try:
+        day = datetime.fromisoformat(since.replace("Z", "+00:00")).date()
+    except ValueError:
+        return None
+    return (day - timedelta(days=1)).isoformat()
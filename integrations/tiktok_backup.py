@@ -6,8 +6,8 @@ import json
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Iterable, Iterator, List
-from uuid import uuid4
 
+from integrations.event_ids import content_event_id
 from tircorder.schemas import validate_story
 
 
@@ -58,9 +58,12 @@ class TikTokBackupConnector:
                 }.items()
                 if v
             }
+            timestamp = dt.isoformat()
             event = {
-                "event_id": f"tiktok_video_{uuid4()}",
-                "timestamp": dt.isoformat(),
+                "event_id": content_event_id(
+                    "tiktok_video", timestamp, "user", details
+                ),
+                "timestamp": timestamp,
                 "actor": "user",
                 "action": "watch",
                 "details": details,
@@ -90,9 +93,12 @@ class TikTokBackupConnector:
                 }.items()
                 if v
             }
+            timestamp = dt.isoformat()
             event = {
-                "event_id": f"tiktok_comment_{uuid4()}",
-                "timestamp": dt.isoformat(),
+                "event_id": content_event_id(
+                    "tiktok_comment", timestamp, actor, details
+                ),
+                "timestamp": timestamp,
                 "actor": actor,
                 "action": "comment",
                 "details": details,
@@ -127,9 +133,12 @@ class TikTokBackupConnector:
                     }.items()
                     if v
                 }
+                timestamp = dt.isoformat()
                 event = {
-                    "event_id": f"tiktok_message_{uuid4()}",
-                    "timestamp": dt.isoformat(),
+                    "event_id": content_event_id(
+                        "tiktok_message", timestamp, actor, details
+                    ),
+                    "timestamp": timestamp,
                     "actor": actor,
                     "action": "message",
                     "details": details,
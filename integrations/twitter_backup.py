@@ -5,7 +5,7 @@ from __future__ import annotations
 import json
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
 from tircorder.schemas import validate_story
 
@@ -23,7 +23,7 @@ class TwitterBackupConnector:
     :func:`tircorder.schemas.validate_story`.
     """
 
-    def _load_js(self, path: str) -> List[Dict]:
+    def _load_js(self, path: str | Path) -> List[Dict]:
         """Load a JavaScript data file into a Python object."""
         text = Path(path).read_text(encoding="utf-8")
         start = text.find("[")
@@ -40,10 +40,33 @@ class TwitterBackupConnector:
             dt = datetime.strptime(value, "%a %b %d %H:%M:%S %z %Y")
             return dt.isoformat()
 
+    def iter_events(self, archive_dir: str | Path) -> Iterator[Dict]:
+        """Yield tweets, likes and direct messages from an extracted archive.
+
+        Looks for ``tweets.js``/``tweet.js``, ``like.js`` and
+        ``direct-messages.js`` in ``archive_dir`` or its ``data`` folder.
+        """
+        root = Path(archive_dir)
+        if (root / "data").is_dir():
+            root = root / "data"
+        parsers = (
+            (("tweets.js", "tweet.js"), self.iter_tweets),
+            (("like.js",), self.iter_likes),
+            (("direct-messages.js",), self.iter_messages),
+        )
+        for names, parser in parsers:
+            for name in names:
+                if (root / name).exists():
+                    yield from parser(root / name)
+                    break
+
     def parse_tweets(self, path: str) -> List[Dict]:
         """Parse ``tweet.js`` into story events."""
+        return list(self.iter_tweets(path))
+
+    def iter_tweets(self, path: str | Path) -> Iterator[Dict]:
+        """Yield story events from ``tweet.js``."""
         records = self._load_js(path)
-        events: List[Dict] = []
         for item in records:
             tweet = item.get("tweet", {})
             tweet_id = tweet.get("id") or tweet.get("id_str")
@@ -59,13 +82,15 @@ class TwitterBackupConnector:
                 "details": {"id": tweet_id, "text": text},
             }
             validate_story(event)
-            events.append(event)
-        return events
+            yield event
 
     def parse_likes(self, path: str) -> List[Dict]:
         """Parse ``like.js`` into story events."""
+        return list(self.iter_likes(path))
+
+    def iter_likes(self, path: str | Path) -> Iterator[Dict]:
+        """Yield story events from ``like.js``."""
         records = self._load_js(path)
-        events: List[Dict] = []
         for item in records:
             like = item.get("like", {})
             tweet_id = like.get("tweetId")
@@ -82,13 +107,15 @@ class TwitterBackupConnector:
                 "details": {"tweet_id": tweet_id, "text": text, "url": url},
             }
             validate_story(event)
-            events.append(event)
-        return events
+            yield event
 
     def parse_messages(self, path: str) -> List[Dict]:
         """Parse direct message archives into story events."""
+        return list(self.iter_messages(path))
+
+    def iter_messages(self, path: str | Path) -> Iterator[Dict]:
+        """Yield story events from a direct message archive."""
         records = self._load_js(path)
-        events: List[Dict] = []
         for conv in records:
             dm_conv = conv.get("dmConversation", {})
             conv_id = dm_conv.get("conversationId")
@@ -108,5 +135,4 @@ class TwitterBackupConnector:
                     "details": {"conversation_id": conv_id, "text": text},
                 }
                 validate_story(event)
-                events.append(event)
-        return events
+                yield event
@@ -1,4 +1,12 @@
-"""Parse WhatsApp chat exports into story events."""
+"""Parse WhatsApp chat exports into story events.
+
+Plain-text exports use one date format throughout, chosen by the phone's
+locale. :func:`detect_text_format` sniffs it from the first lines of a file
+and the parser then matches every line against a single compiled regex for
+that format, building timestamps from the captured fields instead of trying
+each ``strptime`` pattern in turn. Lines that do not start a new message are
+continuation lines of the previous, multi-line message.
+"""
 
 from __future__ import annotations
 
@@ -6,8 +14,24 @@ import json
 import re
 from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Set
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from integrations.checkpoints import Checkpoint
+from integrations.event_ids import EventIdMinter
 
 
 TIMESTAMP_PATTERNS = [
@@ -25,6 +49,31 @@ TIMESTAMP_PATTERNS = [
     "%Y-%m-%d %H:%M",
 ]
 
+# Number of leading lines inspected by :func:`detect_text_format`.
+SNIFF_LINES = 50
+
+# Bytes read at a time when the sniffed lines leave the day and month order
+# ambiguous.
+SNIFF_BLOCK = 1 << 20
+
+# Used when no known format matches the sniffed lines.
+_GENERIC_LINE = re.compile(r"^(?P<ts>[^-]+) - (?P<rest>.+)$")
+# A JSON export is an object with string keys or an array of message objects;
+# iOS text exports also start with "[" but are followed by a date.
+_JSON_START = re.compile(rb"^(?:\{\s*[\"}]|\[\s*[{\]])")
+
+_DIRECTIVES = {
+    "d": r"(?P<d>\d{1,2})",
+    "m": r"(?P<m>\d{1,2})",
+    "y": r"(?P<y>\d{2})",
+    "Y": r"(?P<Y>\d{4})",
+    "H": r"(?P<H>\d{1,2})",
+    "I": r"(?P<I>\d{1,2})",
+    "M": r"(?P<M>\d{2})",
+    "S": r"(?P<S>\d{2})",
+    "p": r"(?P<p>[AaPp][Mm])",
+}
+
 
 @dataclass
 class WhatsAppBackupConnector:
@@ -34,11 +83,13 @@ class WhatsAppBackupConnector:
     mobile app and simple JSON structures. Each parsed message becomes a
     dictionary with the keys required by the project-wide ``story`` schema.
     ``participants`` contains the set of distinct senders encountered during
-    parsing which is useful for group chats.
+    parsing which is useful for group chats. ``checkpoint`` tracks how far a
+    text export has been read, see :meth:`iter_events`.
     """
 
     chat_name: Optional[str] = None
     participants: Set[str] = field(default_factory=set)
+    checkpoint: Optional[Checkpoint] = None
 
     def parse(self, filepath: str | Path) -> List[Dict[str, Any]]:
         """Return story events from a WhatsApp export at *filepath*.
@@ -50,47 +101,119 @@ class WhatsAppBackupConnector:
             or JSON. The format is detected automatically.
         """
 
+        return list(self.iter_events(filepath))
+
+    def iter_events(self, filepath: str | Path) -> Iterator[Dict[str, Any]]:
+        """Yield story events from a WhatsApp export at *filepath*.
+
+        Plain-text exports are read line by line; JSON exports, recognised
+        by their first bytes, are loaded as a single document.
+
+        For text exports ``checkpoint`` is updated as messages are yielded.
+        Passing the saved checkpoint of an earlier run resumes parsing near
+        the end of the previous import when the file has only grown: the
+        messages of the last imported minute are yielded again, with the
+        same ids, followed by anything new. Otherwise the whole file is
+        parsed.
+        """
+
         path = Path(filepath)
-        content = path.read_text(encoding="utf-8")
-        try:
-            data = json.loads(content)
-        except json.JSONDecodeError:
-            return self._parse_text(content.splitlines())
-        return self._parse_json(data)
+        with path.open("rb") as fh:
+            head = fh.read(64).lstrip(b"\xef\xbb\xbf \t\r\n")
+            fh.seek(0)
+            if _JSON_START.match(head):
+                try:
+                    data = json.load(fh)
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    fh.seek(0)
+                else:
+                    yield from self._parse_json(data)
+                    return
+            yield from self._parse_text(fh, str(path.resolve()))
 
     # ------------------------------------------------------------------
-    def _parse_text(self, lines: Iterable[str]) -> List[Dict[str, Any]]:
-        """Parse text export lines into story events."""
-
-        events: List[Dict[str, Any]] = []
-        pattern = re.compile(r"^(?P<ts>[^-]+) - (?P<rest>.+)$")
-        for idx, line in enumerate(lines, 1):
-            line = line.strip()
-            if not line:
-                continue
-            match = pattern.match(line)
-            if not match:
+    def _parse_text(self, fh: BinaryIO, file_key: str) -> Iterator[Dict[str, Any]]:
+        """Parse a text export into story events.
+
+        The date format is detected from the first :data:`SNIFF_LINES`
+        lines of the file, reading on when those cannot tell day-first and
+        month-first dates apart. A message is emitted once the line starting
+        the next one (or the end of the file) has been read, so continuation
+        lines can be appended to it.
+        """
+
+        text_format = _compile_format(_sniff_format(fh) or "")
+        start = self._resume_offset(fh, file_key, text_format)
+        fh.seek(start)
+
+        mint = EventIdMinter()
+        group: Optional[tuple] = None
+        pending: Optional[tuple] = None
+        for offset, raw in _iter_lines(fh, start):
+            header = _match_header(raw.strip().lstrip("\ufeff"), text_format)
+            if header is None:
+                if pending is not None:
+                    pending[-1].append(raw.rstrip("\r\n"))
                 continue
-            ts_raw = match.group("ts").strip()
-            rest = match.group("rest")
+            if pending is not None:
+                yield self._emit(mint, file_key, *pending)
+            timestamp, rest = header
+            if group is None or group[0] != timestamp:
+                group = (timestamp, offset)
             if ": " in rest:
                 sender, message = rest.split(": ", 1)
             else:
                 sender, message = "system", rest
-            timestamp = _parse_timestamp(ts_raw)
-            event = _build_event(idx, timestamp, sender, message, self.chat_name)
-            events.append(event)
-            if sender != "system":
-                self.participants.add(sender)
-        return events
+            pending = (group[1], timestamp, sender, [message])
+        if pending is not None:
+            yield self._emit(mint, file_key, *pending)
+
+    def _resume_offset(
+        self, fh: BinaryIO, file_key: str, text_format: Optional[_TextFormat]
+    ) -> int:
+        """Return the checkpoint offset if it still starts the same message."""
+
+        checkpoint = self.checkpoint
+        if (
+            checkpoint is None
+            or checkpoint.last_file != file_key
+            or not checkpoint.last_offset
+            or not checkpoint.last_timestamp
+        ):
+            return 0
+        fh.seek(checkpoint.last_offset)
+        try:
+            line = fh.readline().decode("utf-8")
+        except UnicodeDecodeError:
+            return 0
+        header = _match_header(line.strip(), text_format)
+        if header is None or header[0].isoformat() != checkpoint.last_timestamp:
+            return 0
+        return checkpoint.last_offset
+
+    def _emit(
+        self,
+        mint: EventIdMinter,
+        file_key: str,
+        group_offset: int,
+        timestamp: datetime,
+        sender: str,
+        parts: List[str],
+    ) -> Dict[str, Any]:
+        if sender != "system":
+            self.participants.add(sender)
+        message = parts[0] if len(parts) == 1 else "\n".join(parts).rstrip()
+        event = _build_event(mint, timestamp, sender, message, self.chat_name)
+        self.checkpoint = Checkpoint(event["timestamp"], file_key, group_offset)
+        return event
 
     # ------------------------------------------------------------------
-    def _parse_json(self, data: Any) -> List[Dict[str, Any]]:
+    def _parse_json(self, data: Any) -> Iterator[Dict[str, Any]]:
         """Parse JSON exports into story events."""
 
+        mint = EventIdMinter()
         messages = data.get("messages", data if isinstance(data, list) else [])
-        events: List[Dict[str, Any]] = []
-        for idx, msg in enumerate(messages, 1):
+        for msg in messages:
             sender = (
                 msg.get("sender") or msg.get("from") or msg.get("author") or "system"
             )
@@ -101,14 +224,197 @@ class WhatsAppBackupConnector:
             if ts_raw is None:
                 continue
             timestamp = _parse_timestamp(ts_raw)
-            event = _build_event(idx, timestamp, sender, text, self.chat_name)
-            events.append(event)
             if sender != "system":
                 self.participants.add(sender)
-        return events
+            yield _build_event(mint, timestamp, sender, text, self.chat_name)
+
+
+def _iter_lines(fh: BinaryIO, offset: int) -> Iterator[Tuple[int, str]]:
+    """Yield ``(byte offset, decoded line)`` pairs from ``fh``."""
+
+    for raw in fh:
+        yield offset, raw.decode("utf-8")
+        offset += len(raw)
 
 
 # ----------------------------------------------------------------------
+@dataclass(frozen=True)
+class _TextFormat:
+    """A line regex and timestamp builder specialised for one date format."""
+
+    fmt: str
+    pattern: re.Pattern
+    build: Callable[[re.Match[str]], datetime]
+
+
+@lru_cache(maxsize=None)
+def _compile_format(fmt: str) -> Optional[_TextFormat]:
+    """Compile ``"<timestamp> - <rest>"`` line matching for ``fmt``."""
+
+    if not fmt:
+        return None
+    fields = set(re.findall(r"%(.)", fmt))
+    pattern = re.compile("^(?P<ts>" + _format_regex(fmt) + r") - (?P<rest>.+)$")
+
+    def build(match: re.Match[str]) -> datetime:
+        group = match.group
+        if "Y" in fields:
+            year = int(group("Y"))
+        else:
+            # Same pivot as strptime's %y.
+            year = int(group("y"))
+            year += 2000 if year < 69 else 1900
+        if "I" in fields:
+            hour = int(group("I")) % 12
+            if group("p")[0] in "Pp":
+                hour += 12
+        else:
+            hour = int(group("H"))
+        second = int(group("S")) if "S" in fields else 0
+        return datetime(
+            year, int(group("m")), int(group("d")), hour, int(group("M")), second
+        )
+
+    return _TextFormat(fmt, pattern, build)
+
+
+def _format_regex(fmt: str, **overrides: str) -> str:
+    """Return a regex source matching timestamps written as ``fmt``."""
+
+    parts = []
+    for literal, directive in re.findall(r"([^%]*)(?:%(.))?", fmt):
+        # Newer exports put a narrow no-break space before AM/PM.
+        parts.append(re.escape(literal).replace(r"\ ", "[ \u00a0\u202f]"))
+        if directive:
+            parts.append(overrides.get(directive, _DIRECTIVES[directive]))
+    return "".join(parts)
+
+
+@lru_cache(maxsize=None)
+def _late_day_pattern(fmt: str) -> re.Pattern:
+    """Match message headers in ``fmt`` whose day of the month exceeds 12."""
+
+    late_day = _format_regex(fmt, d=r"(?:1[3-9]|[23]\d)")
+    return re.compile(r"^[ \t]*" + late_day + " - ", re.MULTILINE)
+
+
+def detect_text_format(lines: Sequence[str]) -> Optional[str]:
+    """Return the :data:`TIMESTAMP_PATTERNS` entry used by ``lines``.
+
+    Each pattern is scored by how many of ``lines`` start a message with a
+    valid timestamp in that format; the best-scoring pattern wins, with ties
+    going to the earlier entry. Day-first and month-first formats are
+    therefore told apart as soon as one sniffed day exceeds 12. Returns
+    ``None`` when no pattern matches any line.
+    """
+
+    stripped = [line.strip() for line in lines]
+    best, best_score = None, 0
+    for fmt in TIMESTAMP_PATTERNS:
+        score = _score_format(_compile_format(fmt), stripped)
+        if score > best_score:
+            best, best_score = fmt, score
+    return best
+
+
+def _score_format(text_format: _TextFormat, lines: Sequence[str]) -> int:
+    """Return how many of ``lines`` start a message in ``text_format``."""
+
+    score = 0
+    for line in lines:
+        match = text_format.pattern.match(line)
+        if match is None:
+            continue
+        try:
+            text_format.build(match)
+        except ValueError:
+            continue
+        score += 1
+    return score
+
+
+def _sniff_format(fh: BinaryIO) -> Optional[str]:
+    """Return the date format of the text export open as ``fh``.
+
+    The format is detected from the first :data:`SNIFF_LINES` lines. When
+    every sniffed day is 12 or less, the day-first and month-first variants
+    score the same, so the rest of the file is searched, a block at a time,
+    for the first header whose day field only fits one of them. ``fh`` is
+    left at the start of the file.
+    """
+
+    sample = [raw.decode("utf-8") for raw in islice(fh, SNIFF_LINES)]
+    if sample:
+        sample[0] = sample[0].lstrip("\ufeff")
+    fmt = detect_text_format(sample)
+    twin = _day_month_twin(fmt)
+    if twin is not None:
+        stripped = [line.strip() for line in sample]
+        if _score_format(_compile_format(twin), stripped) == _score_format(
+            _compile_format(fmt), stripped
+        ):
+            fmt = _resolve_day_month(fh, fmt, twin)
+    fh.seek(0)
+    return fmt
+
+
+def _resolve_day_month(fh: BinaryIO, fmt: str, twin: str) -> str:
+    """Return whichever of ``fmt`` and ``twin`` first sees a day above 12."""
+
+    found, other = _late_day_pattern(fmt), _late_day_pattern(twin)
+    while True:
+        block = fh.readlines(SNIFF_BLOCK)
+        if not block:
+            return fmt
+        text = b"".join(block).decode("utf-8", errors="replace")
+        ours, theirs = found.search(text), other.search(text)
+        if ours is not None or theirs is not None:
+            if theirs is None or (ours is not None and ours.start() < theirs.start()):
+                return fmt
+            return twin
+
+
+def _day_month_twin(fmt: Optional[str]) -> Optional[str]:
+    """Return ``fmt`` with ``%d`` and ``%m`` swapped, if that is a known format."""
+
+    if not fmt or "%d" not in fmt or "%m" not in fmt:
+        return None
+    twin = fmt.replace("%d", "\0").replace("%m", "%d").replace("\0", "%m")
+    return twin if twin in TIMESTAMP_PATTERNS else None
+
+
+def _match_header(line: str, text_format: Optional[_TextFormat]) -> Optional[tuple]:
+    """Return ``(timestamp, rest)`` if ``line`` starts a message.
+
+    Once a format has been detected only lines in that format start a
+    message; anything else is a continuation line. A line in that format
+    whose date does not fit it is still a header and its timestamp is parsed
+    with :func:`_parse_timestamp`. The generic fallback is used for files
+    whose format could not be detected.
+    """
+
+    if text_format is not None:
+        match = text_format.pattern.match(line)
+        if match is None:
+            return None
+        try:
+            return text_format.build(match), match.group("rest")
+        except ValueError:
+            pass
+        try:
+            return _parse_timestamp(match.group("ts")), match.group("rest")
+        except ValueError:
+            return None
+    match = _GENERIC_LINE.match(line)
+    if match is None:
+        return None
+    try:
+        timestamp = _parse_timestamp(match.group("ts"))
+    except ValueError:
+        return None
+    return timestamp, match.group("rest")
+
+
 def _parse_timestamp(value: Any) -> datetime:
     """Return :class:`datetime` parsed from *value* using common formats."""
 
@@ -127,7 +433,7 @@ def _parse_timestamp(value: Any) -> datetime:
 
 
 def _build_event(
-    idx: int,
+    mint: EventIdMinter,
     timestamp: datetime,
     sender: str,
     message: str,
@@ -140,9 +446,10 @@ def _build_event(
         details["chat"] = chat_name
     if "media omitted" in message.lower():
         details["media_omitted"] = True
+    iso = timestamp.isoformat()
     return {
-        "event_id": f"wa-{idx}",
-        "timestamp": timestamp.isoformat(),
+        "event_id": mint("wa", iso, sender, details),
+        "timestamp": iso,
         "actor": sender,
         "action": "message",
         "details": details,
@@ -6,7 +6,7 @@ events that can be merged with other data sources.
 """
 import json
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
 
 def load_watch_history(path: str) -> List[Dict]:
@@ -25,10 +25,15 @@ def load_watch_history(path: str) -> List[Dict]:
         ``url`` keys.
     """
 
+    return list(iter_watch_history(path))
+
+
+def iter_watch_history(path: str) -> Iterator[Dict]:
+    """Yield watch history events from *path* one at a time."""
+
     with open(path, "r", encoding="utf-8") as fh:
         raw_items = json.load(fh)
 
-    events: List[Dict] = []
     for item in raw_items:
         time_str = item.get("time") or item.get("timestamp")
         if not time_str:
@@ -38,11 +43,8 @@ def load_watch_history(path: str) -> List[Dict]:
         except ValueError:
             # Skip malformed timestamps.
             continue
-        events.append(
-            {
-                "time": dt,
-                "title": item.get("title", ""),
-                "url": item.get("titleUrl"),
-            }
-        )
-    return events
+        yield {
+            "time": dt,
+            "title": item.get("title", ""),
+            "url": item.get("titleUrl"),
+        }
@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+from tircorder.hashing import CACHE_ENV_VAR, FileHashCache, set_default_cache
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _isolated_hash_cache(tmp_path_factory):
+    """Keep tests from writing to the user's ``~/.tircorder`` hash cache."""
+
+    previous = os.environ.get(CACHE_ENV_VAR)
+    cache_dir = tmp_path_factory.mktemp("file_hashes")
+    os.environ[CACHE_ENV_VAR] = str(cache_dir / "file_hashes.sqlite")
+    set_default_cache(FileHashCache(":memory:"))
+    yield
+    set_default_cache(None)
+    if previous is None:
+        os.environ.pop(CACHE_ENV_VAR, None)
+    else:
+        os.environ[CACHE_ENV_VAR] = previous
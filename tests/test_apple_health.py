@@ -24,3 +24,39 @@ def test_load_export_bad_xml(tmp_path):
     connector = AppleHealthConnector()
     with pytest.raises(ValueError):
         connector.load_export(str(bad))
+
+
+def test_iter_events_filters_by_type_and_date():
+    from datetime import datetime
+
+    connector = AppleHealthConnector()
+    path = "tests/data/apple_health_export.xml"
+
+    heart = list(connector.iter_events(path, types=["heart_rate"]))
+    assert [e["action"] for e in heart] == ["heart_rate"]
+
+    by_identifier = connector.load_export(
+        path, types=["HKQuantityTypeIdentifierStepCount", "Workout"]
+    )
+    assert {e["action"] for e in by_identifier} == {"steps", "workout"}
+
+    morning = connector.load_export(
+        path, since=datetime(2024, 5, 1, 6), until=datetime(2024, 5, 1, 10, 5)
+    )
+    assert [e["action"] for e in morning] == ["steps", "workout"]
+
+
+def test_iter_events_streams_large_exports(tmp_path):
+    record = (
+        '<Record type="HKQuantityTypeIdentifierHeartRate" unit="count/min" '
+        'startDate="2024-05-01T10:05:00Z" endDate="2024-05-01T10:05:00Z" '
+        'value="80"><MetadataEntry key="k" value="v"/></Record>\n'
+    )
+    export = tmp_path / "export.xml"
+    export.write_text(
+        "<HealthData>\n" + record * 2000 + "</HealthData>", encoding="utf-8"
+    )
+
+    stream = AppleHealthConnector().iter_events(str(export))
+    assert next(stream)["details"]["bpm"] == 80.0
+    assert sum(1 for _ in stream) == 1999
@@ -0,0 +1,102 @@
+import json
+import stat
+
+import pytest
+
+from tircorder.artifacts import (
+    atomic_write,
+    iter_ndjson,
+    read_ndjson,
+    write_json,
+    write_ndjson,
+)
+from tircorder.sb_adapter import (
+    read_execution_envelope_ndjson,
+    stream_execution_envelope,
+    write_execution_envelope_ndjson,
+)
+
+
+def _transcript(count: int = 3) -> dict:
+    return {
+        "model": "large-v3",
+        "language": "en",
+        "segments": [
+            {"text": f"line {i}", "start": float(i), "end": i + 0.5, "confidence": 0.9}
+            for i in range(count)
+        ],
+    }
+
+
+def test_write_json_is_compact_by_default(tmp_path):
+    target = tmp_path / "nested" / "payload.json"
+    write_json(target, {"a": 1, "b": [1, 2]})
+
+    assert target.read_text(encoding="utf-8") == '{"a":1,"b":[1,2]}'
+    assert list(target.parent.iterdir()) == [target]
+
+
+def test_atomic_write_keeps_previous_file_on_error(tmp_path):
+    target = tmp_path / "payload.json"
+    write_json(target, {"version": 1})
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(target) as handle:
+            handle.write('{"version": 2')
+            raise RuntimeError("interrupted")
+
+    assert json.loads(target.read_text(encoding="utf-8")) == {"version": 1}
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_atomic_write_uses_open_mode_and_keeps_existing_mode(tmp_path):
+    reference = tmp_path / "reference.json"
+    reference.write_text("{}", encoding="utf-8")
+    target = tmp_path / "payload.json"
+    write_json(target, {"version": 1})
+    assert stat.S_IMODE(target.stat().st_mode) == stat.S_IMODE(reference.stat().st_mode)
+
+    target.chmod(0o640)
+    write_json(target, {"version": 2})
+    assert stat.S_IMODE(target.stat().st_mode) == 0o640
+
+
+def test_envelope_ndjson_round_trip_streams_events(tmp_path):
+    envelope, events = stream_execution_envelope(_transcript(), source="whisperx_webui")
+    target = tmp_path / "envelope.ndjson"
+
+    write_execution_envelope_ndjson(target, envelope, events)
+
+    lines = target.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 4
+    assert json.loads(lines[0])["type"] == "execution_envelope"
+
+    header, segments = read_execution_envelope_ndjson(target)
+    assert header == envelope
+    first = next(segments)
+    assert first["type"] == "audio_segment"
+    assert first["data"]["provenance"]["envelope_id"] == envelope["id"]
+    assert [s["data"]["text"] for s in segments] == ["line 1", "line 2"]
+
+
+def test_write_ndjson_consumes_records_lazily(tmp_path):
+    consumed = []
+
+    def records():
+        for i in range(3):
+            consumed.append(i)
+            yield {"i": i}
+
+    target = tmp_path / "records.ndjson"
+    write_ndjson(target, {"header": True}, records())
+
+    assert consumed == [0, 1, 2]
+    assert list(iter_ndjson(target)) == [{"header": True}, {"i": 0}, {"i": 1}, {"i": 2}]
+
+
+def test_read_ndjson_rejects_empty_file(tmp_path):
+    target = tmp_path / "empty.ndjson"
+    target.write_text("", encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        read_ndjson(target)
@@ -2,10 +2,14 @@ from datetime import date, datetime, timedelta
 from tircorder_utils.calendar_utils import (
     get_relative_counts,
     build_day_segments,
+    build_segment_matrix,
+    build_view_segments,
+    count_days,
     _get_date_range,
 )
 from hourly_cache import HourlyEventCache
 
+import numpy as np
 import pytest
 
 
@@ -85,3 +89,51 @@ def test_get_date_range_invalid_view():
 def test_build_day_segments_invalid_resolution():
     with pytest.raises(ValueError):
         build_day_segments([], date.today(), resolution="hour")
+
+
+def test_build_segment_matrix_covers_range_in_one_call():
+    entries = [
+        (datetime(2024, 5, 5, 23, 59), "sms"),  # before the range
+        (datetime(2024, 5, 6, 0, 1), "sms"),
+        (datetime(2024, 5, 6, 0, 1, 30), "email"),
+        (datetime(2024, 5, 8, 23, 59, 59), "sms"),
+        (datetime(2024, 5, 9, 0, 0), "sms"),  # after the range
+    ]
+    matrix = build_segment_matrix(entries, date(2024, 5, 6), date(2024, 5, 8))
+    assert matrix.shape == (3, 24 * 60)
+    assert matrix[0, 1] == 2
+    assert matrix[2, -1] == 1
+    assert matrix.sum() == 3
+
+    per_app = build_segment_matrix(
+        entries, date(2024, 5, 6), date(2024, 5, 8), resolution="second", by_app=True
+    )
+    assert set(per_app) == {"sms", "email"}
+    assert per_app["email"].shape == (3, 86400)
+    assert per_app["email"][0, 90] == 1
+    assert per_app["sms"].sum() == 2
+
+    for day in (date(2024, 5, 6), date(2024, 5, 8)):
+        row = (day - date(2024, 5, 6)).days
+        assert build_day_segments(entries, day) == matrix[row].tolist()
+
+
+def test_view_segments_and_day_counts_accept_datetime64_arrays():
+    stamps = np.array(
+        ["2024-05-06T10:00", "2024-05-06T10:00", "2024-05-12T23:00"],
+        dtype="datetime64[s]",
+    )
+    days, matrix = build_view_segments(
+        stamps, view="week", reference_date=date(2024, 5, 8)
+    )
+    assert days[0] == date(2024, 5, 6) and len(days) == 7
+    assert matrix[0, 600] == 2 and matrix[6, 23 * 60] == 1
+    assert count_days(stamps, date(2024, 5, 6), date(2024, 5, 12)).tolist() == [
+        2,
+        0,
+        0,
+        0,
+        0,
+        0,
+        1,
+    ]
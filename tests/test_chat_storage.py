@@ -106,3 +106,20 @@ def test_ingest_chat_history_persists_events(monkeypatch, memory_conn):
         "SELECT event_id, timestamp, actor, action, details FROM chat_events"
     ).fetchone()
     assert row == ("evt-2", "2024-05-02T15:30:00", "Bob", "message", "Hi there")
+
+
+def test_upsert_chat_events_consumes_iterators(memory_conn):
+    def events():
+        for i in range(3):
+            yield {
+                "event_id": f"e{i}",
+                "timestamp": f"2024-01-0{i + 1}T00:00:00",
+                "actor": "user",
+                "action": "chat_message",
+                "details": {"text": str(i)},
+            }
+
+    assert upsert_chat_events(events(), conn=memory_conn) == 3
+    assert upsert_chat_events(iter(()), conn=memory_conn) == 0
+    count = memory_conn.execute("SELECT COUNT(*) FROM chat_events").fetchone()[0]
+    assert count == 3
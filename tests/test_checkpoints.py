@@ -0,0 +1,56 @@
+import sqlite3
+
+from integrations.checkpoints import Checkpoint, CheckpointStore
+from tircorder.chat_storage import upsert_chat_events
+
+
+def _event(event_id, timestamp):
+    return {
+        "event_id": event_id,
+        "timestamp": timestamp,
+        "actor": "user",
+        "action": "message",
+        "details": {},
+    }
+
+
+def test_checkpoint_round_trip():
+    store = CheckpointStore(":memory:")
+    assert store.get("whatsapp:family") is None
+    store.save("whatsapp:family", Checkpoint("2021-01-01T10:00:00", "/x.txt", 42))
+    assert store.get("whatsapp:family") == Checkpoint(
+        "2021-01-01T10:00:00", "/x.txt", 42
+    )
+    store.reset("whatsapp:family")
+    assert store.get("whatsapp:family") is None
+
+
+def test_new_events_skips_imported_records_and_advances():
+    conn = sqlite3.connect(":memory:")
+    store = CheckpointStore(conn=conn)
+    batch = [_event("a", "2024-01-01T00:00:00Z"), _event("b", "2024-01-02T00:00:00Z")]
+    assert upsert_chat_events(store.new_events("slack", batch), conn=conn) == 2
+    assert store.get("slack") is None
+    assert store.commit("slack").last_timestamp == "2024-01-02T00:00:00Z"
+    assert store.get("slack").last_timestamp == "2024-01-02T00:00:00Z"
+
+    batch.append(_event("c", "2024-01-03T00:00:00+00:00"))
+    written = [e["event_id"] for e in store.new_events("slack", batch)]
+    # The checkpoint instant itself is replayed; older records are skipped.
+    assert written == ["b", "c"]
+    store.commit("slack")
+    assert store.get("slack").last_timestamp == "2024-01-03T00:00:00+00:00"
+
+
+def test_checkpoint_not_advanced_when_write_fails():
+    store = CheckpointStore(":memory:")
+    store.save("slack", Checkpoint("2024-01-01T00:00:00Z"))
+    batch = [_event("a", "2024-01-01T00:00:00Z"), _event("b", "2024-01-02T00:00:00Z")]
+
+    consumed = list(store.new_events("slack", batch))
+    assert len(consumed) == 2
+    # The caller's write failed, so nothing is committed and a rerun replays.
+    store.discard("slack")
+    assert store.commit("slack") is None
+    assert store.get("slack").last_timestamp == "2024-01-01T00:00:00Z"
+    assert [e["event_id"] for e in store.new_events("slack", batch)] == ["a", "b"]
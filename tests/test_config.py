@@ -31,3 +31,47 @@ def test_get_config_missing_file(
     path = tmp_path / "missing.json"
     monkeypatch.setenv("TIRCORDER_CONFIG_PATH", str(path))
     assert TircorderConfig.get_config() == {}
+
+
+def test_get_config_is_cached_until_file_changes(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """The file should only be re-parsed after it changes on disk."""
+    path = tmp_path / "config.json"
+    monkeypatch.setenv("TIRCORDER_CONFIG_PATH", str(path))
+    TircorderConfig.set_config({"poll_interval": 1})
+
+    loads = []
+    real_load = json.load
+    monkeypatch.setattr(
+        json, "load", lambda handle: loads.append(1) or real_load(handle)
+    )
+    version = TircorderConfig.version()
+    assert TircorderConfig.get_config() == {"poll_interval": 1}
+    assert TircorderConfig.get_config() == {"poll_interval": 1}
+    assert loads == []
+
+    received = []
+    listener = received.append
+    TircorderConfig.subscribe(listener)
+    try:
+        path.write_text(json.dumps({"poll_interval": 25}), encoding="utf-8")
+        assert TircorderConfig.refresh() is True
+    finally:
+        TircorderConfig.unsubscribe(listener)
+
+    assert loads == [1]
+    assert TircorderConfig.version() > version
+    assert received == [{"poll_interval": 25}]
+
+
+def test_get_config_returns_private_copy(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Mutating a returned config must not leak into the cache."""
+    monkeypatch.setenv("TIRCORDER_CONFIG_PATH", str(tmp_path / "config.json"))
+    TircorderConfig.set_config({"nested": {"value": 1}})
+
+    TircorderConfig.get_config()["nested"]["value"] = 2
+
+    assert TircorderConfig.get_config() == {"nested": {"value": 1}}
@@ -0,0 +1,75 @@
+import sqlite3
+from datetime import date, datetime
+
+from contact_frequency_cache import ContactFrequencyCache
+
+
+def _interactions():
+    return [
+        ("Alice", datetime(2024, 5, 1, 9)),
+        ("Alice", datetime(2024, 5, 1, 17)),
+        ("Bob", datetime(2024, 5, 1, 12)),
+        ("Bob", datetime(2024, 5, 3, 8)),
+        ("Bob", datetime(2024, 5, 4, 8)),
+        ("Carol", datetime(2024, 5, 4, 20)),
+    ]
+
+
+def test_record_many_maintains_totals_and_rankings():
+    cache = ContactFrequencyCache(":memory:")
+    assert cache.record_many(_interactions()) == 6
+    cache.record("Carol", datetime(2024, 5, 4, 21), count=2)
+
+    assert cache.frequency_ranking() == [("Bob", 3), ("Carol", 3), ("Alice", 2)]
+    assert cache.frequency_ranking(1) == [("Bob", 3)]
+    assert cache.ranking_between(date(2024, 5, 1), date(2024, 5, 2)) == [
+        ("Alice", 2),
+        ("Bob", 1),
+    ]
+    assert cache.total("Bob") == 3 and cache.total("Dave") == 0
+    assert cache.contact_days("Bob", start=date(2024, 5, 2)) == {
+        date(2024, 5, 3): 1,
+        date(2024, 5, 4): 1,
+    }
+    assert cache.daily_counts()["Alice"] == {date(2024, 5, 1): 2}
+    assert cache.day_counts(date(2024, 5, 1), date(2024, 5, 2)) == {
+        date(2024, 5, 1): {"Alice": 2, "Bob": 1},
+        date(2024, 5, 2): {},
+    }
+
+
+def test_lru_layer_is_invalidated_by_writes():
+    cache = ContactFrequencyCache(":memory:", lru_size=2)
+    cache.record_many(_interactions())
+    assert cache.total("Alice") == 2
+    cache.conn.execute("UPDATE contact_totals SET total = 99 WHERE contact='Alice'")
+    assert cache.total("Alice") == 2  # served from memory
+
+    cache.record("Alice", datetime(2024, 5, 5))
+    assert cache.total("Alice") == 100
+    cache.frequency_ranking()
+    cache.frequency_ranking(2)
+    assert len(cache._lru) == 2
+
+
+def test_totals_are_backfilled_for_existing_databases(tmp_path):
+    path = str(tmp_path / "contacts.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE contact_counts (day TEXT NOT NULL, contact TEXT NOT NULL, "
+        "count INTEGER NOT NULL, PRIMARY KEY (day, contact))"
+    )
+    conn.executemany(
+        "INSERT INTO contact_counts VALUES (?, ?, ?)",
+        [
+            ("2024-05-01", "Alice", 2),
+            ("2024-05-02", "Alice", 1),
+            ("2024-05-02", "Bob", 4),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    cache = ContactFrequencyCache(path)
+    assert cache.frequency_ranking() == [("Bob", 4), ("Alice", 3)]
+    cache.close()
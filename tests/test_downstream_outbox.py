@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import json
+import time
+
+from tircorder.downstream import fanout_whisperx_downstream
+from tircorder.downstream_outbox import (
+    DownstreamDispatcher,
+    DownstreamOutbox,
+    outbox_from_config,
+)
+
+
+def _fanout(tmp_path, outbox, **overrides):
+    kwargs = dict(
+        audio_path=tmp_path / "audio.wav",
+        transcript_payload={"text": "hello", "segments": []},
+        execution_envelope={"id": "env-1", "segment_count": 0},
+        metadata={"task_id": "task-1", "completed_at": "2026-03-24T00:00:00Z"},
+        downstream_config={
+            "sensiblaw": {"enabled": True, "storage_path": str(tmp_path / "sl.db")},
+            "statibaker": {"enabled": True, "log_root": str(tmp_path / "sb")},
+        },
+        outbox=outbox,
+        receipts_path=tmp_path / "receipts.json",
+    )
+    kwargs.update(overrides)
+    return fanout_whisperx_downstream(**kwargs)
+
+
+def test_fanout_with_outbox_returns_pending_receipts(monkeypatch, tmp_path):
+    def _fail(*_args, **_kwargs):  # pragma: no cover - must not run inline
+        raise AssertionError("sink called synchronously")
+
+    monkeypatch.setattr("tircorder.downstream.ingest_into_sensiblaw", _fail)
+    monkeypatch.setattr("tircorder.downstream.append_into_statibaker", _fail)
+    outbox = DownstreamOutbox(tmp_path / "state.db")
+
+    receipts = _fanout(tmp_path, outbox)
+
+    assert receipts["job_id"] == "task-1"
+    assert receipts["sinks"]["sensiblaw"]["status"] == "pending"
+    assert receipts["sinks"]["statibaker"]["status"] == "pending"
+    written = json.loads((tmp_path / "receipts.json").read_text(encoding="utf-8"))
+    assert written["sinks"]["sensiblaw"]["status"] == "pending"
+    assert outbox.pending_count() == 2
+
+
+def test_dispatcher_delivers_and_updates_receipts(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "tircorder.downstream.ingest_into_sensiblaw",
+        lambda *_args, **_kwargs: {"status": "ok", "envelope_id": 42},
+    )
+    monkeypatch.setattr(
+        "tircorder.downstream.append_into_statibaker",
+        lambda *_args, **_kwargs: {"status": "appended", "event_id": "abc123"},
+    )
+    outbox = DownstreamOutbox(tmp_path / "state.db")
+    _fanout(tmp_path, outbox)
+
+    assert DownstreamDispatcher(outbox, workers=2).run_once() == 2
+
+    receipts = json.loads((tmp_path / "receipts.json").read_text(encoding="utf-8"))
+    assert receipts["sinks"]["sensiblaw"]["delivery_status"] == "delivered"
+    assert receipts["sinks"]["sensiblaw"]["status"] == "ok"
+    assert receipts["sinks"]["sensiblaw"]["envelope_id"] == 42
+    assert receipts["sinks"]["statibaker"]["event_id"] == "abc123"
+    assert outbox.pending_count() == 0
+
+    # Re-enqueueing the same transcript does not deliver it again.
+    again = _fanout(tmp_path, outbox)
+    assert again["sinks"]["sensiblaw"]["delivery_status"] == "delivered"
+    assert outbox.pending_count() == 0
+
+
+def test_failed_delivery_backs_off_then_gives_up(monkeypatch, tmp_path):
+    calls = []
+
+    def _flaky(*_args, **_kwargs):
+        calls.append(1)
+        raise RuntimeError("storage offline")
+
+    monkeypatch.setattr("tircorder.downstream.ingest_into_sensiblaw", _flaky)
+    outbox = DownstreamOutbox(tmp_path / "state.db", max_attempts=2, base_delay=0)
+    _fanout(
+        tmp_path,
+        outbox,
+        downstream_config={
+            "sensiblaw": {"enabled": True, "storage_path": str(tmp_path / "sl.db")}
+        },
+    )
+    dispatcher = DownstreamDispatcher(outbox, workers=1)
+
+    dispatcher.run_once()
+    receipts = json.loads((tmp_path / "receipts.json").read_text(encoding="utf-8"))
+    assert receipts["sinks"]["sensiblaw"]["status"] == "pending"
+    assert receipts["sinks"]["sensiblaw"]["error"] == "storage offline"
+
+    dispatcher.run_once()
+    receipts = json.loads((tmp_path / "receipts.json").read_text(encoding="utf-8"))
+    assert receipts["sinks"]["sensiblaw"]["status"] == "failed"
+    assert receipts["sinks"]["sensiblaw"]["attempts"] == 2
+    assert len(calls) == 2
+    assert dispatcher.run_once() == 0
+
+
+def test_backoff_is_exponential_and_capped(tmp_path):
+    outbox = DownstreamOutbox(tmp_path / "state.db", base_delay=1.0, max_delay=5.0)
+    assert [outbox.backoff(n) for n in range(1, 5)] == [1.0, 2.0, 4.0, 5.0]
+
+
+def test_background_dispatcher_drains_outbox(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        "tircorder.downstream.ingest_into_sensiblaw",
+        lambda *_args, **_kwargs: {"status": "ok", "envelope_id": 7},
+    )
+    monkeypatch.setattr(
+        "tircorder.downstream.append_into_statibaker",
+        lambda *_args, **_kwargs: {"status": "appended"},
+    )
+    outbox = DownstreamOutbox(tmp_path / "state.db")
+    dispatcher = DownstreamDispatcher(outbox, workers=2, poll_interval=0.01)
+    dispatcher.start()
+    try:
+        _fanout(tmp_path, outbox, dispatcher=dispatcher)
+        deadline = time.time() + 5
+        while outbox.pending_count() and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        dispatcher.stop()
+
+    assert outbox.pending_count() == 0
+
+
+def test_fanout_builds_outbox_from_config(monkeypatch, tmp_path):
+    keys = []
+
+    def _ingest(*_args, idempotency_key=None, **_kwargs):
+        keys.append(idempotency_key)
+        return {"status": "ok", "idempotency_key": idempotency_key}
+
+    monkeypatch.setattr("tircorder.downstream.ingest_into_sensiblaw", _ingest)
+    config = {
+        "sensiblaw": {"enabled": True, "storage_path": str(tmp_path / "sl.db")},
+        "outbox": {"enabled": True, "db_path": str(tmp_path / "state.db")},
+    }
+
+    receipts = _fanout(tmp_path, None, downstream_config=config)
+    assert receipts["sinks"]["sensiblaw"]["status"] == "pending"
+
+    outbox, dispatcher = outbox_from_config(config["outbox"])
+    try:
+        deadline = time.time() + 5
+        while outbox.pending_count() and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        dispatcher.stop()
+
+    assert outbox.pending_count() == 0
+    assert keys == [receipts["sinks"]["sensiblaw"]["idempotency_key"]]
+    assert outbox_from_config({"enabled": False}) is None
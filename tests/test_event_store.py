@@ -0,0 +1,84 @@
+import sqlite3
+from datetime import datetime, timezone
+
+import numpy as np
+
+from tircorder.story_storage import upsert_story_events
+from tircorder_utils.event_store import ColumnarEvents
+
+
+def _event(hour, actor, action, text):
+    return {
+        "event_id": f"{actor}-{hour}",
+        "timestamp": datetime(2024, 5, 1, hour, tzinfo=timezone.utc).isoformat(),
+        "actor": actor,
+        "action": action,
+        "details": {"text": text},
+    }
+
+
+def _streams():
+    return {
+        "chat": [
+            _event(9, "Alice", "message", "hi"),
+            _event(12, "Bob", "message", "lunch?"),
+        ],
+        "calls": iter([_event(10, "Alice", "call", "ring")]),
+    }
+
+
+def _ms(hour):
+    return int(datetime(2024, 5, 1, hour, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def test_columns_are_sorted_and_filterable():
+    store = ColumnarEvents.from_streams(_streams(), payloads=True)
+    assert len(store) == 3
+    assert list(store.ts) == [_ms(9), _ms(10), _ms(12)]
+    assert store.ts.dtype == np.int64 and store.actor_id.dtype == np.int32
+    assert store.event(1) == {
+        "timestamp_ms": _ms(10),
+        "source": "calls",
+        "actor": "Alice",
+        "action": "call",
+        "details": {"text": "ring"},
+    }
+
+    alice = store.filter(end=datetime(2024, 5, 1, 11), actors=["Alice"])
+    assert list(alice.ts) == [_ms(9), _ms(10)]
+    assert alice.payload(0) == {"text": "hi"}
+    assert len(store.filter(sources=["unknown"])) == 0
+    assert store.counts_by("source") == {"chat": 2, "calls": 1}
+
+
+def test_histogram_counts_per_group_and_bucket():
+    store = ColumnarEvents.from_streams(_streams())
+    names, starts, counts = store.histogram(
+        "action", 3_600_000, start=datetime(2024, 5, 1, 8, tzinfo=timezone.utc)
+    )
+    assert names == ["message", "call"]
+    assert starts[0] == _ms(8) and len(starts) == 5
+    assert counts.tolist() == [[0, 1, 0, 0, 1], [0, 0, 1, 0, 0]]
+
+
+def test_save_and_memory_map_round_trip(tmp_path):
+    store = ColumnarEvents.from_streams(_streams(), payloads=True)
+    store.save(tmp_path / "store")
+
+    loaded = ColumnarEvents.load(tmp_path / "store")
+    assert isinstance(loaded.ts, np.memmap)
+    assert [loaded.event(i) for i in range(3)] == [store.event(i) for i in range(3)]
+    assert loaded.counts_by("actor") == {"Alice": 2, "Bob": 1}
+
+
+def test_from_story_db_reads_time_window():
+    conn = sqlite3.connect(":memory:")
+    chat = _streams()["chat"]
+    upsert_story_events(chat, conn=conn, source="chat")
+    store = ColumnarEvents.from_story_db(
+        conn, since=datetime(2024, 5, 1, 10, tzinfo=timezone.utc), payloads=True
+    )
+    assert [store.event(i)["details"] for i in range(len(store))] == [
+        {"text": "lunch?"}
+    ]
+    conn.close()
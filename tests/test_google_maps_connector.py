@@ -29,3 +29,48 @@ def test_load_semantic_location_history():
     assert "Home" in places
     # Waypoint path should produce an event without place name
     assert "" in places
+
+
+def test_iter_json_array_handles_chunk_boundaries():
+    import io
+    import json
+
+    from integrations.location._json_stream import iter_json_array
+
+    items = [{"n": i, "text": "a,]}" * (i % 3)} for i in range(50)] + [7, "x"]
+    payload = json.dumps({"meta": {"locations": 1}, "locations": items})
+    for chunk_size in (1, 7, 64, 1 << 20):
+        stream = iter_json_array(
+            io.StringIO(payload), "locations", chunk_size=chunk_size
+        )
+        assert list(stream) == items
+
+
+def test_load_columns_and_selected_events(tmp_path):
+    np = pytest.importorskip("numpy")
+    records = tmp_path / "Records.json"
+    records.write_text(
+        '{"locations": ['
+        '{"latitudeE7": 10, "longitudeE7": 20, "accuracy": 5,'
+        ' "timestamp": "2019-01-02T00:00:00Z", "source": "WIFI"},'
+        '{"latitudeE7": 11, "longitudeE7": 21, "timestampMs": "1546387300000"},'
+        '{"latitudeE7": 12}'
+        "]}",
+        encoding="utf-8",
+    )
+    connector = GoogleMapsConnector()
+
+    columns = connector.load_columns(records)
+    assert len(columns) == 2
+    assert columns.timestamp_ms.dtype == np.int64
+    assert columns.lat_e7.dtype == np.int32
+    assert columns.timestamp_ms.tolist() == [1546387200000, 1546387300000]
+    assert columns.accuracy.tolist() == [5, -1]
+    assert columns.sources == ["WIFI", ""]
+
+    events = list(connector.events_from_columns(columns, columns.accuracy >= 0))
+    assert len(events) == 1
+    assert events[0]["details"]["place"] == "WIFI"
+
+    later = connector.load_columns(records, since_ms=1546387250000)
+    assert later.lat_e7.tolist() == [11]
@@ -0,0 +1,86 @@
+import hashlib
+import os
+
+import pytest
+
+from tircorder import hashing
+from tircorder.hashing import FileHashCache, sha256_json
+
+
+@pytest.fixture()
+def counted(monkeypatch):
+    calls = []
+    original = hashing._hash_stream
+
+    def _counting(path):
+        calls.append(path)
+        return original(path)
+
+    monkeypatch.setattr(hashing, "_hash_stream", _counting)
+    return calls
+
+
+def test_sha256_file_matches_hashlib_and_caches(tmp_path, counted):
+    target = tmp_path / "audio.wav"
+    data = os.urandom(3 * hashing.READ_BUFFER_SIZE + 17)
+    target.write_bytes(data)
+    cache = FileHashCache(tmp_path / "hashes.sqlite")
+
+    assert cache.sha256_file(target) == hashlib.sha256(data).hexdigest()
+    assert cache.sha256_file(target) == hashlib.sha256(data).hexdigest()
+    assert len(counted) == 1
+
+
+def test_cache_persists_and_invalidates_on_change(tmp_path, counted):
+    target = tmp_path / "scan.dcm"
+    target.write_bytes(b"first")
+    db_path = tmp_path / "hashes.sqlite"
+    FileHashCache(db_path).sha256_file(target)
+
+    reopened = FileHashCache(db_path)
+    assert reopened.sha256_file(target) == hashlib.sha256(b"first").hexdigest()
+    assert len(counted) == 1
+
+    target.write_bytes(b"second version")
+    assert reopened.sha256_file(target) == hashlib.sha256(b"second version").hexdigest()
+    assert len(counted) == 2
+
+
+def test_sha256_files_parallel(tmp_path):
+    paths = []
+    for idx in range(4):
+        path = tmp_path / f"{idx}.bin"
+        path.write_bytes(bytes([idx]) * 1000)
+        paths.append(path)
+    cache = FileHashCache(":memory:")
+
+    digests = cache.sha256_files(paths, workers=4)
+
+    assert digests == {
+        str(p): hashlib.sha256(p.read_bytes()).hexdigest() for p in paths
+    }
+
+
+def test_sha256_json_ignores_key_order():
+    assert sha256_json({"a": 1, "b": [1, 2]}) == sha256_json({"b": [1, 2], "a": 1})
+
+
+def test_prune_removes_deleted_files(tmp_path):
+    kept = tmp_path / "kept.bin"
+    gone = tmp_path / "gone.bin"
+    kept.write_bytes(b"kept")
+    gone.write_bytes(b"gone")
+    cache = FileHashCache(":memory:")
+    cache.sha256_files([kept, gone])
+
+    gone.unlink()
+
+    assert cache.prune() == 1
+    assert cache.prune() == 0
+    paths = [row[0] for row in cache.conn.execute("SELECT path FROM file_hashes")]
+    assert paths == [str(kept.resolve())]
+
+
+def test_tests_use_isolated_default_cache():
+    assert hashing.get_default_cache().db_path == ":memory:"
+    assert os.environ[hashing.CACHE_ENV_VAR] != str(hashing.DEFAULT_CACHE_PATH)
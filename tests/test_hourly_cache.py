@@ -0,0 +1,85 @@
+import random
+import sqlite3
+from datetime import date, datetime, timedelta
+
+from hourly_cache import HourlyEventCache
+
+
+def _stored(cache, resolution="minute"):
+    return cache.conn.execute(
+        f"SELECT COALESCE(SUM(count), 0) FROM rollup_{resolution}"
+    ).fetchone()[0]
+
+
+def test_record_buffers_until_flush_or_query():
+    cache = HourlyEventCache(":memory:", flush_size=3, flush_interval=3600)
+    base = datetime(2024, 5, 6, 9, 0)
+    cache.record(base)
+    cache.record(base + timedelta(seconds=30))
+    assert _stored(cache) == 0
+
+    cache.record(base + timedelta(minutes=1))
+    assert _stored(cache) == 0  # two distinct minutes buffered
+    assert cache.count_range(date(2024, 5, 6), date(2024, 5, 6)) == 3
+    assert _stored(cache) == 3
+
+    for minute in range(2, 5):
+        cache.record(base + timedelta(minutes=minute))
+    assert _stored(cache) == 6  # the third distinct minute triggers a write
+    cache.record(base + timedelta(minutes=9))
+    cache.flush()
+    counts = [_stored(cache, r) for r in ("minute", "hour", "day", "month")]
+    assert counts == [7, 7, 7, 7]
+
+
+def test_count_between_matches_brute_force():
+    rng = random.Random(3)
+    start = datetime(2023, 11, 20)
+    stamps = [start + timedelta(minutes=rng.randrange(200 * 1440)) for _ in range(3000)]
+    cache = HourlyEventCache(":memory:")
+    cache.bulk_record(stamps)
+
+    for _ in range(50):
+        lo = start + timedelta(minutes=rng.randrange(200 * 1440))
+        hi = lo + timedelta(minutes=rng.randrange(120 * 1440))
+        expected = sum(1 for ts in stamps if lo <= ts < hi)
+        assert cache.count_between(lo, hi) == expected
+    assert cache.count_range(date(2023, 12, 1), date(2024, 2, 29)) == sum(
+        1 for ts in stamps if date(2023, 12, 1) <= ts.date() <= date(2024, 2, 29)
+    )
+
+
+def test_counts_pick_resolution_for_the_view():
+    cache = HourlyEventCache(":memory:")
+    cache.bulk_record([datetime(2024, 5, 6, 9, 15), datetime(2024, 7, 1, 0, 0)])
+
+    day = cache.counts(datetime(2024, 5, 6), datetime(2024, 5, 7))
+    assert len(day) == 24 and day[datetime(2024, 5, 6, 9)] == 1
+
+    year = cache.counts(datetime(2024, 1, 1), datetime(2025, 1, 1))
+    assert len(year) == 366 and year[datetime(2024, 7, 1)] == 1
+
+    decade = cache.counts(datetime(2020, 1, 1), datetime(2030, 1, 1))
+    assert len(decade) == 120 and decade[datetime(2024, 5, 1)] == 1
+
+
+def test_legacy_hour_counts_are_migrated(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE hour_counts (hour TEXT PRIMARY KEY, count INTEGER)")
+    conn.executemany(
+        "INSERT INTO hour_counts VALUES (?, ?)",
+        [("2024-05-06T09", 3), ("2024-05-07T23", 2)],
+    )
+    conn.commit()
+    conn.close()
+
+    with HourlyEventCache(path) as cache:
+        assert cache.day_counts(date(2024, 5, 6), date(2024, 5, 7)) == {
+            date(2024, 5, 6): 3,
+            date(2024, 5, 7): 2,
+        }
+        cache.record(datetime(2024, 5, 7, 23, 30))
+
+    with HourlyEventCache(path) as cache:
+        assert cache.count_range(date(2024, 5, 1), date(2024, 5, 31)) == 6
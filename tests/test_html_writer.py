@@ -0,0 +1,52 @@
+import io
+import json
+
+import pytest
+
+from Pelican.html_writer import PageWriter, iter_json_array, open_page
+
+
+class _Recorder(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def write(self, s):
+        self.calls += 1
+        return super().write(s)
+
+
+def test_page_writer_buffers_into_chunks():
+    out = _Recorder()
+    page = PageWriter(out, chunk_size=10)
+    page.writelines(["<li>1</li>", "<li>2</li>", "", "<b>"])
+    assert out.calls == 2
+    page.write("</b>")
+    page.flush()
+    assert out.getvalue() == "<li>1</li><li>2</li><b></b>"
+    assert out.calls == 3
+    assert page.written == len(out.getvalue())
+
+
+def test_open_page_writes_header_and_footer(tmp_path):
+    path = tmp_path / "site" / "page.html"
+    with open_page(path, "<html>", "</html>", chunk_size=4) as page:
+        page.writelines(f"<p>{i}</p>" for i in range(3))
+    assert path.read_text() == "<html><p>0</p><p>1</p><p>2</p></html>"
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_open_page_keeps_previous_page_on_error(tmp_path):
+    path = tmp_path / "page.html"
+    path.write_text("old")
+    with pytest.raises(RuntimeError):
+        with open_page(path, "<html>") as page:
+            page.write("partial")
+            raise RuntimeError("boom")
+    assert path.read_text() == "old"
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@pytest.mark.parametrize("items", [[], [1], [{"x": 1.5, "c": "#fff"}, "a", None]])
+def test_iter_json_array_matches_json_dumps(items):
+    assert "".join(iter_json_array(iter(items))) == json.dumps(items)
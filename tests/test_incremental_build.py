@@ -0,0 +1,99 @@
+import os
+
+from Pelican.generate_content import build_timeline_page
+from Pelican.incremental_build import FragmentCache
+
+
+def _render(calls, text):
+    def render():
+        calls.append(text)
+        return f"<p>{text}</p>"
+
+    return render
+
+
+def test_fragment_reused_until_input_content_changes(tmp_path):
+    source = tmp_path / "a.txt"
+    source.write_text("one")
+    calls = []
+
+    with FragmentCache(tmp_path / "cache") as cache:
+        assert cache.fragment("a", _render(calls, "1"), [str(source)]) == "<p>1</p>"
+
+    # Touching the file without changing it keeps the cached fragment.
+    os.utime(source, ns=(1, 1))
+    with FragmentCache(tmp_path / "cache") as cache:
+        assert cache.fragment("a", _render(calls, "2"), [str(source)]) == "<p>1</p>"
+        assert (cache.rendered, cache.reused) == (0, 1)
+
+    source.write_text("two")
+    with FragmentCache(tmp_path / "cache") as cache:
+        assert cache.fragment("a", _render(calls, "3"), [str(source)]) == "<p>3</p>"
+    assert calls == ["1", "3"]
+
+
+def test_fragment_params_and_pruning(tmp_path):
+    calls = []
+    with FragmentCache(tmp_path) as cache:
+        cache.fragment("a", _render(calls, "a"), params=[1])
+        cache.fragment("b", _render(calls, "b"))
+
+    with FragmentCache(tmp_path) as cache:
+        assert cache.fragment("a", _render(calls, "a2"), params=[2]) == "<p>a2</p>"
+    assert len(list(tmp_path.glob("*.html"))) == 1
+
+    with FragmentCache(tmp_path) as cache:
+        cache.fragment("b", _render(calls, "b2"))
+    assert calls == ["a", "b", "a2", "b2"]
+
+
+def test_build_timeline_page_renders_only_new_matches(tmp_path):
+    matches = []
+    for i in range(3):
+        audio = tmp_path / f"rec{i}.mp3"
+        transcript = tmp_path / f"rec{i}.txt"
+        audio.write_bytes(b"")
+        transcript.write_text(f"Alice met Bob number {i}.")
+        matches.append([str(audio), str(transcript), "phone", "Alice"])
+    paths = dict(
+        output_path=str(tmp_path / "timeline.html"),
+        symlink_dir=str(tmp_path / "symlinks"),
+        fragment_dir=str(tmp_path / "fragments"),
+    )
+
+    first = build_timeline_page(matches, [], [], **paths)
+    page = (tmp_path / "timeline.html").read_text()
+    assert (first.rendered, first.reused) == (3, 0)
+
+    second = build_timeline_page(matches, [], [], **paths)
+    assert (second.rendered, second.reused) == (0, 3)
+    assert (tmp_path / "timeline.html").read_text() == page
+
+    extra = tmp_path / "rec3.txt"
+    extra.write_text("Carol")
+    (tmp_path / "rec3.mp3").write_bytes(b"")
+    matches.append([str(tmp_path / "rec3.mp3"), str(extra), "phone", "Carol"])
+    third = build_timeline_page(matches, [], [], **paths)
+    assert (third.rendered, third.reused) == (1, 3)
+    page = (tmp_path / "timeline.html").read_text()
+    assert page.count('class="timeline-item"') == 4
+    assert '"contact": "Alice", "count": 3' in page
+
+
+def test_needs_render_checks_inputs_once(tmp_path):
+    source = tmp_path / "a.txt"
+    source.write_text("one")
+    calls = []
+
+    with FragmentCache(tmp_path / "cache") as cache:
+        assert cache.needs_render("a", [str(source)])
+        cache.fragment("a", _render(calls, "1"), [str(source)])
+
+    with FragmentCache(tmp_path / "cache") as cache:
+        assert not cache.needs_render("a", [str(source)])
+        source.write_text("changed")
+        # fragment() reuses the check made by needs_render().
+        assert cache.fragment("a", _render(calls, "2"), [str(source)]) == "<p>1</p>"
+        assert cache.needs_render("a", [str(source)])
+        assert cache.fragment("a", _render(calls, "3"), [str(source)]) == "<p>3</p>"
+    assert calls == ["1", "3"]
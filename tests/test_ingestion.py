@@ -0,0 +1,123 @@
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from tircorder.ingestion import ConnectorSpec, ingest, load_specs
+
+DATA_DIR = Path(__file__).parent / "data"
+
+SPECS = [
+    ConnectorSpec(
+        "whatsapp:new-year",
+        "integrations.whatsapp_backup:WhatsAppBackupConnector",
+        init_kwargs={"chat_name": "New Year"},
+        call_args=(str(DATA_DIR / "whatsapp_plain.txt"),),
+    ),
+    ConnectorSpec(
+        "slack:test",
+        "integrations.slack_backup:SlackBackupConnector",
+        init_args=(str(DATA_DIR / "slack_export"),),
+    ),
+    ConnectorSpec(
+        "broken",
+        "integrations.whatsapp_backup:WhatsAppBackupConnector",
+        call_args=(str(DATA_DIR / "missing.txt"),),
+    ),
+]
+
+
+def iter_untimed_events(count):
+    """Connector whose events violate ``timestamp NOT NULL`` when written."""
+    for i in range(count):
+        yield {"event_id": f"untimed-{i}", "timestamp": None, "action": "note"}
+
+
+def iter_location_events():
+    yield {
+        "event_id": "visit",
+        "timestamp": "2024-01-01T08:00:00+00:00",
+        "action": "location",
+        "details": {"lat": 1.0, "lon": 1.0, "place": "Home"},
+    }
+    yield {
+        "event_id": "fix",
+        "timestamp": "2024-01-01T09:00:00+00:00",
+        "action": "location",
+        "details": {"lat": 1.0002, "lon": 1.0, "place": "wifi"},
+    }
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_ingest_tags_events_with_places(tmp_path, workers):
+    conn = sqlite3.connect(":memory:")
+    spec = ConnectorSpec(
+        "maps",
+        "tests.test_ingestion:iter_location_events",
+        places_db=str(tmp_path / "places.db"),
+    )
+    ingest([spec], conn=conn, workers=workers)
+
+    rows = conn.execute("SELECT event_id, details FROM story_events ORDER BY 1")
+    details = {event_id: json.loads(raw) for event_id, raw in rows}
+    assert details["fix"]["place"] == "Home"
+    assert details["fix"]["place_id"] == details["visit"]["place_id"]
+
+
+@pytest.mark.parametrize("workers", [0, 1, 2])
+def test_ingest_reports_write_errors_and_drains_queue(workers):
+    conn = sqlite3.connect(":memory:")
+    specs = [
+        ConnectorSpec(
+            "untimed",
+            "tests.test_ingestion:iter_untimed_events",
+            call_args=(200,),
+        ),
+        SPECS[1],
+    ]
+    reports = ingest(specs, conn=conn, workers=workers, batch_size=1, queue_size=4)
+
+    assert "IntegrityError" in reports["untimed"].error
+    assert reports["untimed"].events == 0
+    assert reports["slack:test"].error is None
+    assert reports["slack:test"].events == 4
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_ingest_runs_connectors_into_story_events(workers):
+    conn = sqlite3.connect(":memory:")
+    reports = ingest(SPECS, conn=conn, workers=workers, batch_size=1)
+
+    assert reports["whatsapp:new-year"].events == 2
+    assert reports["slack:test"].events == 4
+    assert reports["broken"].events == 0
+    assert "FileNotFoundError" in reports["broken"].error
+    counts = dict(
+        conn.execute("SELECT source, COUNT(*) FROM story_events GROUP BY source")
+    )
+    assert counts == {"whatsapp:new-year": 2, "slack:test": 4}
+
+    # Content-derived ids make a second run an idempotent upsert.
+    ingest(SPECS[:2], conn=conn, workers=workers)
+    assert conn.execute("SELECT COUNT(*) FROM story_events").fetchone() == (6,)
+
+
+def test_load_specs_and_duplicate_sources(tmp_path):
+    path = tmp_path / "sources.json"
+    path.write_text(
+        json.dumps(
+            [
+                {
+                    "source": "search",
+                    "connector": "integrations.google_search_history:"
+                    "iter_search_history",
+                    "call_args": ["history.json"],
+                }
+            ]
+        )
+    )
+    (spec,) = load_specs(path)
+    assert spec.source == "search"
+    with pytest.raises(ValueError):
+        ingest([spec, spec], conn=sqlite3.connect(":memory:"))
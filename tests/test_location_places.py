@@ -0,0 +1,97 @@
+import math
+import random
+
+import pytest
+
+from integrations.location.places import (
+    PlaceIndex,
+    covering_cells,
+    encode_geohash,
+    haversine_m,
+)
+
+
+def test_encode_geohash_matches_reference():
+    assert encode_geohash(57.64911, 10.40744, 11) == "u4pruydqqvj"
+
+
+def test_covering_cells_contain_points_within_radius():
+    rng = random.Random(1)
+    lat, lon = -27.4698, 153.0251
+    cells = covering_cells(lat, lon, 500)
+    for _ in range(200):
+        bearing = rng.uniform(0, 2 * math.pi)
+        dist = rng.uniform(0, 500)
+        plat = lat + dist * math.cos(bearing) / 111_320
+        plon = lon + dist * math.sin(bearing) / (111_320 * math.cos(math.radians(lat)))
+        assert any(encode_geohash(plat, plon).startswith(c) for c in cells)
+
+
+def test_nearest_and_within_queries():
+    index = PlaceIndex(":memory:")
+    cafe = index.add_place("Cafe", -27.4698, 153.0251)
+    park = index.add_place("Park", -27.4710, 153.0260)
+    index.add_place("Airport", -27.3842, 153.1175)
+
+    assert index.nearest(-27.4699, 153.0252).place_id == cafe
+    assert [p.place_id for p in index.within(-27.4698, 153.0251, 300)] == [cafe, park]
+    assert index.nearest(-27.0, 153.0) is None
+    assert index.within(-27.4698, 153.0251, 20_000)[-1].name == "Airport"
+
+
+def test_repeated_visits_merge_into_one_place():
+    index = PlaceIndex(":memory:")
+    events = [
+        {"details": {"place": "Home", "lat": 1.0, "lon": 1.0}},
+        {"details": {"place": "Home", "lat": 1.0001, "lon": 1.0}},
+        {"details": {"venue": "Gym", "lat": 1.01, "lon": 1.0}},
+        {"details": {"place": "", "lat": 1.0, "lon": 1.0}},
+        {"details": {"place": "GPS", "lat": 2.0, "lon": 2.0}},
+        {"details": {"place": "WIFI", "lat": 1.0, "lon": 1.0}},
+        {"details": {"place": "gps", "lat": 2.0, "lon": 2.0}},
+    ]
+    assert index.add_places_from_events(events) == 3
+    assert index.nearest(2.0, 2.0) is None
+    home = index.nearest(1.0, 1.0)
+    assert home.name == "Home"
+    assert home.visits == 2
+
+
+def test_tag_event_sets_place_ids():
+    index = PlaceIndex(":memory:")
+    home = index.add_place("Home", 1.0, 1.0)
+    work = index.add_place("Work", 1.05, 1.0)
+
+    point = index.tag_event({"details": {"lat": 1.0002, "lon": 1.0, "place": ""}})
+    assert point["details"]["place_id"] == home
+    assert point["details"]["place"] == "Home"
+
+    drive = index.tag_event(
+        {
+            "details": {
+                "start_point": {"lat": 1.0, "lon": 1.0},
+                "end_point": {"lat": 1.05, "lon": 1.0001},
+            }
+        }
+    )
+    assert drive["details"]["start_place_id"] == home
+    assert drive["details"]["end_place_id"] == work
+
+    trip = index.tag_event({"pickup_location": {"lat": 1.05, "lng": 1.0}})
+    assert trip["pickup_place_id"] == work
+
+
+def test_tag_events_learns_named_places():
+    index = PlaceIndex(":memory:")
+    events = [
+        {"details": {"place": "Home", "lat": 1.0, "lon": 1.0}},
+        {"details": {"place": "GPS", "lat": 1.0001, "lon": 1.0}},
+    ]
+    tagged = list(index.tag_events(events, learn=True, commit_every=1))
+    assert tagged[1]["details"]["place"] == "Home"
+    assert tagged[1]["details"]["place_id"] == tagged[0]["details"]["place_id"]
+    assert not index.conn.in_transaction
+
+
+def test_haversine_known_distance():
+    assert haversine_m(0, 0, 0, 1) == pytest.approx(111_195, rel=1e-3)
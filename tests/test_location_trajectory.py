@@ -0,0 +1,100 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from integrations.location.trajectory import (
+    detect_stay_points,
+    douglas_peucker,
+    load_raw_points,
+    summarise_location_events,
+    summarise_points,
+)
+
+
+def _day_track():
+    """Home for an hour, a straight drive, then work for an hour (1 fix/10 s)."""
+    rng = np.random.default_rng(0)
+    home = np.column_stack(
+        [-27.47 + rng.normal(0, 1e-4, 360), 153.02 + rng.normal(0, 1e-4, 360)]
+    )
+    drive = np.column_stack(
+        [np.linspace(-27.47, -27.40, 120), np.linspace(153.02, 153.10, 120)]
+    )
+    work = np.column_stack(
+        [-27.40 + rng.normal(0, 1e-4, 360), 153.10 + rng.normal(0, 1e-4, 360)]
+    )
+    coords = np.vstack([home, drive, work])
+    ts = 1_700_000_000_000 + np.arange(len(coords), dtype=np.int64) * 10_000
+    return ts, coords[:, 0], coords[:, 1]
+
+
+def test_douglas_peucker_keeps_corners_of_a_route():
+    lat = np.array([0.0, 0.0, 0.0, 0.0, 0.001, 0.002, 0.003])
+    lon = np.array([0.0, 0.001, 0.002, 0.003, 0.003, 0.003, 0.003])
+    kept = douglas_peucker(lat, lon, epsilon_m=5.0)
+    assert kept.tolist() == [0, 3, 6]
+
+
+def test_detect_stay_points_finds_both_stays():
+    ts, lat, lon = _day_track()
+    stays = detect_stay_points(ts, lat, lon, stay_radius_m=150, min_stay_s=600)
+    assert len(stays) == 2
+    assert stays[0].start == 0
+    assert stays[1].end == len(ts)
+
+
+def test_summarise_points_collapses_track_and_keeps_raw_points():
+    ts, lat, lon = _day_track()
+    conn = sqlite3.connect(":memory:")
+
+    events = summarise_points(ts, lat, lon, source="test", conn=conn)
+
+    assert [e["action"] for e in events] == ["stay", "trip", "stay"]
+    trip = events[1]["details"]
+    assert len(trip["path"]) <= 4
+    assert trip["distance_m"] == pytest.approx(11_300, rel=0.1)
+    assert sum(e["details"]["point_count"] for e in events) == len(ts)
+    raw = load_raw_points(conn, events[0]["event_id"])
+    assert len(raw) == events[0]["details"]["point_count"]
+
+
+def test_summarise_location_events_passes_other_events_through():
+    ts, lat, lon = _day_track()
+    events = [
+        {
+            "event_id": f"p{i}",
+            "timestamp": f"2023-11-14T22:{i // 60 % 60:02d}:{i % 60:02d}+00:00",
+            "actor": "user",
+            "action": "location",
+            "details": {"lat": float(lat[i]), "lon": float(lon[i])},
+        }
+        for i in range(0, 300)
+    ]
+    other = {"event_id": "x", "timestamp": "2023-11-14T00:00:00", "details": {}}
+
+    out = summarise_location_events(events + [other], min_stay_s=60)
+
+    assert out[0] is other
+    assert [e["action"] for e in out[1:]] == ["stay"]
+
+
+def test_summarise_location_events_returns_chronological_order():
+    ts, lat, lon = _day_track()
+    events = [
+        {
+            "event_id": f"p{i}",
+            "timestamp": f"2023-11-14T22:{i // 60 % 60:02d}:{i % 60:02d}+00:00",
+            "actor": "user",
+            "action": "location",
+            "details": {"lat": float(lat[i]), "lon": float(lon[i])},
+        }
+        for i in range(0, 300)
+    ]
+    later = {"event_id": "y", "timestamp": "2023-11-15T09:00:00", "details": {}}
+    undated = {"event_id": "z", "timestamp": "soon", "details": {}}
+
+    out = summarise_location_events([later, undated] + events, min_stay_s=60)
+
+    assert [e["event_id"] for e in out[-2:]] == ["y", "z"]
+    assert out[0]["action"] == "stay"
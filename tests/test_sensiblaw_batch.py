@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from tircorder.downstream_outbox import DownstreamDispatcher, DownstreamOutbox
+from tircorder.sensiblaw_batch import SensibLawBatchSink
+
+
+class FakeStorage:
+    opened: list = []
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = []
+        self.transactions = 0
+        self.closed = False
+        self.thread = threading.get_ident()
+        FakeStorage.opened.append(self)
+
+    def transaction(self):
+        storage = self
+
+        class _Txn:
+            def __enter__(self):
+                storage.transactions += 1
+
+            def __exit__(self, *_exc):
+                return False
+
+        return _Txn()
+
+    def close(self):
+        assert threading.get_ident() == self.thread
+        self.closed = True
+
+
+def _import(store, payload, *, audio_path):
+    if payload.get("fail"):
+        raise RuntimeError("bad transcript")
+    store.rows.append((audio_path, payload["text"]))
+    return len(store.rows)
+
+
+@pytest.fixture(autouse=True)
+def _reset_storage():
+    FakeStorage.opened = []
+
+
+def test_batch_sink_reuses_one_storage_per_path(tmp_path):
+    sink = SensibLawBatchSink(
+        max_items=3,
+        max_wait_seconds=60,
+        storage_factory=FakeStorage,
+        importer=_import,
+    )
+    futures = [
+        sink.submit({"text": str(i)}, audio_path=f"{i}.wav", storage_path="a.db")
+        for i in range(3)
+    ]
+    receipts = [future.result(timeout=5) for future in futures]
+    sink.close()
+
+    assert [r["envelope_id"] for r in receipts] == [1, 2, 3]
+    assert all(r["status"] == "ok" and r["batch_size"] == 3 for r in receipts)
+    assert len(FakeStorage.opened) == 1
+    store = FakeStorage.opened[0]
+    assert store.transactions == 1
+    assert store.closed
+
+
+def test_close_flushes_partial_batches(tmp_path):
+    sink = SensibLawBatchSink(
+        max_items=10,
+        max_wait_seconds=60,
+        storage_factory=FakeStorage,
+        importer=_import,
+    )
+    first = sink.submit({"text": "x"}, audio_path="x.wav", storage_path="a.db")
+    second = sink.submit({"text": "y"}, audio_path="y.wav", storage_path="b.db")
+    assert not first.done()
+
+    sink.close()
+
+    assert first.result()["storage_path"] == "a.db"
+    assert second.result()["storage_path"] == "b.db"
+    assert {store.path for store in FakeStorage.opened} == {"a.db", "b.db"}
+    with pytest.raises(RuntimeError):
+        sink.submit({"text": "z"}, audio_path="z.wav", storage_path="a.db")
+
+
+def test_flush_on_timeout_and_batch_failure(tmp_path):
+    with SensibLawBatchSink(
+        max_items=10,
+        max_wait_seconds=0.05,
+        storage_factory=FakeStorage,
+        importer=_import,
+    ) as sink:
+        ok = sink.submit({"text": "ok"}, audio_path="1.wav", storage_path="a.db")
+        assert ok.result(timeout=5)["envelope_id"] == 1
+        assert sink.flush() == 0
+
+        bad = sink.submit({"fail": True}, audio_path="2.wav", storage_path="a.db")
+        assert sink.flush("a.db") == 1
+        with pytest.raises(RuntimeError):
+            bad.result()
+
+
+def test_batch_failure_is_reported_per_transcript(tmp_path):
+    with SensibLawBatchSink(
+        max_items=3,
+        max_wait_seconds=60,
+        storage_factory=FakeStorage,
+        importer=_import,
+    ) as sink:
+        futures = [
+            sink.submit(payload, audio_path=f"{i}.wav", storage_path="a.db")
+            for i, payload in enumerate([{"text": "a"}, {"fail": True}, {"text": "c"}])
+        ]
+        good, bad, other = (future.exception(timeout=5) for future in futures)
+
+    assert good is None and other is None
+    assert isinstance(bad, RuntimeError)
+    assert futures[0].result()["status"] == "ok"
+    assert FakeStorage.opened[0].rows[-2:] == [("0.wav", "a"), ("2.wav", "c")]
+
+
+def test_dispatcher_fills_batches_beyond_worker_count(tmp_path):
+    outbox = DownstreamOutbox(tmp_path / "state.db")
+    for i in range(6):
+        outbox.enqueue(
+            transcript_hash=f"hash-{i}",
+            sink="sensiblaw",
+            payload={
+                "transcript_payload": {"text": str(i)},
+                "audio_path": f"{i}.wav",
+                "storage_path": "a.db",
+            },
+        )
+    with SensibLawBatchSink(
+        max_items=6,
+        max_wait_seconds=60,
+        storage_factory=FakeStorage,
+        importer=_import,
+    ) as sink:
+        dispatcher = DownstreamDispatcher(
+            outbox, workers=2, handlers={"sensiblaw": sink.deliver}
+        )
+        start = time.monotonic()
+        assert dispatcher.run_once() == 6
+        elapsed = time.monotonic() - start
+
+    assert elapsed < 5
+    assert outbox.pending_count() == 0
+    store = FakeStorage.opened[0]
+    assert store.transactions == 1
+    assert len(store.rows) == 6
+
+
+def test_deliver_skips_already_imported_idempotency_key(tmp_path):
+    with SensibLawBatchSink(
+        max_items=1,
+        max_wait_seconds=60,
+        storage_factory=FakeStorage,
+        importer=_import,
+    ) as sink:
+        payload = {
+            "transcript_payload": {"text": "x"},
+            "audio_path": "x.wav",
+            "storage_path": "a.db",
+            "idempotency_key": "key-1",
+        }
+        first = sink.deliver(payload).result(timeout=5)
+        again = sink.deliver(payload).result(timeout=5)
+
+    assert again == first
+    assert first["idempotency_key"] == "key-1"
+    assert FakeStorage.opened[0].rows == [("x.wav", "x")]
+
+
+def test_deliver_remembers_only_recent_idempotency_keys(tmp_path):
+    with SensibLawBatchSink(
+        max_items=1,
+        max_wait_seconds=60,
+        storage_factory=FakeStorage,
+        importer=_import,
+        max_remembered=2,
+    ) as sink:
+        for key in ("key-1", "key-2", "key-1", "key-3"):
+            payload = {
+                "transcript_payload": {"text": key},
+                "audio_path": "x.wav",
+                "storage_path": "a.db",
+                "idempotency_key": key,
+            }
+            sink.deliver(payload).result(timeout=5)
+        remembered = list(sink._delivered)
+
+    assert remembered == ["key-1", "key-3"]
+    assert [text for _, text in FakeStorage.opened[0].rows] == [
+        "key-1",
+        "key-2",
+        "key-3",
+    ]
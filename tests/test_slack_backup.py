@@ -30,3 +30,29 @@ def test_slack_backup_connector_parses_events():
         if e["actor"] == "U123" and e["details"]["text"] == "Hello world"
     )
     assert user_event["details"]["channel"] == "general"
+
+
+def test_slack_backup_connector_implements_streaming_protocol():
+    from integrations.base import Connector
+
+    export_dir = Path(__file__).parent / "data" / "slack_export"
+    connector = SlackBackupConnector(str(export_dir))
+    assert isinstance(connector, Connector)
+    stream = connector.iter_events()
+    assert iter(stream) is stream
+    assert len(list(stream)) == 4
+
+
+def test_slack_event_ids_are_stable_across_imports():
+    export_dir = Path(__file__).parent / "data" / "slack_export"
+    first = SlackBackupConnector(str(export_dir)).load_messages()
+    second = SlackBackupConnector(str(export_dir)).load_messages()
+    assert [e["event_id"] for e in first] == [e["event_id"] for e in second]
+    assert len({e["event_id"] for e in first}) == len(first)
+
+
+def test_slack_since_skips_older_daily_files():
+    export_dir = Path(__file__).parent / "data" / "slack_export"
+    connector = SlackBackupConnector(str(export_dir))
+    recent = list(connector.iter_events(since="2023-01-03T12:00:00"))
+    assert 0 < len(recent) < len(connector.load_messages())
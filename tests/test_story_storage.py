@@ -0,0 +1,95 @@
+import sqlite3
+from datetime import datetime, timezone
+
+import pytest
+
+from tircorder.story_storage import (
+    ensure_story_events_schema,
+    search_story_events,
+    transcript_segment_events,
+    upsert_story_events,
+)
+
+
+@pytest.fixture()
+def memory_conn():
+    conn = sqlite3.connect(":memory:")
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _message(event_id, timestamp, text, action="message"):
+    return {
+        "event_id": event_id,
+        "timestamp": timestamp,
+        "actor": "Alice",
+        "action": action,
+        "details": {"text": text, "channel": "general"},
+    }
+
+
+def test_schema_has_epoch_column_and_time_indexes(memory_conn):
+    ensure_story_events_schema(memory_conn)
+    columns = {row[1] for row in memory_conn.execute("PRAGMA table_info(story_events)")}
+    assert {"timestamp_ms", "body"} <= columns
+    indexes = {row[1] for row in memory_conn.execute("PRAGMA index_list(story_events)")}
+    assert {
+        "idx_story_events_time",
+        "idx_story_events_actor_time",
+        "idx_story_events_action_time",
+    } <= indexes
+
+    upsert_story_events(
+        [_message("m1", "2024-01-01T10:00:00+10:00", "hi")], conn=memory_conn
+    )
+    assert memory_conn.execute("SELECT timestamp_ms FROM story_events").fetchone() == (
+        1704067200000,
+    )
+
+
+def test_search_spans_voice_and_chat_within_time_range(memory_conn):
+    recorded = datetime(2024, 3, 1, 9, 0, tzinfo=timezone.utc)
+    segments = [
+        {"start": 0.0, "end": 4.0, "text": "Falcon launch moved to May"},
+        {"start": 4.0, "end": 6.0, "text": "  "},
+    ]
+    voice = list(
+        transcript_segment_events(segments, recorded_at=recorded, recording="memo")
+    )
+    assert len(voice) == 1
+    upsert_story_events(voice, source="voice", conn=memory_conn)
+    upsert_story_events(
+        [
+            _message("m1", "2023-06-01T12:00:00Z", "old falcon note"),
+            _message("m2", "2024-03-02T12:00:00Z", "Is the falcon launch on?"),
+            _message("m3", "2024-03-03T12:00:00Z", "lunch?"),
+        ],
+        source="slack",
+        conn=memory_conn,
+    )
+
+    found = search_story_events(memory_conn, "falcon", since="2024-01-01T00:00:00Z")
+    assert [e["event_id"] for e in found] == ["m2", voice[0]["event_id"]]
+    assert found[1]["details"]["text"] == "Falcon launch moved to May"
+
+    only_voice = search_story_events(
+        memory_conn, "falcon", actions=["transcript_segment"]
+    )
+    assert [e["source"] for e in only_voice] == ["voice"]
+
+
+def test_triggers_keep_fulltext_index_in_sync(memory_conn):
+    upsert_story_events(
+        [_message("m1", "2024-01-01T00:00:00Z", "budget draft")], conn=memory_conn
+    )
+    upsert_story_events(
+        [_message("m1", "2024-01-01T00:00:00Z", "invoice final")], conn=memory_conn
+    )
+    assert search_story_events(memory_conn, "budget") == []
+    assert len(search_story_events(memory_conn, "invoice")) == 1
+
+    memory_conn.execute("DELETE FROM story_events WHERE event_id='m1'")
+    assert search_story_events(memory_conn, "invoice") == []
+
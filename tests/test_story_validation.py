@@ -0,0 +1,93 @@
+import pytest
+from jsonschema import ValidationError
+
+from integrations.fitness.apple_health import AppleHealthConnector
+from integrations.location.google_maps import GoogleMapsConnector
+from tircorder.schemas import (
+    FULL_VALIDATION,
+    TRUSTED_CONNECTOR,
+    StoryCheck,
+    StoryValidationPolicy,
+    get_validator,
+    iter_validated_stories,
+    validate_stories,
+    validate_story,
+)
+
+
+def _event(i: int) -> dict:
+    return {
+        "event_id": f"e{i}",
+        "timestamp": "2024-01-01T00:00:00Z",
+        "actor": "user",
+        "action": "test",
+        "details": {},
+    }
+
+
+def test_validator_is_compiled_once():
+    assert get_validator("story") is get_validator("story")
+
+
+def test_validate_story_reports_missing_field():
+    event = _event(0)
+    del event["actor"]
+    with pytest.raises(ValidationError, match="actor"):
+        validate_story(event)
+
+
+def test_validate_stories_full_mode_rejects_any_invalid_event():
+    events = [_event(i) for i in range(5)]
+    events[4]["details"] = "not an object"
+
+    with pytest.raises(ValidationError):
+        validate_stories(events)
+
+
+def test_sample_mode_always_checks_head_and_skips_unsampled():
+    events = [_event(i) for i in range(50)]
+    events[40]["details"] = "not an object"
+    head_only = StoryValidationPolicy(mode="sample", head=10, sample_rate=0.0)
+
+    assert validate_stories(events, head_only) == events
+
+    events[3]["details"] = "not an object"
+    with pytest.raises(ValidationError):
+        validate_stories(events, head_only)
+
+
+def test_iter_validated_stories_is_lazy():
+    def events():
+        yield _event(0)
+        raise AssertionError("consumed too far")
+
+    stream = iter_validated_stories(events())
+    assert next(stream)["event_id"] == "e0"
+
+
+def test_story_check_follows_policy_per_event():
+    check = StoryCheck(StoryValidationPolicy(mode="sample", head=2, sample_rate=0.0))
+    bad = _event(0)
+    bad["details"] = "not an object"
+
+    check(_event(0))
+    with pytest.raises(ValidationError):
+        check(bad)
+    check(bad)  # past the head and not sampled
+    assert check.seen == 3
+
+    with pytest.raises(ValidationError):
+        StoryCheck()(bad)
+    StoryCheck(StoryValidationPolicy(mode="off"))(bad)
+
+
+def test_bulk_connectors_validate_every_event_unless_trusted():
+    assert GoogleMapsConnector().validation == FULL_VALIDATION
+    assert AppleHealthConnector().validation == FULL_VALIDATION
+    trusted = GoogleMapsConnector(validation=TRUSTED_CONNECTOR)
+    assert trusted.validation == TRUSTED_CONNECTOR
+
+
+def test_unknown_mode_rejected():
+    with pytest.raises(ValueError):
+        StoryValidationPolicy(mode="sometimes")
@@ -1,4 +1,6 @@
-from datetime import datetime
+from datetime import datetime, timezone
+
+import pytest
 
 from utilities.timeline import (
     bucket_by_day as util_bucket_by_day,
@@ -8,9 +10,11 @@ from utilities.timeline import (
     step_index as util_step_index,
 )
 from tircorder_utils.timeline import (
+    TimelineIndex,
     bucket_by_day,
     emails_for_day,
     index_emails_by_contact,
+    iter_merged_events,
     merge_event_streams,
     step_index,
 )
@@ -115,3 +119,114 @@ def test_bucket_by_day_groups_and_skips_invalid():
     assert sorted(e["id"] for e in buckets[day_one]) == [1, 2]
     assert [e["id"] for e in buckets[day_two]] == [3]
     assert 4 not in [e["id"] for bucket in buckets.values() for e in bucket]
+
+
+def test_merge_event_streams_accepts_connectors():
+    class _Connector:
+        def iter_events(self):
+            yield {
+                "timestamp": datetime(2024, 5, 1, 12).isoformat(),
+                "event_id": "c1",
+                "id": 5,
+                "actor": "A",
+                "action": "act",
+                "details": {},
+            }
+
+    streams = {
+        "conn": _Connector(),
+        "gen": iter([{"timestamp": datetime(2024, 5, 1, 8).isoformat(), "id": 4}]),
+    }
+    result = merge_event_streams(streams)
+    assert [e["id"] for e in result] == [4, 5]
+    assert [e["source"] for e in result] == ["gen", "conn"]
+    assert [e["id"] for e in util_merge_event_streams({"conn": _Connector()})] == [5]
+
+
+def test_iter_merged_events_is_lazy_and_keeps_source_order_on_ties():
+    consumed = []
+
+    def stream(name, hours):
+        for hour in hours:
+            consumed.append((name, hour))
+            yield {"timestamp": datetime(2024, 5, 1, hour).isoformat(), "id": hour}
+
+    merged = iter_merged_events(
+        {"a": stream("a", range(8, 20)), "b": stream("b", [8, 9])},
+        presorted={"a", "b"},
+    )
+    first = next(merged)
+    assert (first["id"], first["source"]) == (8, "a")
+    assert len(consumed) <= 3
+
+    rest = list(merged)
+    assert [(e["id"], e["source"]) for e in rest[:3]] == [
+        (8, "b"),
+        (9, "a"),
+        (9, "b"),
+    ]
+    assert len(rest) == 13
+
+
+def test_iter_merged_events_sorts_lists_and_mixes_time_zones():
+    aware = datetime(2024, 5, 1, 9, 30, tzinfo=timezone.utc)
+    streams = {
+        "list": [
+            {"timestamp": datetime(2024, 5, 1, 10).isoformat(), "id": 1},
+            {"timestamp": "garbage", "id": 2},
+            {"timestamp": datetime(2024, 5, 1, 9).isoformat(), "id": 3},
+        ],
+        "aware": iter([{"time": aware, "id": 4}]),
+    }
+    result = list(iter_merged_events(streams))
+    assert [e["id"] for e in result] == [3, 4, 1]
+    assert result[1]["timestamp"] == aware.isoformat()
+
+
+def test_iter_merged_events_sorts_unsorted_iterators():
+    def stream():
+        return iter(
+            [
+                {"timestamp": datetime(2024, 5, 1, 10).isoformat(), "id": 1},
+                {"timestamp": datetime(2024, 5, 1, 9).isoformat(), "id": 2},
+            ]
+        )
+
+    other = [{"timestamp": datetime(2024, 5, 1, 8).isoformat(), "id": 3}]
+    result = list(iter_merged_events({"gen": stream(), "list": other}))
+    assert [e["id"] for e in result] == [3, 2, 1]
+
+    # Only a source promised to be chronological may fail, and then before
+    # any event out of order is yielded.
+    with pytest.raises(ValueError, match="'gen'"):
+        list(iter_merged_events({"gen": stream()}, presorted={"gen"}))
+
+
+def test_timeline_index_range_queries_match_scans():
+    events = _sample_events()
+    index = TimelineIndex(events + [{"timestamp": "not a datetime", "id": 5}])
+    assert len(index) == 4
+    assert index.sources == ["chat", "email"]
+    assert index.contacts == ["Alice", "Bob"]
+
+    day = datetime(2024, 5, 1)
+    assert index.day(day, source="email") == emails_for_day(events, day)
+    assert index.by_contact(source=None) == index_emails_by_contact(events)
+    in_order = sorted(events, key=lambda e: e["timestamp"])
+    assert index.buckets_by_day() == bucket_by_day(in_order)
+
+    start, end = datetime(2024, 5, 1, 9), datetime(2024, 5, 2, 9)
+    assert [e["id"] for e in index.between(start, end)] == [1, 2]
+    assert [e["id"] for e in index.between(start, source="email")] == [1, 4]
+    assert [e["id"] for e in index.between(contact="Bob")] == [3, 4]
+    assert index.count(end=end, source="email", contact="Bob") == 1
+    assert index.between(source="sms") == []
+
+
+def test_timeline_index_appends_live_events_in_order():
+    index = TimelineIndex(_sample_events())
+    late = {"timestamp": datetime(2024, 5, 3).isoformat(), "source": "chat", "id": 6}
+    early = {"timestamp": datetime(2024, 4, 30).isoformat(), "source": "chat", "id": 7}
+    assert index.extend([late, early, {"id": 8}]) == 2
+    assert [e["id"] for e in index.between(source="chat")] == [7, 2, 6]
+    assert [e["id"] for e in index.between()][-1] == 6
@@ -314,3 +314,35 @@ def test_get_transcription_backend_merges_defaults() -> None:
     assert backend["backend"]["task_path_template"] == "/task/{identifier}"
     assert backend["downstream"]["sensiblaw"]["enabled"] is True
     assert backend["downstream"]["statibaker"]["enabled"] is False
+
+
+def test_get_transcription_backend_memoised_until_config_changes(
+    tmp_path, monkeypatch
+) -> None:
+    monkeypatch.setenv("TIRCORDER_CONFIG_PATH", str(tmp_path / "config.json"))
+    TircorderConfig.set_config(
+        {"transcription": {"method": "webui", "webui": {"base_url": "http://a"}}}
+    )
+
+    first = get_transcription_backend()
+    assert get_transcription_backend() is first
+
+    TircorderConfig.set_config(
+        {"transcription": {"method": "webui", "webui": {"base_url": "http://b"}}}
+    )
+
+    method, backend = get_transcription_backend()
+    assert method == "webui"
+    assert backend["base_url"] == "http://b"
+
+
+def test_get_transcription_backend_follows_config_path(tmp_path, monkeypatch) -> None:
+    for name, url in (("a.json", "http://a"), ("b.json", "http://b")):
+        monkeypatch.setenv("TIRCORDER_CONFIG_PATH", str(tmp_path / name))
+        TircorderConfig.set_config(
+            {"transcription": {"method": "webui", "webui": {"base_url": url}}}
+        )
+        assert get_transcription_backend()[1]["base_url"] == url
+
+    monkeypatch.setenv("TIRCORDER_CONFIG_PATH", str(tmp_path / "a.json"))
+    assert get_transcription_backend()[1]["base_url"] == "http://a"
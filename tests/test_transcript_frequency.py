@@ -10,3 +10,55 @@ def test_calculate_noun_frequency_counts_nouns(tmp_path):
 
     # Expected nouns: Alice, Bob, Wonderland, Alice, rabbit -> 5 occurrences
     assert freq == 5
+
+
+def test_calculate_noun_frequencies_caches_by_content(tmp_path, monkeypatch):
+    from Pelican import transcript_frequency
+    from Pelican.transcript_frequency import (
+        NounFrequencyCache,
+        calculate_noun_frequencies,
+    )
+
+    first = tmp_path / "a.txt"
+    copy = tmp_path / "b.txt"
+    first.write_text("Alice met Bob in Wonderland. Alice saw the rabbit.")
+    copy.write_text(first.read_text())
+    missing = str(tmp_path / "missing.txt")
+    paths = [str(first), str(copy), missing]
+    cache = NounFrequencyCache(str(tmp_path / "nouns.sqlite"))
+
+    tagged = []
+    count_nouns = transcript_frequency._count_nouns
+
+    def counting(data):
+        tagged.append(data)
+        return count_nouns(data)
+
+    monkeypatch.setattr(transcript_frequency, "_count_nouns", counting)
+    assert calculate_noun_frequencies(paths, cache, workers=1) == {
+        str(first): 5,
+        str(copy): 5,
+        missing: None,
+    }
+    assert len(tagged) == 1
+
+    assert calculate_noun_frequencies(paths, cache, workers=1)[str(copy)] == 5
+    assert len(tagged) == 1
+
+    copy.write_text("Alice")
+    assert calculate_noun_frequencies([str(copy)], cache, workers=1) == {str(copy): 1}
+    assert len(tagged) == 2
+    cache.close()
+
+
+def test_calculate_noun_frequencies_process_pool(tmp_path):
+    from Pelican.transcript_frequency import calculate_noun_frequencies
+
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"t{i}.txt"
+        path.write_text("Alice met Bob. " * (i + 1))
+        paths.append(str(path))
+
+    expected = {path: calculate_noun_frequency(path) for path in paths}
+    assert calculate_noun_frequencies(paths, workers=2, chunksize=1) == expected
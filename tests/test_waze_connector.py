@@ -1,5 +1,8 @@
+import json
+import sqlite3
 from pathlib import Path
 
+from integrations.location.trajectory import load_raw_points
 from integrations.location.waze import WazeConnector
 
 
@@ -18,3 +21,36 @@ def test_parse_drive_history(tmp_path):
     second = events[1]["details"]
     assert second["start_point"] is None
     assert second["end_point"] is None
+
+
+def test_drive_path_is_simplified_and_raw_points_kept(tmp_path):
+    route = [{"lat": 34.0, "lon": -118.0 + i * 0.001} for i in range(50)]
+    route += [{"lat": 34.0 + i * 0.001, "lon": -117.951} for i in range(1, 50)]
+    export = tmp_path / "waze.json"
+    export.write_text(
+        json.dumps(
+            {
+                "drives": [
+                    {
+                        "startTime": "2024-05-01T08:00:00Z",
+                        "endTime": "2024-05-01T08:30:00Z",
+                        "lengthMeters": 10000,
+                        "segments": route,
+                    }
+                ]
+            }
+        ),
+        encoding="utf-8",
+    )
+    conn = sqlite3.connect(":memory:")
+
+    (event,) = WazeConnector(conn=conn).iter_events(str(export))
+
+    assert event["details"]["path"] == [
+        [34.0, -118.0],
+        [34.0, -117.951],
+        [34.049, -117.951],
+    ]
+    raw = load_raw_points(conn, event["event_id"])
+    assert len(raw) == len(route)
+    assert raw[0][1:] == (34.0, -118.0)
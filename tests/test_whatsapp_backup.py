@@ -1,6 +1,11 @@
+from datetime import datetime
 from pathlib import Path
 
-from integrations.whatsapp_backup import WhatsAppBackupConnector
+from integrations.whatsapp_backup import (
+    WhatsAppBackupConnector,
+    _compile_format,
+    _match_header,
+)
 
 
 DATA_DIR = Path(__file__).parent / "data"
@@ -24,3 +29,134 @@ def test_parse_json_chat():
     assert events[0]["actor"] == "Alice"
     assert events[1]["details"]["media_omitted"] is True
     assert connector.participants == {"Alice", "Bob"}
+
+
+def test_iter_events_yields_lazily():
+    connector = WhatsAppBackupConnector()
+    stream = connector.iter_events(DATA_DIR / "whatsapp_plain.txt")
+    first = next(stream)
+    assert first["actor"] == "Alice"
+    assert connector.participants == {"Alice"}
+    assert [e["actor"] for e in stream] == ["Bob"]
+
+
+def test_multiline_messages_are_kept(tmp_path):
+    chat = tmp_path / "chat.txt"
+    chat.write_text(
+        "1/1/21, 10:00 AM - Alice: Shopping list:\n"
+        "- eggs\n"
+        "- milk\n"
+        "1/1/21, 10:05 AM - Bob: Got it\n",
+        encoding="utf-8",
+    )
+    events = WhatsAppBackupConnector().parse(chat)
+    assert [e["details"]["message"] for e in events] == [
+        "Shopping list:\n- eggs\n- milk",
+        "Got it",
+    ]
+
+
+def test_day_first_format_is_detected_and_locked(tmp_path):
+    chat = tmp_path / "chat.txt"
+    chat.write_text(
+        "02/03/21, 09:15 - Alice: Morning\n"
+        "25/03/21, 18:40 - Bob: Evening\n"
+        "Messages and calls are end-to-end encrypted.\n",
+        encoding="utf-8",
+    )
+    events = WhatsAppBackupConnector().parse(chat)
+    assert [e["timestamp"] for e in events] == [
+        "2021-03-02T09:15:00",
+        "2021-03-25T18:40:00",
+    ]
+
+
+def test_day_first_is_detected_past_the_sniffed_lines(tmp_path):
+    chat = tmp_path / "chat.txt"
+    lines = [f"0{i % 9 + 1}/01/21, 10:{i:02d} - Alice: msg {i}\n" for i in range(60)]
+    lines += [
+        "13/01/21, 09:00 - Bob: later\n",
+        "14/01/21, 09:30 - Bob: much later\n",
+    ]
+    chat.write_text("".join(lines), encoding="utf-8")
+    events = WhatsAppBackupConnector().parse(chat)
+    assert len(events) == 62
+    assert events[0]["timestamp"] == "2021-01-01T10:00:00"
+    assert events[59]["details"]["message"] == "msg 59"
+    assert [e["timestamp"] for e in events[-2:]] == [
+        "2021-01-13T09:00:00",
+        "2021-01-14T09:30:00",
+    ]
+
+
+def test_header_outside_the_detected_dates_is_not_a_continuation():
+    month_first = _compile_format("%m/%d/%y, %H:%M")
+    timestamp, rest = _match_header("13/02/21, 18:40 - Bob: Evening", month_first)
+    assert timestamp == datetime(2021, 2, 13, 18, 40)
+    assert rest == "Bob: Evening"
+
+
+def test_other_formats_are_continuations_once_detected(tmp_path):
+    chat = tmp_path / "chat.txt"
+    chat.write_text(
+        "02/03/21, 09:15 - Alice: Forwarding this:\n"
+        "3/1/21, 8:00 AM - Carol: old note\n"
+        "25/03/21, 18:40 - Bob: Thanks\n",
+        encoding="utf-8",
+    )
+    events = WhatsAppBackupConnector().parse(chat)
+    assert [e["details"]["message"] for e in events] == [
+        "Forwarding this:\n3/1/21, 8:00 AM - Carol: old note",
+        "Thanks",
+    ]
+
+
+def test_bracketed_text_export_is_not_loaded_as_json(tmp_path, monkeypatch):
+    chat = tmp_path / "chat.txt"
+    chat.write_text(
+        "[02/03/21, 09:15] Alice: Morning\n",
+        encoding="utf-8",
+    )
+
+    def _no_json(*_args, **_kwargs):
+        raise AssertionError("text export parsed as JSON")
+
+    monkeypatch.setattr("integrations.whatsapp_backup.json.load", _no_json)
+    WhatsAppBackupConnector().parse(chat)
+
+
+def test_event_ids_are_content_derived(tmp_path):
+    chat = tmp_path / "chat.txt"
+    chat.write_text(
+        "1/1/21, 10:00 AM - Alice: ok\n"
+        "1/1/21, 10:00 AM - Alice: ok\n"
+        "1/1/21, 10:01 AM - Bob: sure\n",
+        encoding="utf-8",
+    )
+    first = [e["event_id"] for e in WhatsAppBackupConnector().parse(chat)]
+    chat.write_text("1/1/21, 9:59 AM - Bob: hi\n" + chat.read_text(), "utf-8")
+    second = [e["event_id"] for e in WhatsAppBackupConnector().parse(chat)]
+    assert len(set(first)) == 3
+    assert second[1:] == first
+
+
+def test_checkpoint_resumes_appended_text_export(tmp_path):
+    chat = tmp_path / "chat.txt"
+    chat.write_text(
+        "1/1/21, 10:00 AM - Alice: one\n" "1/1/21, 10:01 AM - Bob: two\n" "continued\n",
+        encoding="utf-8",
+    )
+    connector = WhatsAppBackupConnector()
+    full = connector.parse(chat)
+    checkpoint = connector.checkpoint
+    assert checkpoint.last_timestamp == "2021-01-01T10:01:00"
+
+    with chat.open("a", encoding="utf-8") as fh:
+        fh.write("1/1/21, 10:02 AM - Alice: three\n")
+    resumed = WhatsAppBackupConnector(checkpoint=checkpoint).parse(chat)
+    assert [e["details"]["message"] for e in resumed] == ["two\ncontinued", "three"]
+    assert resumed[0]["event_id"] == full[1]["event_id"]
+
+    chat.write_text("2/1/21, 8:00 AM - Carol: new file\n", encoding="utf-8")
+    replaced = WhatsAppBackupConnector(checkpoint=checkpoint).parse(chat)
+    assert [e["actor"] for e in replaced] == ["Carol"]
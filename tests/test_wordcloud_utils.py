@@ -35,3 +35,102 @@ def test_empty_text_wordcloud(tmp_path):
     assert summary.word_counts == {}
     assert summary.wordcloud_html == '<div class="wordcloud"></div>'
     cache.close()
+
+
+def test_top_terms_aggregates_documents():
+    from datetime import date
+
+    from tircorder_utils.wordcloud_utils import generate_corpus_wordcloud
+
+    cache = WordCloudCache(db_path=":memory:")
+    cache.add_document("alpha beta beta", "a", contact="Alice", day=date(2024, 5, 1))
+    cache.add_document("beta gamma", "b", contact="Bob", day=date(2024, 5, 2))
+    cache.add_document("alpha alpha", "c", contact="Alice", day=date(2024, 6, 1))
+
+    assert cache.top_terms() == {"alpha": 3, "beta": 3, "gamma": 1}
+    assert cache.top_terms(1) == {"alpha": 3}
+    assert cache.top_terms(contact="Alice") == {"alpha": 3, "beta": 2}
+    assert cache.top_terms(start=date(2024, 5, 1), end=date(2024, 5, 31)) == {
+        "beta": 3,
+        "alpha": 1,
+        "gamma": 1,
+    }
+    assert cache.top_terms(keys=["b", "c"]) == {"alpha": 2, "beta": 1, "gamma": 1}
+    assert cache.top_terms(keys=[]) == {}
+
+    summary = generate_corpus_wordcloud(cache, contact="Bob")
+    assert summary.word_counts == {"beta": 1, "gamma": 1}
+    assert "gamma" in summary.wordcloud_html
+    cache.close()
+
+
+def test_add_document_updates_incrementally():
+    cache = WordCloudCache(db_path=":memory:")
+    doc_id = cache.add_document("one two", "t1")
+    assert cache.add_document("one two", "t1") == doc_id
+    assert cache.add_document("two three three", "t1") == doc_id
+    assert cache.top_terms() == {"three": 2, "two": 1}
+    assert cache.document_counts(doc_id) == {"three": 2, "two": 1}
+
+    assert cache.remove_document("t1")
+    assert not cache.remove_document("t1")
+    assert cache.top_terms() == {}
+    cache.close()
+
+
+def test_rollback_does_not_leave_stale_term_ids():
+    cache = WordCloudCache(":memory:")
+    cache.add_document("alpha beta", key="a")
+    cache.add_document("gamma delta", key="b", commit=False)
+    cache.conn.rollback()
+
+    cache.add_document("gamma epsilon", key="c")
+    assert cache.top_terms() == {"alpha": 1, "beta": 1, "epsilon": 1, "gamma": 1}
+
+
+def test_ad_hoc_texts_are_not_counted_in_the_corpus():
+    cache = WordCloudCache(":memory:")
+    cache.add_document("apple apple pear", key="a")
+    cache.add_document("apple plum", key="b")
+
+    summary = generate_wordcloud("apple apple pear apple plum", cache)
+    assert summary.word_counts["apple"] == 3
+    assert cache.top_terms() == {"apple": 3, "pear": 1, "plum": 1}
+
+    cache.add_document("apple apple pear apple plum")
+    assert cache.top_terms()["apple"] == 6
+    cache.close()
+
+
+def test_top_terms_splits_long_key_lists():
+    cache = WordCloudCache(":memory:")
+    keys = [f"doc{i}" for i in range(1200)]
+    for i, key in enumerate(keys):
+        cache.add_document("common" + (" rare" if i % 2 else ""), key, commit=False)
+    cache.conn.commit()
+
+    assert cache.top_terms(keys=keys + keys[:10]) == {"common": 1200, "rare": 600}
+    assert cache.top_terms(1, keys=keys) == {"common": 1200}
+    cache.close()
+
+
+def test_legacy_json_rows_are_migrated(tmp_path):
+    import json
+    import sqlite3
+
+    db_path = tmp_path / "wc.sqlite"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE wordclouds (text_hash TEXT PRIMARY KEY, counts TEXT)")
+    text_hash = WordCloudCache._hash_text("old old text")
+    conn.execute(
+        "INSERT INTO wordclouds VALUES (?, ?)",
+        (text_hash, json.dumps({"old": 2, "text": 1})),
+    )
+    conn.commit()
+    conn.close()
+
+    cache = WordCloudCache(db_path=str(db_path))
+    assert cache.get_or_create("old old text") == {"old": 2, "text": 1}
+    assert cache.top_terms() == {}
+    assert cache.conn.execute("SELECT COUNT(*) FROM wordclouds").fetchone()[0] == 1
+    cache.close()
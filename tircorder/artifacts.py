@@ -0,0 +1,159 @@
+"""Atomic JSON and NDJSON artifact writers.
+
+Artifacts are written to a temporary file in the target directory, flushed,
+``fsync``'d and then renamed over the destination, so readers never observe a
+half-written envelope or receipts file.
+
+NDJSON artifacts hold one compact JSON document per line: a header record
+followed by any number of records. They can be written from an iterator and
+read back lazily, so a recording with thousands of segment events never needs
+the whole document in memory.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import stat
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator, Mapping, Optional, Tuple
+
+_COMPACT_SEPARATORS = (",", ":")
+
+_TEMP_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOINHERIT", 0)
+
+
+@contextmanager
+def atomic_write(path: str | Path) -> Iterator[IO[str]]:
+    """Yield a text handle whose contents replace ``path`` on success.
+
+    A new file gets the mode a plain ``open`` would give it; replacing an
+    existing file keeps that file's mode.
+    """
+
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = _create_temp(target)
+    try:
+        try:
+            os.chmod(tmp_name, stat.S_IMODE(os.stat(target).st_mode))
+        except FileNotFoundError:
+            pass
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            yield handle
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, target)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_directory(target.parent)
+
+
+def _create_temp(target: Path) -> Tuple[int, str]:
+    """Create an empty temporary file next to ``target``; return its fd and name.
+
+    Unlike ``tempfile.mkstemp``, which always uses mode 0600, the file is
+    created as 0666 less the process umask.
+    """
+
+    for _ in range(100):
+        name = str(target.parent / f".{target.name}.{secrets.token_hex(6)}.tmp")
+        try:
+            return os.open(name, _TEMP_FLAGS, 0o666), name
+        except FileExistsError:
+            continue
+    raise FileExistsError(f"no free temporary file name next to {target}")
+
+
+def _fsync_directory(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # pragma: no cover - e.g. Windows
+        return
+    try:
+        os.fsync(fd)
+    except OSError:  # pragma: no cover - filesystem without dir fsync
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_json(
+    path: str | Path, payload: Mapping[str, Any], *, indent: Optional[int] = None
+) -> Path:
+    """Atomically write ``payload`` as JSON, compact unless ``indent`` is set."""
+
+    target = Path(path)
+    with atomic_write(target) as handle:
+        json.dump(
+            payload,
+            handle,
+            ensure_ascii=False,
+            indent=indent,
+            separators=None if indent is not None else _COMPACT_SEPARATORS,
+        )
+    return target
+
+
+def write_ndjson(
+    path: str | Path, header: Mapping[str, Any], records: Iterable[Mapping[str, Any]]
+) -> Path:
+    """Atomically write ``header`` and then each of ``records`` as NDJSON.
+
+    ``records`` is consumed lazily, one line at a time.
+    """
+
+    target = Path(path)
+    with atomic_write(target) as handle:
+        for record in _chain_header(header, records):
+            handle.write(
+                json.dumps(record, ensure_ascii=False, separators=_COMPACT_SEPARATORS)
+            )
+            handle.write("\n")
+    return target
+
+
+def _chain_header(
+    header: Mapping[str, Any], records: Iterable[Mapping[str, Any]]
+) -> Iterator[Mapping[str, Any]]:
+    yield header
+    yield from records
+
+
+def iter_ndjson(path: str | Path) -> Iterator[Any]:
+    """Yield each JSON document in the NDJSON file at ``path``."""
+
+    with open(path, "r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def read_ndjson(path: str | Path) -> Tuple[Any, Iterator[Any]]:
+    """Return the header of ``path`` and a lazy iterator over its records.
+
+    The file stays open until the returned iterator is exhausted or closed.
+    """
+
+    documents = iter_ndjson(path)
+    try:
+        header = next(documents)
+    except StopIteration:
+        raise ValueError(f"empty NDJSON artifact: {path}") from None
+    return header, documents
+
+
+__all__ = [
+    "atomic_write",
+    "iter_ndjson",
+    "read_ndjson",
+    "write_json",
+    "write_ndjson",
+]
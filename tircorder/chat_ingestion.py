@@ -1,4 +1,5 @@
 """Chat ingestion workflow utilities."""
+
 from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
@@ -6,6 +7,7 @@ import sqlite3
 
 from integrations.chat_history import load_chat_history
 from tircorder.chat_storage import upsert_chat_events, DB_PATH
+from tircorder.story_storage import upsert_story_events
 
 
 def ingest_chat_history(
@@ -14,8 +16,13 @@ def ingest_chat_history(
     conn: Optional[sqlite3.Connection] = None,
     db_path: str = DB_PATH,
 ) -> List[Dict[str, Any]]:
-    """Load chat history from *path* and persist the resulting events."""
+    """Load chat history from *path* and persist the resulting events.
+
+    Events are written to ``chat_events`` and to the searchable
+    ``story_events`` table.
+    """
 
     events = load_chat_history(path)
     upsert_chat_events(events, conn=conn, db_path=db_path)
+    upsert_story_events(events, source="chat_history", conn=conn, db_path=db_path)
     return events
@@ -3,7 +3,8 @@ from __future__ import annotations
 
 import json
 import sqlite3
-from typing import Any, Iterable, Mapping, Optional
+from itertools import chain
+from typing import Any, Iterable, Iterator, Mapping, Optional
 
 DB_PATH = "state.db"
 
@@ -55,7 +56,8 @@ def upsert_chat_events(
     ----------
     events:
         Iterable of mapping objects containing ``event_id``, ``timestamp``,
-        ``actor``, ``action`` and ``details`` fields.
+        ``actor``, ``action`` and ``details`` fields. Iterators, such as a
+        connector's ``iter_events()``, are consumed lazily.
     conn:
         Optional existing database connection. When omitted a new connection is
         created using ``db_path``.
@@ -68,8 +70,9 @@ def upsert_chat_events(
         The number of events written to the database.
     """
 
-    materialised_events = list(events)
-    if not materialised_events:
+    iterator = iter(events)
+    first = next(iterator, None)
+    if first is None:
         return 0
 
     owns_connection = False
@@ -77,10 +80,11 @@ def upsert_chat_events(
         conn = sqlite3.connect(db_path)
         owns_connection = True
 
-    try:
-        ensure_chat_events_schema(conn)
-        rows = []
-        for event in materialised_events:
+    written = 0
+
+    def rows() -> Iterator[tuple]:
+        nonlocal written
+        for event in chain((first,), iterator):
             try:
                 event_id = event["event_id"]
                 timestamp = event["timestamp"]
@@ -90,8 +94,11 @@ def upsert_chat_events(
             actor = event.get("actor")
             action = event.get("action")
             details = _serialise_details(event.get("details"))
-            rows.append((event_id, timestamp, actor, action, details))
+            written += 1
+            yield (event_id, timestamp, actor, action, details)
 
+    try:
+        ensure_chat_events_schema(conn)
         conn.executemany(
             """
             INSERT INTO chat_events (event_id, timestamp, actor, action, details)
@@ -102,11 +109,11 @@ def upsert_chat_events(
                 action=excluded.action,
                 details=excluded.details
             """,
-            rows,
+            rows(),
         )
         conn.commit()
     finally:
         if owns_connection:
             conn.close()
 
-    return len(rows)
+    return written
@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-import hashlib
-import json
 import logging
 import sys
 from pathlib import Path
-from typing import Any, Dict, Mapping, Optional
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Optional
+
+if TYPE_CHECKING:  # pragma: no cover - typing only
+    from tircorder.downstream_outbox import DownstreamDispatcher, DownstreamOutbox
+
+from tircorder.artifacts import write_json
+from tircorder.hashing import sha256_json
 
 
 _SUITE_ROOT = Path(__file__).resolve().parents[2]
@@ -18,11 +22,12 @@ for candidate in (_SENSIBLAW_ROOT, _SENSIBLAW_SRC, _STATIBAKER_ROOT):
         sys.path.insert(0, str(candidate))
 
 
-def write_json_artifact(path: str | Path, payload: Mapping[str, Any]) -> Path:
-    target = Path(path)
-    target.parent.mkdir(parents=True, exist_ok=True)
-    target.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    return target
+def write_json_artifact(
+    path: str | Path, payload: Mapping[str, Any], *, indent: Optional[int] = None
+) -> Path:
+    """Atomically write ``payload`` as JSON; compact unless ``indent`` is given."""
+
+    return write_json(path, payload, indent=indent)
 
 
 def write_downstream_receipts(path: str | Path, payload: Mapping[str, Any]) -> Path:
@@ -34,10 +39,16 @@ def build_downstream_receipts(
     metadata: Mapping[str, Any],
     transcript_payload: Mapping[str, Any],
     transcript_artifact_path: Optional[str | Path] = None,
+    transcript_hash: Optional[str] = None,
 ) -> Dict[str, Any]:
-    transcript_hash = hashlib.sha256(
-        json.dumps(transcript_payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
-    ).hexdigest()
+    """Return the receipts skeleton for a finished transcription job.
+
+    ``transcript_hash`` may be passed when it is already known, e.g. from the
+    execution envelope's ``provenance``, to avoid re-serialising the payload.
+    """
+
+    if transcript_hash is None:
+        transcript_hash = sha256_json(transcript_payload)
     return {
         "job_id": metadata.get("task_id"),
         "protocol": metadata.get("protocol"),
@@ -48,11 +59,23 @@ def build_downstream_receipts(
     }
 
 
+def envelope_transcript_hash(
+    execution_envelope: Optional[Mapping[str, Any]],
+) -> Optional[str]:
+    """Return ``provenance.transcript_hash`` from an execution envelope, if any."""
+
+    if not execution_envelope:
+        return None
+    provenance = execution_envelope.get("provenance") or {}
+    return provenance.get("transcript_hash")
+
+
 def ingest_into_sensiblaw(
     transcript_payload: Mapping[str, Any],
     *,
     audio_path: str | Path,
     storage_path: str | Path,
+    idempotency_key: Optional[str] = None,
 ) -> Dict[str, Any]:
     from sensiblaw.ingest.whisperx_adapter import import_whisperx_transcript
     from storage.core import Storage
@@ -64,11 +87,14 @@ def ingest_into_sensiblaw(
             transcript_payload,
             audio_path=audio_path,
         )
-        return {
+        receipt = {
             "status": "ok",
             "storage_path": str(storage_path),
             "envelope_id": envelope_id,
         }
+        if idempotency_key:
+            receipt["idempotency_key"] = idempotency_key
+        return receipt
     finally:
         store.close()
 
@@ -79,15 +105,19 @@ def append_into_statibaker(
     log_root: str | Path,
     transcript_artifact_path: Optional[str | Path] = None,
     completed_at: Optional[str] = None,
+    idempotency_key: Optional[str] = None,
 ) -> Dict[str, Any]:
     from adapters.whisperx_webui_execution import append_transcription_activity_log
 
-    return append_transcription_activity_log(
+    receipt = append_transcription_activity_log(
         log_root=log_root,
         execution_envelope=execution_envelope,
         transcript_artifact_path=transcript_artifact_path,
         completed_at=completed_at,
     )
+    if idempotency_key:
+        receipt = {**receipt, "idempotency_key": idempotency_key}
+    return receipt
 
 
 def fanout_whisperx_downstream(
@@ -98,11 +128,47 @@ def fanout_whisperx_downstream(
     metadata: Mapping[str, Any],
     downstream_config: Mapping[str, Any],
     transcript_artifact_path: Optional[str | Path] = None,
+    outbox: Optional["DownstreamOutbox"] = None,
+    receipts_path: Optional[str | Path] = None,
+    dispatcher: Optional["DownstreamDispatcher"] = None,
 ) -> Dict[str, Any]:
+    """Fan a finished transcript out to the configured SensibLaw/StatiBaker sinks.
+
+    Without an outbox the sinks run inline, one after the other. With an
+    :class:`~tircorder.downstream_outbox.DownstreamOutbox`, passed as
+    ``outbox`` or enabled by ``downstream_config["outbox"]``, the deliveries
+    are queued instead and the receipts report each sink as ``pending`` until
+    a dispatcher delivers it.
+    """
+
+    if outbox is None and (downstream_config.get("outbox") or {}).get("enabled"):
+        from tircorder.downstream_outbox import outbox_from_config
+
+        outbox, configured_dispatcher = outbox_from_config(
+            downstream_config["outbox"]
+        )
+        dispatcher = dispatcher or configured_dispatcher
+
+    if outbox is not None:
+        from tircorder.downstream_outbox import enqueue_whisperx_downstream
+
+        return enqueue_whisperx_downstream(
+            outbox,
+            audio_path=audio_path,
+            transcript_payload=transcript_payload,
+            execution_envelope=execution_envelope,
+            metadata=metadata,
+            downstream_config=downstream_config,
+            transcript_artifact_path=transcript_artifact_path,
+            receipts_path=receipts_path,
+            dispatcher=dispatcher,
+        )
+
     receipts = build_downstream_receipts(
         metadata=metadata,
         transcript_payload=transcript_payload,
         transcript_artifact_path=transcript_artifact_path,
+        transcript_hash=envelope_transcript_hash(execution_envelope),
     )
 
     sensiblaw_config = dict(downstream_config.get("sensiblaw") or {})
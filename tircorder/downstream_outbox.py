@@ -0,0 +1,619 @@
+"""Persistent outbox for asynchronous WhisperX downstream fan-out.
+
+The transcription path only records one outbox row per enabled sink and
+returns. A :class:`DownstreamDispatcher` drains the outbox on a worker pool,
+retrying failed deliveries with exponential backoff and rewriting the
+``downstream_receipts`` artifact as each sink completes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from tircorder import downstream
+
+DB_PATH = "state.db"
+
+STATUS_PENDING = "pending"
+STATUS_IN_FLIGHT = "in_flight"
+STATUS_DELIVERED = "delivered"
+STATUS_FAILED = "failed"
+
+
+def ensure_outbox_schema(conn: sqlite3.Connection) -> None:
+    """Ensure the ``downstream_outbox`` table and indexes exist."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS downstream_outbox (
+            idempotency_key TEXT PRIMARY KEY,
+            transcript_hash TEXT NOT NULL,
+            job_id TEXT,
+            sink TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            receipts_path TEXT,
+            status TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            result TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_downstream_outbox_due
+        ON downstream_outbox(status, next_attempt_at)
+        """
+    )
+    conn.execute(
+        """
+        CREATE INDEX IF NOT EXISTS idx_downstream_outbox_transcript
+        ON downstream_outbox(transcript_hash)
+        """
+    )
+
+
+def idempotency_key(transcript_hash: str, sink: str, target: Any) -> str:
+    """Return the delivery key for ``sink``/``target`` and a transcript hash."""
+    source = f"{sink}:{target}:{transcript_hash}"
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def _utcnow() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _deliver_sensiblaw(payload: Mapping[str, Any]) -> Dict[str, Any]:
+    return downstream.ingest_into_sensiblaw(
+        payload["transcript_payload"],
+        audio_path=payload["audio_path"],
+        storage_path=payload["storage_path"],
+        idempotency_key=payload.get("idempotency_key"),
+    )
+
+
+def _deliver_statibaker(payload: Mapping[str, Any]) -> Dict[str, Any]:
+    return downstream.append_into_statibaker(
+        payload["execution_envelope"],
+        log_root=payload["log_root"],
+        transcript_artifact_path=payload.get("transcript_artifact_path"),
+        completed_at=payload.get("completed_at"),
+        idempotency_key=payload.get("idempotency_key"),
+    )
+
+
+SINK_HANDLERS: Dict[str, Callable[[Mapping[str, Any]], Dict[str, Any]]] = {
+    "sensiblaw": _deliver_sensiblaw,
+    "statibaker": _deliver_statibaker,
+}
+
+_SINK_TARGET_KEYS = {"sensiblaw": "storage_path", "statibaker": "log_root"}
+
+
+class DownstreamOutbox:
+    """SQLite-backed queue of pending downstream sink deliveries.
+
+    Parameters
+    ----------
+    db_path:
+        SQLite database holding the ``downstream_outbox`` table. Each
+        operation opens its own connection so the outbox can be shared between
+        the transcription thread and dispatcher workers.
+    max_attempts:
+        Number of delivery attempts before a row is marked ``failed``.
+    base_delay:
+        Backoff in seconds after the first failed attempt; doubled for each
+        further failure.
+    max_delay:
+        Upper bound in seconds for the backoff delay.
+    lease_seconds:
+        How long a claimed row stays ``in_flight`` before another dispatcher
+        may reclaim it, e.g. after a crash.
+    """
+
+    def __init__(
+        self,
+        db_path: str | Path = DB_PATH,
+        *,
+        max_attempts: int = 5,
+        base_delay: float = 2.0,
+        max_delay: float = 300.0,
+        lease_seconds: float = 600.0,
+    ) -> None:
+        self.db_path = str(db_path)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease_seconds = lease_seconds
+        self._claim_lock = threading.Lock()
+        with self._connect() as conn:
+            ensure_outbox_schema(conn)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def backoff(self, attempts: int) -> float:
+        """Return the retry delay after ``attempts`` failed deliveries."""
+        return min(self.base_delay * (2 ** max(attempts - 1, 0)), self.max_delay)
+
+    # ------------------------------------------------------------------
+    def enqueue(
+        self,
+        *,
+        transcript_hash: str,
+        sink: str,
+        payload: Mapping[str, Any],
+        job_id: Optional[str] = None,
+        receipts_path: Optional[str | Path] = None,
+    ) -> str:
+        """Record a delivery for ``sink`` and return its idempotency key.
+
+        Re-enqueueing the same transcript for the same sink target is a no-op,
+        so a delivered sink is never written twice.
+        """
+
+        if sink not in SINK_HANDLERS:
+            raise ValueError(f"unknown downstream sink: {sink}")
+        key = idempotency_key(
+            transcript_hash, sink, payload.get(_SINK_TARGET_KEYS[sink])
+        )
+        now = _utcnow()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO downstream_outbox (
+                    idempotency_key, transcript_hash, job_id, sink, payload,
+                    receipts_path, status, attempts, next_attempt_at,
+                    created_at, updated_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, 0, ?, ?, ?)
+                """,
+                (
+                    key,
+                    transcript_hash,
+                    job_id,
+                    sink,
+                    json.dumps(payload, ensure_ascii=False, default=str),
+                    str(receipts_path) if receipts_path else None,
+                    STATUS_PENDING,
+                    time.time(),
+                    now,
+                    now,
+                ),
+            )
+        return key
+
+    def claim(self, limit: int) -> List[Dict[str, Any]]:
+        """Lease up to ``limit`` due rows and return them for delivery."""
+
+        if limit <= 0:
+            return []
+        now = time.time()
+        with self._claim_lock, self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                """
+                SELECT * FROM downstream_outbox
+                WHERE status IN (?, ?) AND next_attempt_at <= ?
+                ORDER BY next_attempt_at
+                LIMIT ?
+                """,
+                (STATUS_PENDING, STATUS_IN_FLIGHT, now, limit),
+            ).fetchall()
+            conn.executemany(
+                """
+                UPDATE downstream_outbox
+                SET status = ?, next_attempt_at = ?, updated_at = ?
+                WHERE idempotency_key = ?
+                """,
+                [
+                    (
+                        STATUS_IN_FLIGHT,
+                        now + self.lease_seconds,
+                        _utcnow(),
+                        row["idempotency_key"],
+                    )
+                    for row in rows
+                ],
+            )
+        return [dict(row) for row in rows]
+
+    def mark_delivered(self, key: str, result: Mapping[str, Any]) -> None:
+        """Record a successful delivery for ``key``."""
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE downstream_outbox
+                SET status = ?, attempts = attempts + 1, result = ?,
+                    last_error = NULL, updated_at = ?
+                WHERE idempotency_key = ?
+                """,
+                (
+                    STATUS_DELIVERED,
+                    json.dumps(result, ensure_ascii=False, default=str),
+                    _utcnow(),
+                    key,
+                ),
+            )
+
+    def mark_failed(self, key: str, error: str) -> str:
+        """Record a failed attempt for ``key`` and return the new status."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT attempts FROM downstream_outbox WHERE idempotency_key = ?",
+                (key,),
+            ).fetchone()
+            attempts = (row[0] if row else 0) + 1
+            status = STATUS_FAILED if attempts >= self.max_attempts else STATUS_PENDING
+            conn.execute(
+                """
+                UPDATE downstream_outbox
+                SET status = ?, attempts = ?, next_attempt_at = ?,
+                    last_error = ?, updated_at = ?
+                WHERE idempotency_key = ?
+                """,
+                (
+                    status,
+                    attempts,
+                    time.time() + self.backoff(attempts),
+                    error,
+                    _utcnow(),
+                    key,
+                ),
+            )
+        return status
+
+    def sink_receipts(self, transcript_hash: str) -> Dict[str, Dict[str, Any]]:
+        """Return the current receipt per sink for ``transcript_hash``."""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute(
+                "SELECT * FROM downstream_outbox WHERE transcript_hash = ?",
+                (transcript_hash,),
+            ).fetchall()
+        return {row["sink"]: _receipt_for_row(dict(row)) for row in rows}
+
+    def pending_count(self) -> int:
+        """Return the number of rows not yet delivered or abandoned."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) FROM downstream_outbox WHERE status IN (?, ?)",
+                (STATUS_PENDING, STATUS_IN_FLIGHT),
+            ).fetchone()
+        return row[0]
+
+
+def _receipt_for_row(row: Mapping[str, Any]) -> Dict[str, Any]:
+    """Build the receipt entry stored under ``sinks[<sink>]``.
+
+    Once delivered, the sink's own receipt is merged in so ``status`` matches
+    what the synchronous fan-out reports; ``delivery_status`` always carries
+    the outbox state.
+    """
+
+    payload = json.loads(row["payload"])
+    target_key = _SINK_TARGET_KEYS[row["sink"]]
+    receipt: Dict[str, Any] = {
+        "status": row["status"],
+        "delivery_status": row["status"],
+        "idempotency_key": row["idempotency_key"],
+        "attempts": row["attempts"],
+        target_key: payload.get(target_key),
+    }
+    if row["status"] == STATUS_DELIVERED and row.get("result"):
+        receipt.update(json.loads(row["result"]))
+    if row.get("last_error"):
+        receipt["error"] = row["last_error"]
+    return receipt
+
+
+def enqueue_whisperx_downstream(
+    outbox: DownstreamOutbox,
+    *,
+    audio_path: str | Path,
+    transcript_payload: Mapping[str, Any],
+    execution_envelope: Optional[Mapping[str, Any]],
+    metadata: Mapping[str, Any],
+    downstream_config: Mapping[str, Any],
+    transcript_artifact_path: Optional[str | Path] = None,
+    receipts_path: Optional[str | Path] = None,
+    dispatcher: Optional["DownstreamDispatcher"] = None,
+) -> Dict[str, Any]:
+    """Queue the SensibLaw/StatiBaker fan-out for a transcript and return.
+
+    The returned receipts list every enabled sink as ``pending``. When
+    ``receipts_path`` is given the receipts are written immediately and then
+    rewritten by the dispatcher as each sink completes.
+    """
+
+    receipts = downstream.build_downstream_receipts(
+        metadata=metadata,
+        transcript_payload=transcript_payload,
+        transcript_artifact_path=transcript_artifact_path,
+        transcript_hash=downstream.envelope_transcript_hash(execution_envelope),
+    )
+    transcript_hash = receipts["transcript_hash"]
+    job_id = metadata.get("task_id")
+
+    deliveries: Dict[str, Dict[str, Any]] = {}
+    sensiblaw_config = dict(downstream_config.get("sensiblaw") or {})
+    if sensiblaw_config.get("enabled") and sensiblaw_config.get("storage_path"):
+        deliveries["sensiblaw"] = {
+            "transcript_payload": dict(transcript_payload),
+            "audio_path": str(audio_path),
+            "storage_path": str(sensiblaw_config["storage_path"]),
+        }
+
+    statibaker_config = dict(downstream_config.get("statibaker") or {})
+    if (
+        execution_envelope
+        and statibaker_config.get("enabled")
+        and statibaker_config.get("log_root")
+    ):
+        deliveries["statibaker"] = {
+            "execution_envelope": dict(execution_envelope),
+            "log_root": str(statibaker_config["log_root"]),
+            "transcript_artifact_path": (
+                str(transcript_artifact_path) if transcript_artifact_path else None
+            ),
+            "completed_at": metadata.get("completed_at"),
+        }
+
+    for sink, payload in deliveries.items():
+        outbox.enqueue(
+            transcript_hash=transcript_hash,
+            sink=sink,
+            payload=payload,
+            job_id=job_id,
+            receipts_path=receipts_path,
+        )
+    receipts["sinks"] = outbox.sink_receipts(transcript_hash)
+
+    if receipts_path:
+        downstream.write_downstream_receipts(receipts_path, receipts)
+    if dispatcher is not None:
+        dispatcher.notify()
+    return receipts
+
+
+class DownstreamDispatcher:
+    """Deliver outbox rows to their sinks on a worker pool.
+
+    Each claimed row is handed to its own worker, so a slow sink only occupies
+    one worker while other deliveries proceed. Receipts files referenced by
+    the rows are rewritten after every attempt. ``handlers`` overrides entries
+    of :data:`SINK_HANDLERS`, e.g. with
+    :meth:`tircorder.sensiblaw_batch.SensibLawBatchSink.deliver`. Handlers
+    receive the queued payload plus its ``idempotency_key`` and return a
+    receipt, or a future of one when they complete deliveries in batches.
+    """
+
+    def __init__(
+        self,
+        outbox: DownstreamOutbox,
+        *,
+        workers: int = 2,
+        poll_interval: float = 1.0,
+        handlers: Optional[
+            Mapping[str, Callable[[Mapping[str, Any]], Dict[str, Any]]]
+        ] = None,
+    ) -> None:
+        self.outbox = outbox
+        self.handlers = {**SINK_HANDLERS, **(handlers or {})}
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._slots = threading.BoundedSemaphore(workers)
+        self._receipts_lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    def deliver(self, row: Mapping[str, Any]) -> str:
+        """Attempt one delivery for ``row`` and return the resulting status."""
+
+        outcome = self._attempt(row)
+        return outcome.result() if isinstance(outcome, Future) else outcome
+
+    def run_once(self) -> int:
+        """Deliver every currently due row in parallel and wait for them.
+
+        Returns the number of rows attempted.
+        """
+
+        rows = self.outbox.claim(self.workers * 4)
+        if not rows:
+            return 0
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            outcomes = list(pool.map(self._attempt, rows))
+        wait([outcome for outcome in outcomes if isinstance(outcome, Future)])
+        return len(rows)
+
+    def start(self) -> None:
+        """Start draining the outbox in a background thread."""
+
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._thread = threading.Thread(
+            target=self._loop, name="downstream-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def notify(self) -> None:
+        """Wake the background loop, e.g. right after enqueueing a job."""
+        self._wakeup.set()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop the background loop, optionally waiting for in-flight work."""
+
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    # ------------------------------------------------------------------
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            free = 0
+            while self._slots.acquire(blocking=False):
+                free += 1
+            rows = self.outbox.claim(free)
+            for _ in range(free - len(rows)):
+                self._slots.release()
+            for row in rows:
+                self._executor.submit(self._deliver_and_release, row)
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def _attempt(self, row: Mapping[str, Any]) -> str | Future:
+        """Call the sink handler for ``row`` and settle the row.
+
+        A handler may return a :class:`~concurrent.futures.Future` instead of
+        a receipt, e.g. a batching sink that completes the row later. The row
+        is then settled when that future finishes and a future of the final
+        status is returned, leaving the calling worker free for other rows.
+        """
+
+        handler = self.handlers[row["sink"]]
+        # Retries after a lost acknowledgement carry the same key, so sinks
+        # can recognise a delivery they have already applied.
+        payload = {
+            **json.loads(row["payload"]),
+            "idempotency_key": row["idempotency_key"],
+        }
+        try:
+            result = handler(payload)
+        except Exception as exc:
+            return self._settle(row, error=exc)
+        if not isinstance(result, Future):
+            return self._settle(row, result=result)
+
+        settled: Future = Future()
+
+        def _done(future: Future) -> None:
+            try:
+                error = future.exception()
+                if error is None:
+                    status = self._settle(row, result=future.result())
+                else:
+                    status = self._settle(row, error=error)
+            except Exception as exc:  # pragma: no cover - outbox write failed
+                settled.set_exception(exc)
+            else:
+                settled.set_result(status)
+
+        result.add_done_callback(_done)
+        return settled
+
+    def _settle(
+        self,
+        row: Mapping[str, Any],
+        *,
+        result: Optional[Mapping[str, Any]] = None,
+        error: Optional[BaseException] = None,
+    ) -> str:
+        key = row["idempotency_key"]
+        if error is not None:
+            status = self.outbox.mark_failed(key, str(error))
+            logging.error(
+                "Downstream %s delivery failed (%s): %s", row["sink"], status, error
+            )
+        else:
+            self.outbox.mark_delivered(key, result or {})
+            status = STATUS_DELIVERED
+        self._update_receipts(row)
+        return status
+
+    def _deliver_and_release(self, row: Mapping[str, Any]) -> None:
+        try:
+            self._attempt(row)
+        finally:
+            self._slots.release()
+            self._wakeup.set()
+
+    def _update_receipts(self, row: Mapping[str, Any]) -> None:
+        receipts_path = row.get("receipts_path")
+        if not receipts_path:
+            return
+        path = Path(receipts_path)
+        with self._receipts_lock:
+            try:
+                receipts = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                receipts = {"transcript_hash": row["transcript_hash"], "sinks": {}}
+            receipts.setdefault("sinks", {}).update(
+                self.outbox.sink_receipts(row["transcript_hash"])
+            )
+            downstream.write_downstream_receipts(path, receipts)
+
+
+_configured: Dict[tuple, Tuple[DownstreamOutbox, DownstreamDispatcher]] = {}
+_configured_lock = threading.Lock()
+
+
+def outbox_from_config(
+    config: Optional[Mapping[str, Any]],
+) -> Optional[Tuple[DownstreamOutbox, DownstreamDispatcher]]:
+    """Return the outbox and running dispatcher for ``downstream.outbox``.
+
+    Returns ``None`` unless ``config["enabled"]`` is true. The pair is built
+    once per distinct configuration and its dispatcher started in the
+    background, so every transcription with the same settings shares it.
+    """
+
+    if not config or not config.get("enabled"):
+        return None
+    settings = (
+        str(config.get("db_path") or DB_PATH),
+        int(config.get("workers", 2)),
+        int(config.get("max_attempts", 5)),
+        float(config.get("base_delay_seconds", 2.0)),
+    )
+    with _configured_lock:
+        configured = _configured.get(settings)
+        if configured is None:
+            db_path, workers, max_attempts, base_delay = settings
+            outbox = DownstreamOutbox(
+                db_path, max_attempts=max_attempts, base_delay=base_delay
+            )
+            dispatcher = DownstreamDispatcher(outbox, workers=workers)
+            dispatcher.start()
+            configured = _configured[settings] = (outbox, dispatcher)
+    return configured
+
+
+__all__ = [
+    "DownstreamOutbox",
+    "DownstreamDispatcher",
+    "SINK_HANDLERS",
+    "enqueue_whisperx_downstream",
+    "ensure_outbox_schema",
+    "idempotency_key",
+    "outbox_from_config",
+]
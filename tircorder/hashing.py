@@ -0,0 +1,229 @@
+"""Shared SHA-256 hashing with a persistent per-file-version cache.
+
+Digests of files are cached under ``(path, inode, size, mtime_ns)`` so each
+byte of a recording or scan is hashed once per file version, no matter how
+many envelopes, receipts or connector runs refer to it.
+
+The cache lives in a SQLite file whose path can be overridden with the
+``TIRCORDER_HASH_CACHE_PATH`` environment variable. When not set it is stored
+at ``~/.tircorder/file_hashes.sqlite`` next to the configuration file.
+:meth:`FileHashCache.prune` drops entries for files that have been deleted.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+CACHE_ENV_VAR = "TIRCORDER_HASH_CACHE_PATH"
+DEFAULT_CACHE_PATH = Path.home() / ".tircorder" / "file_hashes.sqlite"
+READ_BUFFER_SIZE = 1024 * 1024
+
+_FileKey = Tuple[str, int, int, int]
+
+
+def _file_key(path: Path) -> _FileKey:
+    resolved = path.resolve()
+    st = resolved.stat()
+    return str(resolved), st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _hash_stream(path: Path) -> str:
+    """Return the SHA-256 hex digest of ``path`` using 1 MiB buffered reads."""
+
+    h = hashlib.sha256()
+    buffer = bytearray(READ_BUFFER_SIZE)
+    view = memoryview(buffer)
+    with path.open("rb", buffering=0) as fh:
+        while True:
+            read = fh.readinto(buffer)
+            if not read:
+                break
+            h.update(view[:read])
+    return h.hexdigest()
+
+
+class FileHashCache:
+    """Persistent cache of SHA-256 digests keyed by file version.
+
+    Parameters
+    ----------
+    db_path:
+        Location of the SQLite database file. Use ``":memory:"`` for a
+        process-local cache. Defaults to ``TIRCORDER_HASH_CACHE_PATH`` or
+        ``~/.tircorder/file_hashes.sqlite``.
+    """
+
+    def __init__(self, db_path: Optional[str | Path] = None) -> None:
+        if db_path is None:
+            env_path = os.getenv(CACHE_ENV_VAR)
+            db_path = Path(env_path).expanduser() if env_path else DEFAULT_CACHE_PATH
+        if str(db_path) != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = str(db_path)
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._memo: Dict[_FileKey, str] = {}
+        self._init_db()
+
+    def _init_db(self) -> None:
+        with self._lock:
+            self.conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS file_hashes (
+                    path TEXT PRIMARY KEY,
+                    inode INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL
+                )
+                """
+            )
+            self.conn.commit()
+
+    def lookup(self, key: _FileKey) -> Optional[str]:
+        """Return the cached digest for ``key`` or ``None`` if stale/missing."""
+
+        digest = self._memo.get(key)
+        if digest is not None:
+            return digest
+        path, inode, size, mtime_ns = key
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT inode, size, mtime_ns, sha256 FROM file_hashes WHERE path=?",
+                (path,),
+            ).fetchone()
+        if row is None or tuple(row[:3]) != (inode, size, mtime_ns):
+            return None
+        self._memo[key] = row[3]
+        return row[3]
+
+    def store(self, key: _FileKey, digest: str) -> None:
+        """Remember ``digest`` for the file version described by ``key``."""
+
+        self._memo[key] = digest
+        with self._lock:
+            self.conn.execute(
+                """
+                INSERT INTO file_hashes(path, inode, size, mtime_ns, sha256)
+                VALUES(?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    inode=excluded.inode,
+                    size=excluded.size,
+                    mtime_ns=excluded.mtime_ns,
+                    sha256=excluded.sha256
+                """,
+                (*key, digest),
+            )
+            self.conn.commit()
+
+    def sha256_file(self, path: str | Path) -> str:
+        """Return the digest of ``path``, hashing it only if it changed."""
+
+        file_path = Path(path)
+        key = _file_key(file_path)
+        digest = self.lookup(key)
+        if digest is None:
+            digest = _hash_stream(file_path)
+            self.store(key, digest)
+        return digest
+
+    def sha256_files(
+        self, paths: Iterable[str | Path], *, workers: int = 1
+    ) -> Dict[str, str]:
+        """Return digests for many ``paths``, hashing cache misses in parallel.
+
+        ``hashlib`` releases the GIL while digesting large buffers, so a
+        thread pool scales across cores for big recordings.
+        """
+
+        path_list = [Path(p) for p in paths]
+        if workers <= 1 or len(path_list) <= 1:
+            return {str(p): self.sha256_file(p) for p in path_list}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            digests = pool.map(self.sha256_file, path_list)
+            return {str(p): d for p, d in zip(path_list, digests)}
+
+    def prune(self) -> int:
+        """Forget files that no longer exist; return the number of rows removed."""
+
+        with self._lock:
+            paths = [
+                row[0] for row in self.conn.execute("SELECT path FROM file_hashes")
+            ]
+        missing = [(path,) for path in paths if not os.path.exists(path)]
+        if not missing:
+            return 0
+        gone = {path for (path,) in missing}
+        with self._lock:
+            self.conn.executemany("DELETE FROM file_hashes WHERE path=?", missing)
+            self.conn.commit()
+            for key in [key for key in self._memo if key[0] in gone]:
+                del self._memo[key]
+        return len(missing)
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+
+_default_cache: Optional[FileHashCache] = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache() -> FileHashCache:
+    """Return the process-wide :class:`FileHashCache`."""
+
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = FileHashCache()
+        return _default_cache
+
+
+def set_default_cache(cache: Optional[FileHashCache]) -> None:
+    """Replace the process-wide cache, e.g. with an in-memory one in tests."""
+
+    global _default_cache
+    with _default_lock:
+        _default_cache = cache
+
+
+def sha256_file(path: str | Path, *, cache: Optional[FileHashCache] = None) -> str:
+    """Return the SHA-256 hex digest of ``path`` via the shared cache."""
+
+    return (cache or get_default_cache()).sha256_file(path)
+
+
+def sha256_files(
+    paths: Iterable[str | Path],
+    *,
+    workers: int = 1,
+    cache: Optional[FileHashCache] = None,
+) -> Dict[str, str]:
+    """Return digests for ``paths``, optionally hashing in parallel."""
+
+    return (cache or get_default_cache()).sha256_files(paths, workers=workers)
+
+
+def sha256_json(payload: Mapping[str, Any]) -> str:
+    """Return the digest of ``payload`` serialised with sorted keys."""
+
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+__all__ = [
+    "FileHashCache",
+    "get_default_cache",
+    "set_default_cache",
+    "sha256_file",
+    "sha256_files",
+    "sha256_json",
+]
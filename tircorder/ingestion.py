@@ -0,0 +1,346 @@
+"""Run many connectors concurrently into the ``story_events`` table.
+
+Parsing exports is CPU-bound (JSON, XML and CSV decoding), so each configured
+:class:`ConnectorSpec` runs in a worker process. Workers turn their events
+into ``story_events`` rows (details already JSON-encoded, which is also
+cheaper to pickle than dicts) and stream them in batches through a bounded
+queue to the parent process. The parent is the only SQLite writer and
+upserts every batch with :func:`tircorder.story_storage.write_story_rows`.
+The queue bound keeps memory flat when parsing outpaces writing.
+
+Specs can be loaded from a JSON file and run from the command line::
+
+    python -m tircorder.ingestion sources.json --workers 4
+
+where ``sources.json`` holds a list such as::
+
+    [{"source": "whatsapp:family",
+      "connector": "integrations.whatsapp_backup:WhatsAppBackupConnector",
+      "init_kwargs": {"chat_name": "Family"},
+      "call_args": ["exports/family.txt"]}]
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from queue import Empty
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+from tircorder.story_storage import (
+    DB_PATH,
+    ensure_story_events_schema,
+    story_rows,
+    write_story_rows,
+)
+
+BATCH_SIZE = 1000
+QUEUE_SIZE = 32
+COMMIT_EVERY = 20_000
+
+_BATCH = "batch"
+_DONE = "done"
+_worker_queue: Any = None
+
+
+@dataclass(frozen=True)
+class ConnectorSpec:
+    """How to build and run one connector.
+
+    Attributes
+    ----------
+    source:
+        Unique name stored in the ``source`` column, e.g. ``"slack:acme"``.
+    connector:
+        ``"module:attribute"`` import path. A class is instantiated with
+        ``init_args``/``init_kwargs`` and its ``method`` called with
+        ``call_args``/``call_kwargs``; a function is called directly with
+        ``call_args``/``call_kwargs``.
+    method:
+        Name of the event-yielding method, ``iter_events`` by default.
+    places_db:
+        Optional :class:`~integrations.location.places.PlaceIndex` database.
+        Events are tagged with the nearest known place and places they name
+        are added to it. Use a file other than the ingestion target, whose
+        write lock the writer holds between commits.
+    """
+
+    source: str
+    connector: str
+    init_args: Sequence[Any] = ()
+    init_kwargs: Mapping[str, Any] = field(default_factory=dict)
+    call_args: Sequence[Any] = ()
+    call_kwargs: Mapping[str, Any] = field(default_factory=dict)
+    method: str = "iter_events"
+    places_db: Optional[str] = None
+
+    def iter_events(self) -> Iterable[Mapping[str, Any]]:
+        """Import the connector and return its event iterable."""
+
+        module_name, _, attr = self.connector.partition(":")
+        target = getattr(importlib.import_module(module_name), attr)
+        if isinstance(target, type):
+            instance = target(*self.init_args, **dict(self.init_kwargs))
+            target = getattr(instance, self.method)
+        events = target(*self.call_args, **dict(self.call_kwargs))
+        if self.places_db:
+            return _tag_places(events, self.places_db)
+        return events
+
+
+def _tag_places(
+    events: Iterable[Dict[str, Any]], db_path: str
+) -> Iterator[Dict[str, Any]]:
+    from integrations.location.places import PlaceIndex
+
+    index = PlaceIndex(db_path)
+    try:
+        yield from index.tag_events(events, learn=True)
+    finally:
+        index.close()
+
+
+@dataclass
+class SourceReport:
+    """Outcome of ingesting one source."""
+
+    source: str
+    events: int = 0
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.seconds if self.seconds > 0 else 0.0
+
+
+def load_specs(path: str | Path) -> List[ConnectorSpec]:
+    """Read a JSON list of :class:`ConnectorSpec` fields from ``path``."""
+
+    with open(path, "r", encoding="utf-8") as fh:
+        items = json.load(fh)
+    return [ConnectorSpec(**item) for item in items]
+
+
+def _batches(items: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _init_worker(queue: Any) -> None:
+    global _worker_queue
+    _worker_queue = queue
+
+
+def _run_spec(spec: ConnectorSpec, batch_size: int) -> None:
+    """Worker body: stream ``spec``'s events to the parent in batches."""
+
+    start = time.perf_counter()
+    error = None
+    try:
+        rows = story_rows(spec.iter_events(), spec.source)
+        for batch in _batches(rows, batch_size):
+            _worker_queue.put((_BATCH, spec.source, batch))
+    except Exception as exc:  # reported to the parent, other sources go on
+        error = f"{type(exc).__name__}: {exc}"
+    _worker_queue.put((_DONE, spec.source, error, time.perf_counter() - start))
+
+
+def ingest(
+    specs: Sequence[ConnectorSpec],
+    *,
+    conn: Optional[sqlite3.Connection] = None,
+    db_path: str = DB_PATH,
+    workers: Optional[int] = None,
+    batch_size: int = BATCH_SIZE,
+    queue_size: int = QUEUE_SIZE,
+    commit_every: int = COMMIT_EVERY,
+) -> Dict[str, SourceReport]:
+    """Ingest all ``specs`` into ``story_events``.
+
+    Parameters
+    ----------
+    specs:
+        Connectors to run; their ``source`` names must be unique.
+    conn, db_path:
+        Target database; a connection to ``db_path`` is opened when ``conn``
+        is omitted.
+    workers:
+        Worker processes, defaulting to one per spec up to the CPU count.
+        ``0`` runs every connector in this process, one after another.
+    batch_size:
+        Events per queued batch and ``executemany`` call.
+    queue_size:
+        Maximum number of batches waiting for the writer.
+    commit_every:
+        Commit after roughly this many written events.
+
+    Returns
+    -------
+    dict
+        :class:`SourceReport` per source. A failing connector, or a batch
+        of its events that cannot be written, records its error there;
+        events written before the failure are kept.
+    """
+
+    names = [spec.source for spec in specs]
+    if len(set(names)) != len(names):
+        raise ValueError("connector sources must be unique")
+    reports = {name: SourceReport(name) for name in names}
+    if workers is None:
+        workers = min(len(specs), os.cpu_count() or 1)
+
+    owns_connection = conn is None
+    if conn is None:
+        conn = sqlite3.connect(db_path)
+    try:
+        ensure_story_events_schema(conn)
+        writer = _BatchWriter(conn, reports, commit_every)
+        if workers == 0:
+            for spec in specs:
+                start = time.perf_counter()
+                try:
+                    rows = story_rows(spec.iter_events(), spec.source)
+                    for batch in _batches(rows, batch_size):
+                        if not writer.write(spec.source, batch):
+                            break
+                except Exception as exc:
+                    reports[spec.source].error = f"{type(exc).__name__}: {exc}"
+                reports[spec.source].seconds = time.perf_counter() - start
+        elif specs:
+            _ingest_parallel(specs, writer, workers, batch_size, queue_size)
+        conn.commit()
+    finally:
+        if owns_connection:
+            conn.close()
+
+    for report in reports.values():
+        if report.error:
+            logging.error("Ingesting %s failed: %s", report.source, report.error)
+        logging.info(
+            "Ingested %d events from %s in %.1fs (%.0f events/s)",
+            report.events,
+            report.source,
+            report.seconds,
+            report.events_per_second,
+        )
+    return reports
+
+
+class _BatchWriter:
+    """Upsert batches on one connection, committing every few thousand rows.
+
+    A batch that fails to write is recorded as the error of its source and
+    that source's later batches are dropped, so the caller keeps draining
+    the queue instead of leaving workers blocked on it.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        reports: Dict[str, SourceReport],
+        commit_every: int,
+    ) -> None:
+        self.conn = conn
+        self.reports = reports
+        self.commit_every = commit_every
+        self._uncommitted = 0
+
+    def write(self, source: str, batch: List[tuple]) -> bool:
+        """Write ``batch`` for ``source``; return ``False`` if it failed."""
+
+        report = self.reports[source]
+        if report.error:
+            return False
+        try:
+            written = write_story_rows(self.conn, batch)
+        except sqlite3.Error as exc:
+            report.error = f"{type(exc).__name__}: {exc}"
+            return False
+        report.events += written
+        self._uncommitted += written
+        if self._uncommitted >= self.commit_every:
+            self.conn.commit()
+            self._uncommitted = 0
+        return True
+
+
+def _ingest_parallel(
+    specs: Sequence[ConnectorSpec],
+    writer: _BatchWriter,
+    workers: int,
+    batch_size: int,
+    queue_size: int,
+) -> None:
+    queue = multiprocessing.get_context().Queue(queue_size)
+    pending = {spec.source for spec in specs}
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(queue,)
+    ) as pool:
+        futures: Dict[Future, str] = {
+            pool.submit(_run_spec, spec, batch_size): spec.source for spec in specs
+        }
+        while pending:
+            try:
+                message = queue.get(timeout=0.5)
+            except Empty:
+                # A worker that died without reporting (e.g. killed) would
+                # otherwise leave the writer waiting forever.
+                for future, source in futures.items():
+                    if source in pending and future.done() and future.exception():
+                        writer.reports[source].error = repr(future.exception())
+                        pending.discard(source)
+                continue
+            if message[0] == _BATCH:
+                _, source, batch = message
+                writer.write(source, batch)
+            else:
+                _, source, error, seconds = message
+                # Keep a write error recorded while this source was running.
+                writer.reports[source].error = writer.reports[source].error or error
+                writer.reports[source].seconds = seconds
+                pending.discard(source)
+    queue.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Ingest connector exports.")
+    parser.add_argument("specs", help="JSON file listing connector specs")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database path")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    ingest(
+        load_specs(args.specs),
+        db_path=args.db,
+        workers=args.workers,
+        batch_size=args.batch_size,
+    )
+
+
+__all__ = [
+    "ConnectorSpec",
+    "SourceReport",
+    "ingest",
+    "load_specs",
+]
+
+
+if __name__ == "__main__":
+    main()
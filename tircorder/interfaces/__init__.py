@@ -1,8 +1,8 @@
 """Interfaces package for tircorder."""
 
-from .config import TircorderConfig
+from .config import ConfigWatcher, TircorderConfig
 
-__all__ = ["TircorderConfig"]
+__all__ = ["ConfigWatcher", "TircorderConfig"]
 """Interface modules for Tircorder."""
 
 __all__ = []
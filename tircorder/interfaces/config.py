@@ -2,13 +2,19 @@
 from __future__ import annotations
 
 import json
+import logging
 import os
+import threading
+from copy import deepcopy
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 CONFIG_ENV_VAR = "TIRCORDER_CONFIG_PATH"
 DEFAULT_CONFIG_PATH = Path.home() / ".tircorder" / "config.json"
 
+ConfigListener = Callable[[Dict[str, Any]], None]
+_Stamp = Optional[Tuple[int, int, int]]
+
 
 class TircorderConfig:
     """Manage persistence of tircorder settings.
@@ -16,16 +22,68 @@ class TircorderConfig:
     Configuration values are stored in a JSON file whose path can be
     overridden by setting the ``TIRCORDER_CONFIG_PATH`` environment variable.
     When not set, the configuration is stored at ``~/.tircorder/config.json``.
+
+    The parsed file is cached per path and only re-read when its
+    ``(inode, size, mtime_ns)`` changes. Every reload that changes the
+    contents bumps :meth:`version` and notifies listeners registered with
+    :meth:`subscribe`; :class:`ConfigWatcher` polls for such changes so
+    running workers pick up edits without a restart.
     """
 
+    _lock = threading.RLock()
+    _cache: Dict[str, Tuple[_Stamp, Dict[str, Any]]] = {}
+    _listeners: List[ConfigListener] = []
+    _version = 0
+
     @staticmethod
-    def _get_config_path() -> Path:
-        """Return the path to the configuration file, creating parent dirs."""
+    def _resolve_config_path() -> Path:
         path = os.getenv(CONFIG_ENV_VAR)
-        config_path = Path(path).expanduser() if path else DEFAULT_CONFIG_PATH
+        return Path(path).expanduser() if path else DEFAULT_CONFIG_PATH
+
+    @classmethod
+    def _get_config_path(cls) -> Path:
+        """Return the path to the configuration file, creating parent dirs."""
+        config_path = cls._resolve_config_path()
         config_path.parent.mkdir(parents=True, exist_ok=True)
         return config_path
 
+    @staticmethod
+    def _stamp(config_path: Path) -> _Stamp:
+        try:
+            st = config_path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    @classmethod
+    def _load(cls) -> Tuple[int, Dict[str, Any]]:
+        """Return ``(version, config)`` re-reading the file only if it changed."""
+
+        config_path = cls._resolve_config_path()
+        key = str(config_path)
+        stamp = cls._stamp(config_path)
+        with cls._lock:
+            cached = cls._cache.get(key)
+            if cached is not None and cached[0] == stamp:
+                return cls._version, cached[1]
+            if stamp is None:
+                config: Dict[str, Any] = {}
+            else:
+                with config_path.open("r", encoding="utf-8") as handle:
+                    config = json.load(handle)
+            changed = cached is None or cached[1] != config
+            cls._cache[key] = (stamp, config)
+            if changed:
+                cls._version += 1
+            version = cls._version
+            listeners = list(cls._listeners) if changed and cached is not None else []
+        for listener in listeners:
+            try:
+                listener(config)
+            except Exception as exc:  # pragma: no cover - listener bug
+                logging.error("Config listener %r failed: %s", listener, exc)
+        return version, config
+
     @classmethod
     def get_config(cls) -> Dict[str, Any]:
         """Load and return stored configuration values.
@@ -35,11 +93,51 @@ class TircorderConfig:
             does not exist, an empty dictionary is returned.
         """
 
-        config_path = cls._get_config_path()
-        if not config_path.exists():
-            return {}
-        with config_path.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
+        return deepcopy(cls._load()[1])
+
+    @classmethod
+    def snapshot(cls) -> Tuple[int, Dict[str, Any]]:
+        """Return the config version and the shared, cached configuration.
+
+        The returned mapping is shared between callers and must be treated
+        as read-only; use :meth:`get_config` for a private copy.
+        """
+
+        return cls._load()
+
+    @classmethod
+    def config_path(cls) -> Path:
+        """Return the path of the configuration file currently in use."""
+
+        return cls._resolve_config_path()
+
+    @classmethod
+    def version(cls) -> int:
+        """Return a counter that increases whenever the configuration changes."""
+
+        return cls._load()[0]
+
+    @classmethod
+    def refresh(cls) -> bool:
+        """Re-check the configuration file and return ``True`` if it changed."""
+
+        with cls._lock:
+            before = cls._version
+        return cls._load()[0] != before
+
+    @classmethod
+    def subscribe(cls, listener: ConfigListener) -> None:
+        """Call ``listener(config)`` whenever a reload changes the configuration."""
+
+        with cls._lock:
+            if listener not in cls._listeners:
+                cls._listeners.append(listener)
+
+    @classmethod
+    def unsubscribe(cls, listener: ConfigListener) -> None:
+        with cls._lock:
+            if listener in cls._listeners:
+                cls._listeners.remove(listener)
 
     @classmethod
     def set_config(cls, config: Dict[str, Any]) -> None:
@@ -52,3 +150,57 @@ class TircorderConfig:
         config_path = cls._get_config_path()
         with config_path.open("w", encoding="utf-8") as handle:
             json.dump(config, handle, indent=2, sort_keys=True)
+        cls._load()
+
+
+class ConfigWatcher:
+    """Poll the configuration file and notify :class:`TircorderConfig` listeners.
+
+    Only a ``stat`` call is made per poll; the file is re-parsed when it
+    actually changed.
+
+    Args:
+        interval: Seconds between checks.
+    """
+
+    _shared: Optional["ConfigWatcher"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, interval: float = 2.0) -> None:
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ConfigWatcher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="tircorder-config-watcher", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                TircorderConfig.refresh()
+            except (OSError, ValueError) as exc:
+                logging.error("Failed to reload configuration: %s", exc)
+
+    @classmethod
+    def ensure_running(cls, interval: float = 2.0) -> "ConfigWatcher":
+        """Return the process-wide watcher, starting it if necessary."""
+
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(interval)
+            return cls._shared.start()
+
+
+__all__ = ["ConfigWatcher", "TircorderConfig"]
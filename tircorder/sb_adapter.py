@@ -1,29 +1,39 @@
 from __future__ import annotations
 
 import hashlib
-import json
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Mapping, Sequence
+from typing import Any, Iterable, Iterator, Mapping, Sequence, Tuple
 
+from tircorder.artifacts import read_ndjson, write_json, write_ndjson
+from tircorder.hashing import sha256_file, sha256_json
 
-DEFAULT_SEGMENT_KEYS = ("text", "start", "end", "speaker", "confidence")
 
+DEFAULT_SEGMENT_KEYS = ("text", "start", "end", "speaker", "confidence")
 
-def _sha256_file(path: Path) -> str:
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
 
+def iter_segment_events(
+    segments: Iterable[Any],
+    *,
+    envelope_id: str,
+    source: str = "whisperx_webui",
+    audio_hash: str | None = None,
+    segment_keys: Sequence[str] = DEFAULT_SEGMENT_KEYS,
+) -> Iterator[dict]:
+    """Yield ``audio_segment`` events for ``segments`` one at a time."""
 
-def _sha256_json(payload: Mapping[str, Any]) -> str:
-    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
-    return hashlib.sha256(blob).hexdigest()
+    allowed = set(segment_keys)
+    for seg in segments:
+        if not isinstance(seg, Mapping):
+            continue
+        data = {k: seg.get(k) for k in allowed if k in seg}
+        data["provenance"] = {"source": source, "envelope_id": envelope_id}
+        if audio_hash:
+            data["audio_hash"] = audio_hash
+        yield {"type": "audio_segment", "data": data}
 
 
-def build_execution_envelope(
+def stream_execution_envelope(
     transcript: Mapping[str, Any],
     *,
     source: str = "whisperx_webui",
@@ -33,16 +43,16 @@ def build_execution_envelope(
     segment_keys: Sequence[str] = DEFAULT_SEGMENT_KEYS,
     adapter_label: str = "tircorder_whisperx_webui_v1",
     envelope_format: str = "sb_execution_envelope_v1",
-) -> dict:
-    """Build a SB-ready execution envelope + segment events from ASR output.
+) -> Tuple[dict, Iterator[dict]]:
+    """Return the envelope header and a lazy iterator over its segment events.
 
-    This is a non-semantic adapter: it preserves provided values and never
-    injects interpretive labels.
+    Pair with :func:`write_execution_envelope_ndjson` to write long recordings
+    without materialising every segment event.
     """
 
-    audio_hash = _sha256_file(Path(audio_path)) if audio_path else None
+    audio_hash = sha256_file(audio_path) if audio_path else None
     segments = transcript.get("segments", []) or []
-    transcript_hash = _sha256_json(transcript)
+    transcript_hash = sha256_json(transcript)
 
     envelope_id_source = f"{source}:{transcript_hash}:{audio_hash or 'no-audio'}"
     envelope_id = hashlib.sha256(envelope_id_source.encode("utf-8")).hexdigest()
@@ -65,28 +75,82 @@ def build_execution_envelope(
         "created_at": datetime.now(timezone.utc).isoformat(),
     }
 
-    allowed = set(segment_keys)
-    segment_events = []
-    for seg in segments:
-        if not isinstance(seg, Mapping):
-            continue
-        data = {k: seg.get(k) for k in allowed if k in seg}
-        data["provenance"] = {"source": source, "envelope_id": envelope_id}
-        if audio_hash:
-            data["audio_hash"] = audio_hash
-        segment_events.append({"type": "audio_segment", "data": data})
+    events = iter_segment_events(
+        segments,
+        envelope_id=envelope_id,
+        source=source,
+        audio_hash=audio_hash,
+        segment_keys=segment_keys,
+    )
+    return envelope, events
+
 
+def build_execution_envelope(
+    transcript: Mapping[str, Any],
+    *,
+    source: str = "whisperx_webui",
+    model: str | None = None,
+    language: str | None = None,
+    audio_path: str | Path | None = None,
+    segment_keys: Sequence[str] = DEFAULT_SEGMENT_KEYS,
+    adapter_label: str = "tircorder_whisperx_webui_v1",
+    envelope_format: str = "sb_execution_envelope_v1",
+) -> dict:
+    """Build a SB-ready execution envelope + segment events from ASR output.
+
+    This is a non-semantic adapter: it preserves provided values and never
+    injects interpretive labels.
+    """
+
+    envelope, events = stream_execution_envelope(
+        transcript,
+        source=source,
+        model=model,
+        language=language,
+        audio_path=audio_path,
+        segment_keys=segment_keys,
+        adapter_label=adapter_label,
+        envelope_format=envelope_format,
+    )
     return {
         "execution_envelope": envelope,
-        "segment_events": segment_events,
+        "segment_events": list(events),
     }
 
 
-def write_execution_envelope(path: str | Path, payload: Mapping[str, Any]) -> Path:
-    target = Path(path)
-    target.parent.mkdir(parents=True, exist_ok=True)
-    target.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
-    return target
+def write_execution_envelope(
+    path: str | Path, payload: Mapping[str, Any], *, indent: int | None = None
+) -> Path:
+    """Atomically write an envelope payload as one JSON document.
+
+    Output is compact unless ``indent`` is given.
+    """
+
+    return write_json(path, payload, indent=indent)
+
+
+def write_execution_envelope_ndjson(
+    path: str | Path,
+    envelope: Mapping[str, Any],
+    segment_events: Iterable[Mapping[str, Any]],
+) -> Path:
+    """Atomically write the envelope line followed by one line per segment event."""
+
+    return write_ndjson(path, envelope, segment_events)
+
+
+def read_execution_envelope_ndjson(path: str | Path) -> Tuple[dict, Iterator[dict]]:
+    """Return the envelope from an NDJSON artifact and a lazy segment iterator."""
+
+    return read_ndjson(path)
 
 
-__all__ = ["build_execution_envelope", "write_execution_envelope", "DEFAULT_SEGMENT_KEYS"]
+__all__ = [
+    "build_execution_envelope",
+    "stream_execution_envelope",
+    "iter_segment_events",
+    "write_execution_envelope",
+    "write_execution_envelope_ndjson",
+    "read_execution_envelope_ndjson",
+    "DEFAULT_SEGMENT_KEYS",
+]
@@ -1,13 +1,26 @@
-"""Schema loading and validation utilities."""
+"""Schema loading and validation utilities.
+
+Validators are compiled once per schema and reused, so validating an event
+costs a single pass over the instance. :func:`validate_stories` validates many
+events; with a :class:`StoryValidationPolicy` in ``"sample"`` mode, trusted
+connectors validate the first events of an export and a random sample after
+that. Connectors apply a policy to the events they build with a
+:class:`StoryCheck`.
+"""
+
 from __future__ import annotations
 
+import random
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 import yaml
-from jsonschema import validate
+from jsonschema import validators
+from jsonschema.exceptions import best_match
 
 _SCHEMAS: Dict[str, Dict[str, Any]] = {}
+_VALIDATORS: Dict[str, Any] = {}
 _SCHEMA_DIR = Path(__file__).resolve().parent
 
 
@@ -19,25 +32,136 @@ def load_schema(name: str) -> Dict[str, Any]:
     return _SCHEMAS[name]
 
 
+def get_validator(name: str) -> Any:
+    """Return the compiled validator for schema ``name``.
+
+    The schema itself is checked once, when the validator is first built.
+    """
+    validator = _VALIDATORS.get(name)
+    if validator is None:
+        schema = load_schema(name)
+        cls = validators.validator_for(schema)
+        cls.check_schema(schema)
+        validator = _VALIDATORS[name] = cls(schema)
+    return validator
+
+
+def _validate(name: str, data: Any) -> None:
+    validator = get_validator(name)
+    if validator.is_valid(data):
+        return
+    # Same error selection as ``jsonschema.validate``.
+    raise best_match(validator.iter_errors(data))
+
+
+@dataclass(frozen=True)
+class StoryValidationPolicy:
+    """How many events :func:`validate_stories` checks.
+
+    Attributes:
+        mode: ``"full"`` validates every event. ``"sample"`` validates the
+            first ``head`` events and then each later event with probability
+            ``sample_rate``. ``"off"`` skips validation entirely.
+        head: Number of leading events always validated in ``"sample"`` mode.
+        sample_rate: Probability of validating an event after the head.
+        seed: Optional seed making the sample reproducible.
+    """
+
+    mode: str = "full"
+    head: int = 100
+    sample_rate: float = 0.01
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.mode not in {"full", "sample", "off"}:
+            raise ValueError(f"Unknown validation mode: {self.mode!r}")
+        if not 0.0 <= self.sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+
+
+FULL_VALIDATION = StoryValidationPolicy()
+TRUSTED_CONNECTOR = StoryValidationPolicy(mode="sample")
+
+
 def validate_story(data: Dict[str, Any]) -> None:
     """Validate a story event against ``story.schema.yaml``."""
-    schema = load_schema("story")
-    validate(instance=data, schema=schema)
+    _validate("story", data)
+
+
+class StoryCheck:
+    """Drop-in for :func:`validate_story` that follows a validation policy.
+
+    Connectors create one per export and call it on every event they build;
+    in ``"sample"`` mode only the first ``policy.head`` events and a random
+    sample after that are validated.
+    """
+
+    def __init__(self, policy: StoryValidationPolicy = FULL_VALIDATION) -> None:
+        self.policy = policy
+        self.seen = 0
+        self._validator = get_validator("story")
+        self._rng = random.Random(policy.seed)
+
+    def __call__(self, event: Dict[str, Any]) -> None:
+        """Raise ``jsonschema.ValidationError`` if ``event`` is checked and invalid."""
+        policy = self.policy
+        index = self.seen
+        self.seen += 1
+        if policy.mode == "off":
+            return
+        if (
+            policy.mode == "sample"
+            and index >= policy.head
+            and self._rng.random() >= policy.sample_rate
+        ):
+            return
+        if not self._validator.is_valid(event):
+            raise best_match(self._validator.iter_errors(event))
+
+
+def iter_validated_stories(
+    events: Iterable[Dict[str, Any]],
+    policy: StoryValidationPolicy = FULL_VALIDATION,
+) -> Iterator[Dict[str, Any]]:
+    """Yield ``events`` lazily, validating them according to ``policy``.
+
+    Raises ``jsonschema.ValidationError`` on the first invalid event checked.
+    """
+    if policy.mode == "off":
+        yield from events
+        return
+    check = StoryCheck(policy)
+    for event in events:
+        check(event)
+        yield event
+
+
+def validate_stories(
+    events: Iterable[Dict[str, Any]],
+    policy: StoryValidationPolicy = FULL_VALIDATION,
+) -> List[Dict[str, Any]]:
+    """Validate a batch of story events and return them as a list."""
+    return list(iter_validated_stories(events, policy))
 
 
 def validate_rule_check_request(data: Dict[str, Any]) -> None:
     """Validate a rule check request against ``rule_check_request.schema.yaml``."""
-    schema = load_schema("rule_check_request")
-    validate(instance=data, schema=schema)
+    _validate("rule_check_request", data)
 
 
 def validate_rule_check_response(data: Dict[str, Any]) -> None:
     """Validate a rule check response against ``rule_check_response.schema.yaml``."""
-    schema = load_schema("rule_check_response")
-    validate(instance=data, schema=schema)
+    _validate("rule_check_response", data)
 
 
 __all__ = [
+    "FULL_VALIDATION",
+    "TRUSTED_CONNECTOR",
+    "StoryCheck",
+    "StoryValidationPolicy",
+    "get_validator",
+    "iter_validated_stories",
+    "validate_stories",
     "validate_story",
     "validate_rule_check_request",
     "validate_rule_check_response",
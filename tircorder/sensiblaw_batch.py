@@ -0,0 +1,311 @@
+"""Batched SensibLaw ingestion that keeps one ``Storage`` open per path.
+
+:func:`tircorder.downstream.ingest_into_sensiblaw` opens and closes a
+SensibLaw ``Storage`` for every transcript. :class:`SensibLawBatchSink`
+instead buffers transcripts per storage path and imports them together, inside
+one transaction, once ``max_items`` transcripts are waiting or the oldest has
+waited ``max_wait_seconds``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional
+
+
+def _default_storage_factory(storage_path: str) -> Any:
+    from storage.core import Storage
+
+    return Storage(storage_path)
+
+
+def _default_importer(store: Any, transcript_payload: Mapping[str, Any], **kwargs):
+    from sensiblaw.ingest.whisperx_adapter import import_whisperx_transcript
+
+    return import_whisperx_transcript(store, transcript_payload, **kwargs)
+
+
+@contextmanager
+def _store_transaction(store: Any) -> Iterator[None]:
+    """Group writes on ``store`` into a single transaction where possible.
+
+    Uses ``store.transaction()`` when the storage provides one, otherwise the
+    underlying ``sqlite3`` connection exposed as ``store.conn``.
+    """
+
+    transaction = getattr(store, "transaction", None)
+    if callable(transaction):
+        with transaction():
+            yield
+        return
+    conn = getattr(store, "conn", None)
+    with conn if conn is not None else nullcontext():
+        yield
+
+
+@dataclass
+class _PendingImport:
+    transcript_payload: Mapping[str, Any]
+    audio_path: str
+    future: Future = field(default_factory=Future)
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class SensibLawBatchSink:
+    """Buffer SensibLaw imports and flush them in batches.
+
+    Parameters
+    ----------
+    max_items:
+        Flush a storage path as soon as this many transcripts are buffered.
+    max_wait_seconds:
+        Flush a storage path once its oldest buffered transcript has waited
+        this long.
+    storage_factory:
+        Callable returning a storage handle for a path. Defaults to
+        SensibLaw's ``storage.core.Storage``.
+    importer:
+        Callable with the signature of ``import_whisperx_transcript``.
+    max_remembered:
+        Number of most recently delivered ``idempotency_key`` receipts kept
+        by :meth:`deliver` to recognise redeliveries.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_items: int = 32,
+        max_wait_seconds: float = 5.0,
+        storage_factory: Optional[Callable[[str], Any]] = None,
+        importer: Optional[Callable[..., Any]] = None,
+        max_remembered: int = 1024,
+    ) -> None:
+        self.max_items = max_items
+        self.max_wait_seconds = max_wait_seconds
+        self.storage_factory = storage_factory or _default_storage_factory
+        self.importer = importer or _default_importer
+        self._stores: Dict[str, Any] = {}
+        self._pending: Dict[str, List[_PendingImport]] = {}
+        self._flush_requests: List[tuple] = []
+        self.max_remembered = max_remembered
+        self._delivered: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._loop, name="sensiblaw-batch", daemon=True
+        )
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    def submit(
+        self,
+        transcript_payload: Mapping[str, Any],
+        *,
+        audio_path: str | Path,
+        storage_path: str | Path,
+    ) -> Future:
+        """Queue a transcript and return a future for its ingest receipt."""
+
+        item = _PendingImport(transcript_payload, str(audio_path))
+        key = str(storage_path)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SensibLawBatchSink is closed")
+            batch = self._pending.setdefault(key, [])
+            batch.append(item)
+            full = len(batch) >= self.max_items
+        if full:
+            self._wakeup.set()
+        return item.future
+
+    def ingest(
+        self,
+        transcript_payload: Mapping[str, Any],
+        *,
+        audio_path: str | Path,
+        storage_path: str | Path,
+    ) -> Dict[str, Any]:
+        """Blocking drop-in for :func:`tircorder.downstream.ingest_into_sensiblaw`."""
+
+        return self.submit(
+            transcript_payload, audio_path=audio_path, storage_path=storage_path
+        ).result()
+
+    def deliver(self, payload: Mapping[str, Any]) -> Future:
+        """Outbox handler for the ``sensiblaw`` sink.
+
+        Pass as ``handlers={"sensiblaw": sink.deliver}`` to
+        :class:`~tircorder.downstream_outbox.DownstreamDispatcher`. The
+        transcript is queued and a future for its receipt returned at once,
+        so the dispatcher's workers keep claiming rows and batches fill up to
+        ``max_items``. A payload whose ``idempotency_key`` is among the last
+        ``max_remembered`` imported by this sink resolves to the earlier
+        receipt instead of importing the transcript again.
+        """
+
+        key = payload.get("idempotency_key")
+        if key is not None:
+            with self._lock:
+                receipt = self._delivered.get(key)
+                if receipt is not None:
+                    self._delivered.move_to_end(key)
+            if receipt is not None:
+                done: Future = Future()
+                done.set_result(receipt)
+                return done
+        future = self.submit(
+            payload["transcript_payload"],
+            audio_path=payload["audio_path"],
+            storage_path=payload["storage_path"],
+        )
+        if key is None:
+            return future
+
+        delivered: Future = Future()
+
+        def _record(result: Future) -> None:
+            error = result.exception()
+            if error is not None:
+                delivered.set_exception(error)
+                return
+            receipt = {**result.result(), "idempotency_key": key}
+            with self._lock:
+                self._delivered[key] = receipt
+                self._delivered.move_to_end(key)
+                while len(self._delivered) > self.max_remembered:
+                    self._delivered.popitem(last=False)
+            delivered.set_result(receipt)
+
+        future.add_done_callback(_record)
+        return delivered
+
+    def flush(self, storage_path: Optional[str | Path] = None) -> int:
+        """Import everything buffered (for ``storage_path`` only, if given).
+
+        The import runs on the sink's worker thread, which owns every storage
+        handle; this call blocks until it has finished. Returns the number of
+        transcripts processed.
+        """
+
+        if threading.current_thread() is self._thread:
+            return self._flush_now(storage_path)
+        request: Future = Future()
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._flush_requests.append((storage_path, request))
+        if closed:
+            self._thread.join()
+            return 0
+        self._wakeup.set()
+        return request.result()
+
+    def close(self) -> None:
+        """Flush remaining transcripts and close every storage handle."""
+
+        with self._lock:
+            self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+
+    def __enter__(self) -> "SensibLawBatchSink":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    def _flush_now(self, storage_path: Optional[str | Path] = None) -> int:
+        with self._lock:
+            if storage_path is None:
+                keys = list(self._pending)
+            else:
+                keys = [str(storage_path)] if str(storage_path) in self._pending else []
+            batches = {key: self._pending.pop(key) for key in keys}
+        for key, batch in batches.items():
+            self._import_batch(key, batch)
+        return sum(len(batch) for batch in batches.values())
+
+    def _due_keys(self) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                key
+                for key, batch in self._pending.items()
+                if batch
+                and (
+                    len(batch) >= self.max_items
+                    or now - batch[0].queued_at >= self.max_wait_seconds
+                )
+            ]
+
+    def _loop(self) -> None:
+        while True:
+            self._wakeup.wait(min(self.max_wait_seconds, 0.5))
+            self._wakeup.clear()
+            with self._lock:
+                requests, self._flush_requests = self._flush_requests, []
+                closing = self._closed
+            for key in self._due_keys():
+                self._flush_now(key)
+            for storage_path, request in requests:
+                request.set_result(self._flush_now(storage_path))
+            if closing:
+                break
+        self._flush_now()
+        for store in self._stores.values():
+            try:
+                store.close()
+            except Exception as exc:  # pragma: no cover - best effort
+                logging.error("Failed to close SensibLaw storage: %s", exc)
+        self._stores.clear()
+
+    def _import_batch(self, storage_path: str, batch: List[_PendingImport]) -> None:
+        try:
+            store = self._stores.get(storage_path)
+            if store is None:
+                store = self._stores[storage_path] = self.storage_factory(storage_path)
+            envelope_ids = []
+            with _store_transaction(store):
+                for item in batch:
+                    envelope_ids.append(
+                        self.importer(
+                            store,
+                            item.transcript_payload,
+                            audio_path=item.audio_path,
+                        )
+                    )
+        except Exception as exc:
+            logging.error(
+                "SensibLaw batch ingest of %d transcripts failed: %s",
+                len(batch),
+                exc,
+            )
+            if len(batch) > 1 and storage_path in self._stores:
+                # Retry one by one so only the failing transcripts report it.
+                for item in batch:
+                    self._import_batch(storage_path, [item])
+            else:
+                for item in batch:
+                    item.future.set_exception(exc)
+            return
+        for item, envelope_id in zip(batch, envelope_ids):
+            item.future.set_result(
+                {
+                    "status": "ok",
+                    "storage_path": storage_path,
+                    "envelope_id": envelope_id,
+                    "batch_size": len(batch),
+                }
+            )
+
+
+__all__ = ["SensibLawBatchSink"]
@@ -0,0 +1,422 @@
+"""Persist and search story events from every source in the state database.
+
+This generalises :mod:`tircorder.chat_storage` to every source: events are
+upserted into a single ``story_events`` table keyed by ``event_id`` and
+tagged with the ``source`` that produced them. Content-derived ids (see
+:mod:`integrations.event_ids`) make re-imports idempotent.
+
+Besides the ISO ``timestamp`` each row stores ``timestamp_ms`` (epoch
+milliseconds, naive timestamps taken as UTC) so time ranges are integer
+index scans, and ``body``: the searchable text of the event (message text,
+transcript segment, search query ...). ``body`` is indexed by the
+``story_events_fts`` FTS5 table, which triggers keep in sync with every
+insert, update and delete. :func:`search_story_events` combines both, so
+"every mention of X in the last three months" is one indexed query.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
+
+from integrations.event_ids import content_event_id
+
+DB_PATH = "state.db"
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MS = timedelta(milliseconds=1)
+FTS_TABLE = "story_events_fts"
+
+# ``details`` keys whose text is indexed for full-text search, in order.
+BODY_KEYS = ("text", "message", "query", "subject", "snippet", "title", "update")
+
+_UPSERT_SQL = """
+    INSERT INTO story_events
+        (event_id, source, timestamp, timestamp_ms, actor, action, details, body)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(event_id) DO UPDATE SET
+        source=excluded.source,
+        timestamp=excluded.timestamp,
+        timestamp_ms=excluded.timestamp_ms,
+        actor=excluded.actor,
+        action=excluded.action,
+        details=excluded.details,
+        body=excluded.body
+"""
+
+_INDEXES = {
+    "idx_story_events_time": "(timestamp_ms)",
+    "idx_story_events_actor_time": "(actor, timestamp_ms)",
+    "idx_story_events_action_time": "(action, timestamp_ms)",
+    "idx_story_events_source_time": "(source, timestamp_ms)",
+}
+
+_FTS_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS story_events_fts_insert
+    AFTER INSERT ON story_events WHEN new.body IS NOT NULL BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, body) VALUES (new.rowid, new.body);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS story_events_fts_delete
+    AFTER DELETE ON story_events WHEN old.body IS NOT NULL BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, body)
+        VALUES ('delete', old.rowid, old.body);
+    END
+    """,
+    # Re-imports rewrite every row; only reindex text that actually changed.
+    f"""
+    CREATE TRIGGER IF NOT EXISTS story_events_fts_update
+    AFTER UPDATE OF body ON story_events WHEN old.body IS NOT new.body BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, body)
+        SELECT 'delete', old.rowid, old.body WHERE old.body IS NOT NULL;
+        INSERT INTO {FTS_TABLE}(rowid, body)
+        SELECT new.rowid, new.body WHERE new.body IS NOT NULL;
+    END
+    """,
+)
+
+
+def ensure_story_events_schema(conn: sqlite3.Connection) -> None:
+    """Ensure ``story_events``, its indexes and the FTS5 index exist.
+
+    When SQLite lacks FTS5 the table is still created and
+    :func:`search_story_events` falls back to ``LIKE`` matching.
+    """
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS story_events (
+            event_id TEXT PRIMARY KEY,
+            source TEXT,
+            timestamp TEXT NOT NULL,
+            timestamp_ms INTEGER,
+            actor TEXT,
+            action TEXT,
+            details TEXT,
+            body TEXT
+        )
+        """
+    )
+    for name, columns_sql in _INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON story_events{columns_sql}")
+
+    if not has_fts(conn):
+        try:
+            conn.execute(
+                f"""
+                CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+                    body,
+                    content='story_events',
+                    content_rowid='rowid',
+                    tokenize='unicode61 remove_diacritics 2'
+                )
+                """
+            )
+        except sqlite3.OperationalError as exc:
+            logging.warning("FTS5 unavailable, story search uses LIKE: %s", exc)
+            return
+        conn.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    for trigger in _FTS_TRIGGERS:
+        conn.execute(trigger)
+
+
+def has_fts(conn: sqlite3.Connection) -> bool:
+    """Return whether the ``story_events_fts`` table exists on ``conn``."""
+
+    return (
+        conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?",
+            (FTS_TABLE,),
+        ).fetchone()
+        is not None
+    )
+
+
+def to_epoch_ms(value: Any) -> Optional[int]:
+    """Return ``value`` (ISO string, datetime or epoch ms) as epoch ms.
+
+    Naive datetimes are taken as UTC. Returns ``None`` if unparsable.
+    """
+
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        when = value
+    else:
+        try:
+            when = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return (when - _EPOCH) // _ONE_MS
+
+
+def event_body(details: Any) -> Optional[str]:
+    """Return the searchable text of an event's ``details``."""
+
+    if isinstance(details, str):
+        return details or None
+    if not isinstance(details, Mapping):
+        return None
+    parts = [details[key] for key in BODY_KEYS if isinstance(details.get(key), str)]
+    text = "\n".join(part for part in parts if part)
+    return text or None
+
+
+def _load_details(details: Optional[str]) -> Any:
+    if details is None:
+        return None
+    try:
+        return json.loads(details)
+    except ValueError:
+        return details
+
+
+def story_rows(
+    events: Iterable[Mapping[str, Any]], source: Optional[str] = None
+) -> Iterator[tuple]:
+    """Yield ``story_events`` rows for ``events`` with details as JSON."""
+
+    for event in events:
+        try:
+            event_id = event["event_id"]
+            timestamp = event["timestamp"]
+        except KeyError as exc:
+            raise ValueError("event is missing required fields") from exc
+        details = event.get("details")
+        body = event_body(details)
+        if details is not None and not isinstance(details, str):
+            details = json.dumps(details)
+        yield (
+            event_id,
+            source,
+            timestamp,
+            to_epoch_ms(timestamp),
+            event.get("actor"),
+            event.get("action"),
+            details,
+            body,
+        )
+
+
+def write_story_batch(
+    conn: sqlite3.Connection,
+    events: Iterable[Mapping[str, Any]],
+    *,
+    source: Optional[str] = None,
+) -> int:
+    """Upsert ``events`` on ``conn`` without committing; return the count.
+
+    The schema must already exist, see :func:`ensure_story_events_schema`.
+    """
+
+    return write_story_rows(conn, story_rows(events, source))
+
+
+def write_story_rows(conn: sqlite3.Connection, rows: Iterable[tuple]) -> int:
+    """Upsert rows produced by :func:`story_rows`; return the count."""
+
+    # ``total_changes`` would also count the FTS trigger writes.
+    written = 0
+
+    def counted() -> Iterator[tuple]:
+        nonlocal written
+        for row in rows:
+            written += 1
+            yield row
+
+    conn.executemany(_UPSERT_SQL, counted())
+    return written
+
+
+def upsert_story_events(
+    events: Iterable[Mapping[str, Any]],
+    *,
+    source: Optional[str] = None,
+    conn: Optional[sqlite3.Connection] = None,
+    db_path: str = DB_PATH,
+) -> int:
+    """Insert or update story events in the database.
+
+    Parameters
+    ----------
+    events:
+        Iterable of story events. Iterators, such as a connector's
+        ``iter_events()``, are consumed lazily.
+    source:
+        Name recorded in the ``source`` column, e.g. ``"slack:acme"``.
+    conn:
+        Optional existing database connection. When omitted a new connection is
+        created using ``db_path``.
+    db_path:
+        Path to the SQLite database used when ``conn`` is not provided.
+
+    Returns
+    -------
+    int
+        The number of events written to the database.
+    """
+
+    owns_connection = False
+    if conn is None:
+        conn = sqlite3.connect(db_path)
+        owns_connection = True
+    try:
+        ensure_story_events_schema(conn)
+        written = write_story_batch(conn, events, source=source)
+        conn.commit()
+    finally:
+        if owns_connection:
+            conn.close()
+    return written
+
+
+def transcript_segment_events(
+    segments: Iterable[Mapping[str, Any]],
+    *,
+    recorded_at: datetime,
+    recording: str,
+) -> Iterator[Dict[str, Any]]:
+    """Yield one ``transcript_segment`` story event per transcript segment.
+
+    Parameters
+    ----------
+    segments:
+        WhisperX-style segments with ``text`` and optional ``start``,
+        ``end`` (seconds into the recording) and ``speaker``.
+    recorded_at:
+        Start time of the recording; segment timestamps are offset from it.
+    recording:
+        Path or name of the recording, stored in the details.
+    """
+
+    for segment in segments:
+        text = (segment.get("text") or "").strip()
+        if not text:
+            continue
+        start = float(segment.get("start") or 0.0)
+        timestamp = (recorded_at + timedelta(seconds=start)).isoformat()
+        actor = segment.get("speaker") or "speaker"
+        details = {"text": text, "recording": recording, "start": start}
+        if segment.get("end") is not None:
+            details["end"] = float(segment["end"])
+        yield {
+            "event_id": content_event_id(
+                "transcript", timestamp, actor, {"recording": recording, "text": text}
+            ),
+            "timestamp": timestamp,
+            "actor": actor,
+            "action": "transcript_segment",
+            "details": details,
+        }
+
+
+def transcript_file_events(
+    path: str | Path, *, recorded_at: Optional[datetime] = None
+) -> Iterator[Dict[str, Any]]:
+    """Yield segment events for a plain-text transcript written next to audio.
+
+    Each non-empty line is treated as one segment. ``recorded_at`` defaults
+    to the file's modification time, since text transcripts carry no
+    segment timings.
+    """
+
+    file_path = Path(path)
+    if recorded_at is None:
+        recorded_at = datetime.fromtimestamp(file_path.stat().st_mtime, timezone.utc)
+    with file_path.open("r", encoding="utf-8", errors="replace") as fh:
+        yield from transcript_segment_events(
+            ({"text": line} for line in fh),
+            recorded_at=recorded_at,
+            recording=str(file_path.with_suffix("")),
+        )
+
+
+def search_story_events(
+    conn: sqlite3.Connection,
+    query: str,
+    *,
+    since: Any = None,
+    until: Any = None,
+    actions: Optional[Sequence[str]] = None,
+    limit: int = 100,
+) -> List[Dict[str, Any]]:
+    """Return events whose text matches ``query``, newest first.
+
+    Parameters
+    ----------
+    conn:
+        Connection holding the ``story_events`` schema.
+    query:
+        FTS5 query, e.g. ``'"project falcon"'`` or ``'budget OR invoice'``.
+        Without FTS5 it is matched as a plain substring.
+    since, until:
+        Optional bounds (ISO string, datetime or epoch ms); ``until`` is
+        exclusive.
+    actions:
+        Restrict to these actions, e.g. ``["message", "transcript_segment"]``.
+    limit:
+        Maximum number of events returned.
+    """
+
+    clauses: List[str] = []
+    params: List[Any] = []
+    if has_fts(conn):
+        clauses.append(
+            f"e.rowid IN (SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?)"
+        )
+        params.append(query)
+    else:
+        clauses.append("e.body LIKE ?")
+        params.append(f"%{query}%")
+    if since is not None:
+        clauses.append("e.timestamp_ms >= ?")
+        params.append(to_epoch_ms(since))
+    if until is not None:
+        clauses.append("e.timestamp_ms < ?")
+        params.append(to_epoch_ms(until))
+    if actions:
+        clauses.append(f"e.action IN ({', '.join('?' * len(actions))})")
+        params.extend(actions)
+    rows = conn.execute(
+        "SELECT e.event_id, e.source, e.timestamp, e.actor, e.action, e.details "
+        "FROM story_events AS e WHERE "
+        + " AND ".join(clauses)
+        + " ORDER BY e.timestamp_ms DESC LIMIT ?",
+        (*params, limit),
+    ).fetchall()
+    return [
+        {
+            "event_id": event_id,
+            "source": source,
+            "timestamp": timestamp,
+            "actor": actor,
+            "action": action,
+            "details": _load_details(details),
+        }
+        for event_id, source, timestamp, actor, action, details in rows
+    ]
+
+
+__all__ = [
+    "BODY_KEYS",
+    "DB_PATH",
+    "ensure_story_events_schema",
+    "event_body",
+    "has_fts",
+    "search_story_events",
+    "story_rows",
+    "to_epoch_ms",
+    "transcript_file_events",
+    "transcript_segment_events",
+    "upsert_story_events",
+    "write_story_batch",
+    "write_story_rows",
+]
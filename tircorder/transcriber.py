@@ -4,8 +4,10 @@ import sqlite3
 import time
 from datetime import datetime, timedelta
 from queue import Empty, Queue
+from threading import Event
 from typing import Dict, Optional, Tuple
 
+from .interfaces.config import ConfigWatcher, TircorderConfig
 from .state import export_queues_and_files, load_state
 from .utils import (
     get_transcription_backend,
@@ -45,13 +47,23 @@ def transcriber(
     proc_comp_timestamps_transcribe = []
 
     backend_overrides = backend_overrides or {}
-    transcription_method, configured_backend = get_transcription_backend(
-        transcription_method
-    )
-    webui_config = configured_backend if isinstance(configured_backend, dict) else {}
-    if transcription_method == "webui":
-        override_values = backend_overrides.get("webui", {})
-        webui_config = {**webui_config, **override_values}
+
+    def resolve_backend(method: Optional[str]) -> Tuple[str, Dict[str, object]]:
+        resolved_method, configured_backend = get_transcription_backend(method)
+        resolved = configured_backend if isinstance(configured_backend, dict) else {}
+        if resolved_method == "webui":
+            override_values = backend_overrides.get("webui", {})
+            resolved = {**resolved, **override_values}
+        return resolved_method, resolved
+
+    requested_method = transcription_method
+    transcription_method, webui_config = resolve_backend(requested_method)
+
+    # Settings edited while running (method, poll interval, endpoints, ...) are
+    # applied before the next job; the watcher only stats the config file.
+    config_changed = Event()
+    TircorderConfig.subscribe(lambda _config: config_changed.set())
+    ConfigWatcher.ensure_running()
 
     def execute_with_retry(query, params=(), retries=5, delay=1):
         for attempt in range(retries):
@@ -183,6 +195,10 @@ def transcriber(
 
     while True:
         known_file_id = TRANSCRIBE_QUEUE.get()
+        if config_changed.is_set():
+            config_changed.clear()
+            transcription_method, webui_config = resolve_backend(requested_method)
+            logging.info("Reloaded %s backend configuration.", transcription_method)
         start_time = datetime.now()
         TRANSCRIBE_ACTIVE.set()
 
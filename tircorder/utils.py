@@ -112,6 +112,13 @@ DEFAULT_WEBUI_CONFIG: Dict[str, Any] = {
             "enabled": False,
             "log_root": None,
         },
+        "outbox": {
+            "enabled": False,
+            "db_path": "state.db",
+            "workers": 2,
+            "max_attempts": 5,
+            "base_delay_seconds": 2.0,
+        },
     },
 }
 
@@ -131,6 +138,11 @@ def _deep_merge_dicts(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[st
     return merged
 
 
+# Keyed by (config path, config version, method override).
+_BACKEND_CACHE: Dict[Tuple[str, int, Optional[str]], Tuple[str, Dict[str, Any]]] = {}
+_BACKEND_CACHE_LOCK = Lock()
+
+
 def get_transcription_backend(
     method_override: Optional[str] = None,
 ) -> Tuple[str, Dict[str, Any]]:
@@ -144,9 +156,18 @@ def get_transcription_backend(
         A tuple containing the resolved transcription method and a dictionary
         with configuration values for that backend. Unknown configuration keys
         are preserved so callers may pass custom options to downstream APIs.
+        The result is memoised per configuration file until that file
+        changes and is shared between callers, so copy it before mutating.
     """
 
-    config = TircorderConfig.get_config()
+    path = str(TircorderConfig.config_path())
+    version, config = TircorderConfig.snapshot()
+    cache_key = (path, version, method_override)
+    with _BACKEND_CACHE_LOCK:
+        cached = _BACKEND_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+
     transcription_config = config.get("transcription", {})
     method = method_override or transcription_config.get(
         "method", DEFAULT_TRANSCRIPTION_METHOD
@@ -154,10 +175,15 @@ def get_transcription_backend(
 
     if method == "webui":
         configured = transcription_config.get("webui", {})
-        merged = _deep_merge_dicts(DEFAULT_WEBUI_CONFIG, configured)
-        return method, merged
-
-    return method, transcription_config.get(method, {})
+        resolved = method, _deep_merge_dicts(DEFAULT_WEBUI_CONFIG, configured)
+    else:
+        resolved = method, deepcopy(transcription_config.get(method, {}))
+
+    with _BACKEND_CACHE_LOCK:
+        if any(key[:2] != (path, version) for key in _BACKEND_CACHE):
+            _BACKEND_CACHE.clear()
+        _BACKEND_CACHE[cache_key] = resolved
+    return resolved
 
 
 def load_recordings_folders_from_db(db_path="state.db"):
@@ -1,7 +1,16 @@
 """Utility modules for the TiRCorder project."""
 
-from .calendar_utils import get_relative_counts, build_day_segments
+from .calendar_utils import (
+    get_relative_counts,
+    build_day_segments,
+    build_segment_matrix,
+    build_view_segments,
+    count_days,
+)
+from .event_store import ColumnarEvents, StringTable
 from .timeline import (
+    TimelineIndex,
+    iter_merged_events,
     merge_event_streams,
     bucket_by_day,
     emails_for_day,
@@ -11,12 +20,20 @@ from .timeline import (
 from .wordcloud_utils import (
     TopicSummary,
     WordCloudCache,
+    generate_corpus_wordcloud,
     generate_wordcloud,
 )
 
 __all__ = [
     "get_relative_counts",
     "build_day_segments",
+    "build_segment_matrix",
+    "build_view_segments",
+    "count_days",
+    "ColumnarEvents",
+    "StringTable",
+    "TimelineIndex",
+    "iter_merged_events",
     "merge_event_streams",
     "bucket_by_day",
     "emails_for_day",
@@ -24,5 +41,6 @@ __all__ = [
     "step_index",
     "TopicSummary",
     "WordCloudCache",
+    "generate_corpus_wordcloud",
     "generate_wordcloud",
 ]
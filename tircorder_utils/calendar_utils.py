@@ -1,8 +1,10 @@
-from collections import Counter, defaultdict
+from collections import defaultdict
 from datetime import date, datetime, timedelta
 import calendar as _calendar
 
-from typing import Optional
+from typing import Dict, Hashable, List, Optional, Tuple, Union
+
+import numpy as np
 
 try:  # optional dependency
     from hourly_cache import HourlyEventCache  # type: ignore
@@ -33,6 +35,53 @@ def _get_date_range(view: str, reference_date: date):
     return start, end
 
 
+_EPOCH = datetime(1970, 1, 1)
+_ONE_SECOND = timedelta(seconds=1)
+_DAY_SECONDS = 24 * 60 * 60
+_RESOLUTIONS = {"minute": 60, "second": 1}
+
+
+def _step_seconds(resolution: str) -> int:
+    try:
+        return _RESOLUTIONS[resolution]
+    except KeyError:
+        raise ValueError("resolution must be 'minute' or 'second'") from None
+
+
+def _extract_entry(entry):
+    """Return ``(timestamp, app)`` from a datetime, tuple or dictionary."""
+    if isinstance(entry, dict):
+        return entry.get("timestamp"), entry.get("app")
+    try:
+        ts, app = entry
+    except (TypeError, ValueError):
+        return entry, None
+    return ts, app
+
+
+def _wall_seconds(timestamps) -> np.ndarray:
+    """Return wall-clock seconds since 1970-01-01 as an ``int64`` array.
+
+    ``timestamps`` is a ``datetime64`` array or a sequence of datetimes.
+    Aware datetimes count by their own wall-clock time, like ``ts.date()``.
+    """
+    if isinstance(timestamps, np.ndarray) and timestamps.dtype.kind == "M":
+        return timestamps.astype("datetime64[s]").astype(np.int64)
+    return np.fromiter(
+        (
+            ((ts if ts.tzinfo is None else ts.replace(tzinfo=None)) - _EPOCH)
+            // _ONE_SECOND
+            for ts in timestamps
+        ),
+        dtype=np.int64,
+        count=len(timestamps),
+    )
+
+
+def _day_start_seconds(day: date) -> int:
+    return (day - _EPOCH.date()).days * _DAY_SECONDS
+
+
 def get_relative_counts(
     entries=None,
     view: str = "week",
@@ -45,8 +94,9 @@ def get_relative_counts(
     Parameters
     ----------
     entries:
-        Iterable of :class:`datetime.datetime` objects representing individual
-        entries. May be ``None`` when using ``cache``.
+        Iterable of :class:`datetime.datetime` objects, or a ``datetime64``
+        array, representing individual entries. May be ``None`` when using
+        ``cache``.
     view: str, optional
         Calendar view to produce. Defaults to ``'week'``.
     reference_date: datetime.date, optional
@@ -68,17 +118,18 @@ def get_relative_counts(
 
     start, end = _get_date_range(view, reference_date)
 
-    entries = list(entries or [])
-    use_cache = cache is not None and (not entries or len(entries) > threshold)
+    if entries is None:
+        entries = []
+    elif not isinstance(entries, (list, tuple, np.ndarray)):
+        entries = list(entries)
+    use_cache = cache is not None and (not len(entries) or len(entries) > threshold)
 
     if use_cache:
         day_counts = cache.day_counts(start, end)
     else:
-        counts = Counter(dt.date() for dt in entries)
-        num_days = (end - start).days + 1
+        counts = count_days(entries, start, end)
         day_counts = {
-            start + timedelta(days=i): counts.get(start + timedelta(days=i), 0)
-            for i in range(num_days)
+            start + timedelta(days=i): int(count) for i, count in enumerate(counts)
         }
 
     max_count = max(day_counts.values()) if day_counts else 0
@@ -89,6 +140,109 @@ def get_relative_counts(
     return intensities
 
 
+def count_days(entries, start: date, end: date) -> np.ndarray:
+    """Return the number of entries on each day from ``start`` to ``end``.
+
+    Parameters
+    ----------
+    entries:
+        Sequence of :class:`datetime.datetime` objects or a ``datetime64``
+        array.
+    start, end: datetime.date
+        Inclusive range of days.
+
+    Returns
+    -------
+    numpy.ndarray
+        ``int64`` counts, one per day.
+    """
+    num_days = (end - start).days + 1
+    days = (_wall_seconds(entries) - _day_start_seconds(start)) // _DAY_SECONDS
+    days = days[(days >= 0) & (days < num_days)]
+    return np.bincount(days, minlength=num_days)
+
+
+def build_segment_matrix(
+    entries,
+    start: date,
+    end: date,
+    resolution: str = "minute",
+    by_app: bool = False,
+) -> Union[np.ndarray, Dict[Hashable, np.ndarray]]:
+    """Return per-time-step counts for every day from ``start`` to ``end``.
+
+    Timestamps are converted to an epoch array once and counted with a
+    single ``np.bincount``, so a week, month or year of segments is built in
+    one pass.
+
+    Parameters
+    ----------
+    entries:
+        Same forms as :func:`build_day_segments`, or a ``datetime64`` array.
+    start, end: datetime.date
+        Inclusive range of days.
+    resolution: str, optional
+        ``'minute'`` (default) or ``'second'``.
+    by_app: bool, optional
+        If ``True`` return a matrix per app.
+
+    Returns
+    -------
+    numpy.ndarray or dict
+        ``int64`` matrix of shape ``(days, steps)``, where row ``i`` is
+        ``start + i`` days. With ``by_app`` a mapping of app name to such a
+        matrix, for apps with entries in the range.
+    """
+    step_seconds = _step_seconds(resolution)
+    total_steps = _DAY_SECONDS // step_seconds
+    num_days = (end - start).days + 1
+    size = num_days * total_steps
+
+    if isinstance(entries, np.ndarray) and entries.dtype.kind == "M":
+        timestamps, apps = entries, None
+    else:
+        pairs = [_extract_entry(entry) for entry in entries]
+        timestamps = [ts for ts, _ in pairs]
+        apps = [app for _, app in pairs]
+
+    offsets = _wall_seconds(timestamps) - _day_start_seconds(start)
+    inside = (offsets >= 0) & (offsets < num_days * _DAY_SECONDS)
+    cells = offsets[inside] // step_seconds
+
+    if not by_app:
+        return np.bincount(cells, minlength=size).reshape(num_days, total_steps)
+
+    names: Dict[Hashable, int] = {}
+    codes = np.fromiter(
+        (names.setdefault(app, len(names)) for app in apps or [None] * len(offsets)),
+        dtype=np.int64,
+        count=len(offsets),
+    )
+    counts = np.bincount(
+        codes[inside] * size + cells, minlength=len(names) * size
+    ).reshape(len(names), num_days, total_steps)
+    return {app: counts[code] for app, code in names.items() if counts[code].any()}
+
+
+def build_view_segments(
+    entries,
+    view: str = "week",
+    reference_date: Optional[date] = None,
+    resolution: str = "minute",
+    by_app: bool = False,
+) -> Tuple[List[date], Union[np.ndarray, Dict[Hashable, np.ndarray]]]:
+    """Return the days of a calendar ``view`` and their segment matrix.
+
+    See :func:`build_segment_matrix`; the range is chosen like
+    :func:`get_relative_counts` does for ``view`` and ``reference_date``.
+    """
+    if reference_date is None:
+        reference_date = date.today()
+    start, end = _get_date_range(view, reference_date)
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    return days, build_segment_matrix(entries, start, end, resolution, by_app)
+
+
 def build_day_segments(
     entries,
     day: date,
@@ -119,46 +273,21 @@ def build_day_segments(
         seconds).
     """
 
-    if resolution == "second":
-        step_seconds = 1
-        total_steps = 24 * 60 * 60
-    elif resolution == "minute":
-        step_seconds = 60
-        total_steps = 24 * 60
-    else:
-        raise ValueError("resolution must be 'minute' or 'second'")
-
-    def _extract(entry):
-        if isinstance(entry, dict):
-            ts = entry.get("timestamp")
-            app = entry.get("app")
-        else:
-            try:
-                ts, app = entry
-            except (TypeError, ValueError):
-                ts = entry
-                app = None
-        return ts, app
-
-    start_dt = datetime.combine(day, datetime.min.time())
-
-    if by_app:
-        counts = defaultdict(lambda: [0] * total_steps)
-    else:
-        counts = [0] * total_steps
-
-    for entry in entries:
-        ts, app = _extract(entry)
-        if ts.date() != day:
-            continue
-        index = int((ts - start_dt).total_seconds() // step_seconds)
-        if 0 <= index < total_steps:
-            if by_app:
-                counts[app][index] += 1
-            else:
-                counts[index] += 1
-
+    total_steps = _DAY_SECONDS // _step_seconds(resolution)
+    if not isinstance(entries, (list, tuple, np.ndarray)):
+        entries = list(entries)
+    matrix = build_segment_matrix(entries, day, day, resolution, by_app)
+    if not by_app:
+        return matrix[0].tolist()
+    counts = defaultdict(lambda: [0] * total_steps)
+    counts.update((app, rows[0].tolist()) for app, rows in matrix.items())
     return counts
 
 
-__all__ = ["get_relative_counts", "build_day_segments"]
+__all__ = [
+    "get_relative_counts",
+    "build_day_segments",
+    "build_segment_matrix",
+    "build_view_segments",
+    "count_days",
+]
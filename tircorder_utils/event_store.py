@@ -0,0 +1,450 @@
+"""Columnar in-memory store of story events for timeline analytics.
+
+Story events are heterogeneous dicts, and aggregating a year of them for the
+Streamline ribbons (``docs/TIMELINE_STREAM_VIZ_ROADMAP.md``) means millions of
+dict lookups. :class:`ColumnarEvents` holds the fields those aggregates need
+as NumPy columns sorted by time:
+
+* ``ts`` - epoch milliseconds (``int64``), as in ``story_events.timestamp_ms``;
+* ``source_id``, ``actor_id``, ``action_id`` - ``int32`` ids into one interned
+  :class:`StringTable`;
+* ``payload_offset``/``payload_length`` - optional byte ranges of each
+  event's JSON ``details`` in a single payload buffer.
+
+Filters and group-bys are vectorised over the id columns. :meth:`save` writes
+one ``.npy`` file per column, and :meth:`ColumnarEvents.load` memory-maps
+them, so a visualiser opens a large store without parsing it.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import sqlite3
+from array import array
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+import numpy as np
+
+from integrations.base import EventSource, iter_source_events
+from tircorder.story_storage import to_epoch_ms
+
+COLUMNS = ("ts", "source_id", "actor_id", "action_id")
+PAYLOAD_COLUMNS = ("payload_offset", "payload_length")
+_STRINGS_FILE = "strings.json"
+_PAYLOAD_FILE = "payload.bin"
+
+TimeBound = Optional[Any]
+
+
+class StringTable:
+    """Interned strings addressed by dense integer ids."""
+
+    def __init__(self, strings: Iterable[str] = ()) -> None:
+        self.strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for value in strings:
+            self.intern(value)
+
+    def __len__(self) -> int:
+        return len(self.strings)
+
+    def intern(self, value: Any) -> int:
+        """Return the id of ``value``, adding it if unseen; ``None`` is ``""``."""
+
+        value = "" if value is None else str(value)
+        key = self._ids.get(value)
+        if key is None:
+            key = self._ids[value] = len(self.strings)
+            self.strings.append(value)
+        return key
+
+    def id_of(self, value: str) -> int:
+        """Return the id of ``value`` or ``-1`` when it is not in the table."""
+
+        return self._ids.get(value, -1)
+
+    def lookup(self, key: int) -> str:
+        return self.strings[key]
+
+
+def _ms(value: TimeBound) -> Optional[int]:
+    if value is None:
+        return None
+    ms = to_epoch_ms(value)
+    if ms is None:
+        raise ValueError(f"invalid time bound: {value!r}")
+    return ms
+
+
+def _event_rows(
+    pairs: Iterable[Tuple[Optional[str], Mapping[str, Any]]], payloads: bool
+) -> Iterator[Tuple[int, Any, Any, Any, Optional[str]]]:
+    for source, event in pairs:
+        when = to_epoch_ms(event.get("timestamp"))
+        if when is None:
+            continue
+        details = (
+            json.dumps(event.get("details"), ensure_ascii=False) if payloads else None
+        )
+        yield (
+            when,
+            source if source is not None else event.get("source"),
+            event.get("actor"),
+            event.get("action"),
+            details,
+        )
+
+
+class ColumnarEvents:
+    """Time-sorted NumPy columns of story events sharing a string table.
+
+    Instances are usually built with :meth:`from_events`,
+    :meth:`from_streams`, :meth:`from_story_db` or :meth:`load`. Filtering
+    returns a new instance whose columns are views or index copies of the
+    original and which shares its string table and payload buffer.
+    """
+
+    def __init__(
+        self,
+        columns: Mapping[str, np.ndarray],
+        strings: StringTable,
+        payload: Optional[Any] = None,
+    ) -> None:
+        self.ts: np.ndarray = columns["ts"]
+        self.source_id: np.ndarray = columns["source_id"]
+        self.actor_id: np.ndarray = columns["actor_id"]
+        self.action_id: np.ndarray = columns["action_id"]
+        self.payload_offset: Optional[np.ndarray] = columns.get("payload_offset")
+        self.payload_length: Optional[np.ndarray] = columns.get("payload_length")
+        self.strings = strings
+        self._payload = payload
+
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_events(
+        cls,
+        events: Iterable[Mapping[str, Any]],
+        *,
+        source: Optional[str] = None,
+        payloads: bool = False,
+        strings: Optional[StringTable] = None,
+    ) -> "ColumnarEvents":
+        """Build a store from an iterable of story events.
+
+        Parameters
+        ----------
+        events:
+            Story events; those without a parsable ``timestamp`` are skipped.
+        source:
+            Source name for every event. Defaults to each event's ``source``.
+        payloads:
+            Keep each event's ``details`` as JSON in the payload buffer.
+        strings:
+            Existing table to intern into, e.g. to share ids between stores.
+        """
+
+        rows = _event_rows(((source, event) for event in events), payloads)
+        return cls._build(rows, payloads, strings)
+
+    @classmethod
+    def from_streams(
+        cls,
+        event_streams: Mapping[str, EventSource],
+        *,
+        payloads: bool = False,
+        strings: Optional[StringTable] = None,
+    ) -> "ColumnarEvents":
+        """Build a store from connector outputs keyed by source name."""
+
+        pairs = (
+            (source, event)
+            for source, stream in event_streams.items()
+            for event in iter_source_events(stream)
+        )
+        return cls._build(_event_rows(pairs, payloads), payloads, strings)
+
+    @classmethod
+    def from_story_db(
+        cls,
+        conn: sqlite3.Connection,
+        *,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        payloads: bool = False,
+    ) -> "ColumnarEvents":
+        """Build a store from the ``story_events`` table.
+
+        ``since``/``until`` bound ``timestamp_ms`` like
+        :func:`tircorder.story_storage.search_story_events`.
+        """
+
+        clauses = ["timestamp_ms IS NOT NULL"]
+        params: List[int] = []
+        if since is not None:
+            clauses.append("timestamp_ms >= ?")
+            params.append(_ms(since))
+        if until is not None:
+            clauses.append("timestamp_ms < ?")
+            params.append(_ms(until))
+        details = "details" if payloads else "NULL"
+        rows = conn.execute(
+            f"SELECT timestamp_ms, source, actor, action, {details} "
+            f"FROM story_events WHERE {' AND '.join(clauses)}",
+            params,
+        )
+        return cls._build(rows, payloads, None)
+
+    @classmethod
+    def _build(
+        cls,
+        rows: Iterable[Tuple[int, Any, Any, Any, Optional[str]]],
+        payloads: bool,
+        strings: Optional[StringTable],
+    ) -> "ColumnarEvents":
+        strings = strings if strings is not None else StringTable()
+        intern = strings.intern
+        known = strings._ids.get
+        ts, source_ids, actor_ids, action_ids = (array(code) for code in "qiii")
+        offsets, lengths = array("q"), array("q")
+        buffer = bytearray()
+        for when, source, actor, action, details in rows:
+            ts.append(when)
+            # Look names up directly and only call ``intern`` for new ones.
+            key = known(source)
+            source_ids.append(intern(source) if key is None else key)
+            key = known(actor)
+            actor_ids.append(intern(actor) if key is None else key)
+            key = known(action)
+            action_ids.append(intern(action) if key is None else key)
+            if payloads:
+                data = (details or "null").encode("utf-8")
+                offsets.append(len(buffer))
+                lengths.append(len(data))
+                buffer += data
+        columns = {
+            "ts": np.frombuffer(ts, dtype=np.int64),
+            "source_id": np.frombuffer(source_ids, dtype=np.int32),
+            "actor_id": np.frombuffer(actor_ids, dtype=np.int32),
+            "action_id": np.frombuffer(action_ids, dtype=np.int32),
+        }
+        if payloads:
+            columns["payload_offset"] = np.frombuffer(offsets, dtype=np.int64)
+            columns["payload_length"] = np.frombuffer(lengths, dtype=np.int64)
+        # Connector output is mostly in order already, which a stable sort
+        # handles in close to linear time.
+        order = np.argsort(columns["ts"], kind="stable")
+        columns = {name: column[order] for name, column in columns.items()}
+        return cls(columns, strings, bytes(buffer) if payloads else None)
+
+    # ------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def _columns(self) -> Dict[str, np.ndarray]:
+        columns = {name: getattr(self, name) for name in COLUMNS}
+        if self.payload_offset is not None:
+            columns["payload_offset"] = self.payload_offset
+            columns["payload_length"] = self.payload_length
+        return columns
+
+    def _ids(self, values: Optional[Sequence[str]]) -> Optional[np.ndarray]:
+        if values is None:
+            return None
+        if isinstance(values, str):
+            values = [values]
+        return np.array([self.strings.id_of(v) for v in values], dtype=np.int32)
+
+    def between(
+        self, start: TimeBound = None, end: TimeBound = None
+    ) -> "ColumnarEvents":
+        """Return events in ``[start, end)`` as views, found by binary search.
+
+        Bounds may be datetimes, ISO strings or epoch milliseconds.
+        """
+
+        lo, hi = 0, len(self.ts)
+        if start is not None:
+            lo = int(np.searchsorted(self.ts, _ms(start)))
+        if end is not None:
+            hi = max(lo, int(np.searchsorted(self.ts, _ms(end))))
+        columns = {name: column[lo:hi] for name, column in self._columns().items()}
+        return ColumnarEvents(columns, self.strings, self._payload)
+
+    def mask(
+        self,
+        *,
+        sources: Optional[Sequence[str]] = None,
+        actors: Optional[Sequence[str]] = None,
+        actions: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """Return a boolean mask of events matching every given filter."""
+
+        keep = np.ones(len(self.ts), dtype=bool)
+        for column, values in (
+            (self.source_id, sources),
+            (self.actor_id, actors),
+            (self.action_id, actions),
+        ):
+            ids = self._ids(values)
+            if ids is not None:
+                keep &= np.isin(column, ids)
+        return keep
+
+    def filter(
+        self,
+        start: TimeBound = None,
+        end: TimeBound = None,
+        *,
+        sources: Optional[Sequence[str]] = None,
+        actors: Optional[Sequence[str]] = None,
+        actions: Optional[Sequence[str]] = None,
+    ) -> "ColumnarEvents":
+        """Return events in ``[start, end)`` matching the given names."""
+
+        window = self.between(start, end)
+        if sources is None and actors is None and actions is None:
+            return window
+        keep = window.mask(sources=sources, actors=actors, actions=actions)
+        columns = {name: column[keep] for name, column in window._columns().items()}
+        return ColumnarEvents(columns, self.strings, self._payload)
+
+    def _group_column(self, by: str) -> np.ndarray:
+        if by not in ("source", "actor", "action"):
+            raise ValueError(f"cannot group by {by!r}")
+        return getattr(self, f"{by}_id")
+
+    def counts_by(self, by: str) -> Dict[str, int]:
+        """Return event counts per ``"source"``, ``"actor"`` or ``"action"``."""
+
+        counts = np.bincount(self._group_column(by), minlength=len(self.strings))
+        return {
+            self.strings.lookup(int(key)): int(counts[key])
+            for key in np.flatnonzero(counts)
+        }
+
+    def histogram(
+        self,
+        by: str,
+        bucket_ms: int,
+        start: TimeBound = None,
+        end: TimeBound = None,
+    ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Count events per group and time bucket, e.g. for ribbons.
+
+        Parameters
+        ----------
+        by:
+            ``"source"``, ``"actor"`` or ``"action"``.
+        bucket_ms:
+            Bucket width in milliseconds, e.g. ``3_600_000`` for hours.
+        start, end:
+            Time range; defaults to the span of the events. Buckets are
+            aligned to ``start``.
+
+        Returns
+        -------
+        tuple
+            ``(names, bucket_starts, counts)`` where ``counts[g, b]`` is the
+            number of events of ``names[g]`` in the bucket starting at
+            ``bucket_starts[b]`` (epoch ms).
+        """
+
+        if bucket_ms <= 0:
+            raise ValueError("bucket_ms must be positive")
+        window = self.between(start, end)
+        first = int(window.ts[0]) if len(window) else 0
+        lo = first if start is None else _ms(start)
+        hi = int(window.ts[-1]) + 1 if len(window) else lo
+        if end is not None:
+            hi = _ms(end)
+        buckets = max(0, -(-(hi - lo) // bucket_ms))
+        groups = window._group_column(by)
+        present = np.flatnonzero(np.bincount(groups, minlength=len(self.strings)))
+        rows = np.zeros(len(self.strings), dtype=np.int64)
+        rows[present] = np.arange(len(present))
+        row = rows[groups]
+        cell = row * buckets + (window.ts - lo) // bucket_ms
+        counts = np.bincount(cell, minlength=len(present) * buckets).reshape(
+            len(present), buckets
+        )
+        names = [self.strings.lookup(int(key)) for key in present]
+        return names, lo + bucket_ms * np.arange(buckets, dtype=np.int64), counts
+
+    # ------------------------------------------------------------------
+    def payload(self, index: int) -> Any:
+        """Return the decoded ``details`` of the event at ``index``."""
+
+        if self.payload_offset is None or self._payload is None:
+            raise ValueError("store was built without payloads")
+        start = int(self.payload_offset[index])
+        data = self._payload[start : start + int(self.payload_length[index])]
+        return json.loads(bytes(data).decode("utf-8"))
+
+    def event(self, index: int) -> Dict[str, Any]:
+        """Rebuild the event at ``index`` as a dict (``details`` if stored)."""
+
+        event: Dict[str, Any] = {
+            "timestamp_ms": int(self.ts[index]),
+            "source": self.strings.lookup(int(self.source_id[index])),
+            "actor": self.strings.lookup(int(self.actor_id[index])),
+            "action": self.strings.lookup(int(self.action_id[index])),
+        }
+        if self.payload_offset is not None:
+            event["details"] = self.payload(index)
+        return event
+
+    def save(self, directory: str | Path) -> None:
+        """Write the store to ``directory`` for :meth:`load`."""
+
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for name, column in self._columns().items():
+            np.save(path / f"{name}.npy", np.ascontiguousarray(column))
+        with open(path / _STRINGS_FILE, "w", encoding="utf-8") as fh:
+            json.dump(self.strings.strings, fh, ensure_ascii=False)
+        if self._payload is not None:
+            (path / _PAYLOAD_FILE).write_bytes(bytes(self._payload))
+
+    @classmethod
+    def load(
+        cls, directory: str | Path, *, mmap_mode: Optional[str] = "r"
+    ) -> "ColumnarEvents":
+        """Open a store written by :meth:`save`.
+
+        With the default ``mmap_mode="r"`` columns and payloads are mapped
+        read-only rather than read, so opening is independent of size.
+        Pass ``None`` to load everything into memory.
+        """
+
+        path = Path(directory)
+        with open(path / _STRINGS_FILE, "r", encoding="utf-8") as fh:
+            strings = StringTable(json.load(fh))
+        columns = {
+            name: np.load(path / f"{name}.npy", mmap_mode=mmap_mode)
+            for name in COLUMNS + PAYLOAD_COLUMNS
+            if (path / f"{name}.npy").exists()
+        }
+        payload: Optional[Any] = None
+        payload_path = path / _PAYLOAD_FILE
+        if payload_path.exists():
+            if mmap_mode is None or payload_path.stat().st_size == 0:
+                payload = payload_path.read_bytes()
+            else:
+                with open(payload_path, "rb") as fh:
+                    payload = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(columns, strings, payload)
+
+
+__all__ = ["ColumnarEvents", "StringTable"]
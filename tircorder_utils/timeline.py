@@ -5,8 +5,23 @@ activity, etc.) into a single chronologically ordered stream.  Each event is a
 dictionary with at least a ``timestamp`` field.
 """
 
-from datetime import datetime, timedelta
-from typing import Any, Dict, Iterable, List, Mapping
+import heapq
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from integrations.base import EventSource, iter_source_events
 
 
 def _extract_timestamp(event: Dict[str, Any]) -> datetime | None:
@@ -28,27 +43,89 @@ def _extract_timestamp(event: Dict[str, Any]) -> datetime | None:
     return None
 
 
-def merge_event_streams(event_streams: Mapping[str, Iterable[Dict]]) -> List[Dict]:
+def merge_event_streams(event_streams: Mapping[str, EventSource]) -> List[Dict]:
     """Merge streams from different sources into a single sorted list.
 
     Each event may specify its time under ``"timestamp"`` (ISO string) or
     ``"time"`` (``datetime``). Events lacking a parsable timestamp are ignored.
     The returned events are tagged with their ``source`` and sorted
-    chronologically.
+    chronologically. Streams may be iterables or configured connectors, whose
+    ``iter_events()`` is consumed lazily.
+    """
+
+    entries: List[Tuple[datetime, Dict]] = []
+    for source, stream in event_streams.items():
+        entries.extend(_keyed_events(source, iter_source_events(stream)))
+    # The sort is stable and finds the runs of already ordered sources, so
+    # sorted connector output is merged in linear time.
+    entries.sort(key=itemgetter(0))
+    return [item for _, item in entries]
+
+
+def iter_merged_events(
+    event_streams: Mapping[str, EventSource], *, presorted: Collection[str] = ()
+) -> Iterator[Dict]:
+    """Merge streams from different sources in chronological order.
+
+    Each timestamp is parsed once and the streams are heap-merged. Streams
+    are read and sorted before the first event is yielded, in linear time
+    when already in order, so an unsorted source never interrupts the merge.
+
+    Sources named in ``presorted`` are promised to be chronological and are
+    consumed lazily instead: with all streams presorted, the first event is
+    available after reading one event per stream and memory stays bounded.
+    A presorted source found out of order raises :class:`ValueError`.
     """
 
-    events: List[Dict] = []
+    runs = []
     for source, stream in event_streams.items():
-        for event in stream:
-            ts = _extract_timestamp(event)
-            if ts is None:
-                continue
-            item = dict(event)
-            item["source"] = source
+        keyed = _keyed_events(source, iter_source_events(stream))
+        if source in presorted:
+            runs.append(_in_order(source, keyed))
+        else:
+            # Timsort is linear on a source that is already in order.
+            runs.append(sorted(keyed, key=itemgetter(0)))
+    # ``heapq.merge`` breaks ties by stream order, so events with equal
+    # timestamps keep the order of ``event_streams`` and are never compared.
+    return (item for _, item in heapq.merge(*runs, key=itemgetter(0)))
+
+
+def _keyed_events(
+    source: str, events: Iterable[Dict]
+) -> Iterator[Tuple[datetime, Dict]]:
+    for event in events:
+        ts = _extract_timestamp(event)
+        if ts is None:
+            continue
+        item = dict(event)
+        item["source"] = source
+        # ISO strings are kept as given; only ``datetime`` values are formatted.
+        raw = event.get("timestamp")
+        if not (raw and isinstance(raw, str)):
             item["timestamp"] = ts.isoformat()
-            events.append(item)
-    events.sort(key=lambda e: _extract_timestamp(e) or datetime.min)
-    return events
+        yield _utc_key(ts), item
+
+
+def _utc_key(ts: datetime) -> datetime:
+    """Return ``ts`` as a naive UTC datetime; naive values are taken as UTC."""
+
+    if ts.tzinfo is None:
+        return ts
+    return ts.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _in_order(
+    source: str, keyed: Iterable[Tuple[datetime, Dict]]
+) -> Iterator[Tuple[datetime, Dict]]:
+    last = None
+    for entry in keyed:
+        if last is not None and entry[0] < last:
+            raise ValueError(
+                f"events from {source!r} are not in chronological order; "
+                "do not list it in presorted"
+            )
+        last = entry[0]
+        yield entry
 
 
 def bucket_by_day(events: Iterable[Dict]) -> Dict[datetime, List[Dict]]:
@@ -108,6 +185,194 @@ def index_emails_by_contact(emails: Iterable[Dict]) -> Dict[str, List[Dict]]:
     return index
 
 
+class _Run:
+    """Events of one partition with their keys, both in time order."""
+
+    __slots__ = ("keys", "events")
+
+    def __init__(self) -> None:
+        self.keys: List[datetime] = []
+        self.events: List[Dict] = []
+
+    def add(self, key: datetime, event: Dict) -> None:
+        if not self.keys or key >= self.keys[-1]:
+            self.keys.append(key)
+            self.events.append(event)
+        else:
+            position = bisect_right(self.keys, key)
+            self.keys.insert(position, key)
+            self.events.insert(position, event)
+
+    def bounds(
+        self, start: Optional[datetime], end: Optional[datetime]
+    ) -> Tuple[int, int]:
+        lo = 0 if start is None else bisect_left(self.keys, _utc_key(start))
+        hi = len(self.keys) if end is None else bisect_left(self.keys, _utc_key(end))
+        return lo, max(lo, hi)
+
+
+class TimelineIndex:
+    """Time index over merged events for repeated range queries.
+
+    Timestamps are parsed once when events are added. The index keeps a
+    time-sorted run of events overall, per ``source``, per ``contact`` and
+    per ``(source, contact)`` pair, so :meth:`between` answers "events in
+    ``[start, end)`` for source S and/or contact C" with two binary searches
+    plus the size of the result. Events arriving in time order, as from a
+    live connector, are appended in constant time; older events are
+    inserted in place. Aware timestamps are indexed, and bucketed into days,
+    in UTC; naive ones are taken as UTC.
+
+    Parameters
+    ----------
+    events:
+        Initial events, typically the output of :func:`merge_event_streams`.
+        Events without a parsable timestamp are ignored.
+    """
+
+    def __init__(self, events: Iterable[Dict] = ()) -> None:
+        self._runs: Dict[Tuple[Optional[str], Optional[str]], _Run] = {}
+        self.extend(events)
+
+    @classmethod
+    def from_streams(cls, event_streams: Mapping[str, EventSource]) -> "TimelineIndex":
+        """Build an index over :func:`merge_event_streams` of ``event_streams``."""
+
+        return cls(merge_event_streams(event_streams))
+
+    def __len__(self) -> int:
+        run = self._runs.get((None, None))
+        return len(run.keys) if run else 0
+
+    @property
+    def sources(self) -> List[str]:
+        """Sources of the indexed events."""
+
+        return sorted(s for s, c in self._runs if s is not None and c is None)
+
+    @property
+    def contacts(self) -> List[str]:
+        """Contacts of the indexed events."""
+
+        return sorted(c for s, c in self._runs if s is None and c is not None)
+
+    def add(self, event: Dict) -> bool:
+        """Index ``event``; return ``False`` if it has no parsable timestamp."""
+
+        ts = _extract_timestamp(event)
+        if ts is None:
+            return False
+        key = _utc_key(ts)
+        source = event.get("source")
+        contact = event.get("contact") or None
+        partitions = [(None, None)]
+        if source is not None:
+            partitions.append((source, None))
+        if contact is not None:
+            partitions.append((None, contact))
+            if source is not None:
+                partitions.append((source, contact))
+        for partition in partitions:
+            run = self._runs.get(partition)
+            if run is None:
+                run = self._runs[partition] = _Run()
+            run.add(key, event)
+        return True
+
+    def extend(self, events: Iterable[Dict]) -> int:
+        """Index every event in ``events``; return how many were added."""
+
+        return sum(self.add(event) for event in events)
+
+    def between(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        *,
+        source: Optional[str] = None,
+        contact: Optional[str] = None,
+    ) -> List[Dict]:
+        """Return events in ``[start, end)`` in time order.
+
+        ``None`` leaves that side of the range open. ``source`` and
+        ``contact`` restrict the result to one source and/or contact.
+        """
+
+        run = self._runs.get((source, contact))
+        if run is None:
+            return []
+        lo, hi = run.bounds(start, end)
+        return run.events[lo:hi]
+
+    def count(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        *,
+        source: Optional[str] = None,
+        contact: Optional[str] = None,
+    ) -> int:
+        """Return how many events :meth:`between` would return."""
+
+        run = self._runs.get((source, contact))
+        if run is None:
+            return 0
+        lo, hi = run.bounds(start, end)
+        return hi - lo
+
+    def day(
+        self,
+        day: datetime,
+        *,
+        source: Optional[str] = None,
+        contact: Optional[str] = None,
+    ) -> List[Dict]:
+        """Return the events of ``day`` in time order.
+
+        ``index.day(day, source="email")`` answers :func:`emails_for_day`.
+        """
+
+        start = day.replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.between(
+            start, start + timedelta(days=1), source=source, contact=contact
+        )
+
+    def buckets_by_day(
+        self,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        *,
+        source: Optional[str] = None,
+        contact: Optional[str] = None,
+    ) -> Dict[datetime, List[Dict]]:
+        """Group the events in ``[start, end)`` by day like :func:`bucket_by_day`."""
+
+        run = self._runs.get((source, contact))
+        buckets: Dict[datetime, List[Dict]] = {}
+        if run is None:
+            return buckets
+        lo, hi = run.bounds(start, end)
+        day_end: Optional[datetime] = None
+        bucket: List[Dict] = []
+        for key, event in zip(run.keys[lo:hi], run.events[lo:hi]):
+            if day_end is None or key >= day_end:
+                day_start = key.replace(hour=0, minute=0, second=0, microsecond=0)
+                day_end = day_start + timedelta(days=1)
+                bucket = buckets[day_start] = []
+            bucket.append(event)
+        return buckets
+
+    def by_contact(self, *, source: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """Return each contact's events in time order.
+
+        ``index.by_contact(source="email")`` answers
+        :func:`index_emails_by_contact`.
+        """
+
+        contacts = sorted(c for s, c in self._runs if s == source and c is not None)
+        return {c: list(self._runs[(source, c)].events) for c in contacts}
+
+
 def step_index(current: int, step: int, total: int) -> int:
     """Move within a list using wrap-around semantics.
 
@@ -5,19 +5,23 @@ activity, etc.) into a single chronologically ordered stream.  Each event is a
 dictionary with at least a ``timestamp`` field.
 """
 
-from datetime import datetime, timedelta
-from typing import Dict, Iterable, List, Mapping
+import heapq
+from datetime import datetime, timedelta, timezone
+from operator import itemgetter
+from typing import Collection, Dict, Iterable, Iterator, List, Mapping, Tuple
 
+from integrations.base import EventSource, iter_source_events
 from tircorder.schemas import validate_story
 
 
-def merge_event_streams(event_streams: Mapping[str, Iterable[Dict]]) -> List[Dict]:
+def merge_event_streams(event_streams: Mapping[str, EventSource]) -> List[Dict]:
     """Merge streams from different sources into a single sorted list.
 
     Parameters
     ----------
     event_streams:
-        Mapping of source name to an iterable of event dictionaries. Each
+        Mapping of source name to an iterable of event dictionaries or a
+        configured connector whose ``iter_events()`` is consumed lazily. Each
         event must contain a ``timestamp`` key in ISO 8601 format.
 
     Returns
@@ -26,19 +30,73 @@ def merge_event_streams(event_streams: Mapping[str, Iterable[Dict]]) -> List[Dic
         Combined events tagged with their ``source`` and sorted by ``timestamp``.
     """
 
-    events: List[Dict] = []
+    entries: List[Tuple[datetime, Dict]] = []
     for source, stream in event_streams.items():
-        for event in stream:
-            validate_story(event)
-            item = dict(event)
-            item["source"] = source
-            events.append(item)
-    events.sort(
-        key=lambda e: datetime.fromisoformat(
-            e.get("timestamp", datetime.min.isoformat())
-        )
-    )
-    return events
+        entries.extend(_keyed_events(source, iter_source_events(stream)))
+    # The sort is stable and finds the runs of already ordered sources, so
+    # sorted connector output is merged in linear time.
+    entries.sort(key=itemgetter(0))
+    return [item for _, item in entries]
+
+
+def iter_merged_events(
+    event_streams: Mapping[str, EventSource], *, presorted: Collection[str] = ()
+) -> Iterator[Dict]:
+    """Merge streams from different sources in chronological order.
+
+    Each timestamp is parsed once and the streams are heap-merged. Streams
+    are read and sorted before the first event is yielded, in linear time
+    when already in order, so an unsorted source never interrupts the merge.
+
+    Sources named in ``presorted`` are promised to be chronological and are
+    consumed lazily instead: with all streams presorted, the first event is
+    available after reading one event per stream and memory stays bounded.
+    A presorted source found out of order raises :class:`ValueError`.
+    """
+
+    runs = []
+    for source, stream in event_streams.items():
+        keyed = _keyed_events(source, iter_source_events(stream))
+        if source in presorted:
+            runs.append(_in_order(source, keyed))
+        else:
+            # Timsort is linear on a source that is already in order.
+            runs.append(sorted(keyed, key=itemgetter(0)))
+    # ``heapq.merge`` breaks ties by stream order, so events with equal
+    # timestamps keep the order of ``event_streams`` and are never compared.
+    return (item for _, item in heapq.merge(*runs, key=itemgetter(0)))
+
+
+def _keyed_events(
+    source: str, events: Iterable[Dict]
+) -> Iterator[Tuple[datetime, Dict]]:
+    for event in events:
+        validate_story(event)
+        item = dict(event)
+        item["source"] = source
+        yield _utc_key(datetime.fromisoformat(event["timestamp"])), item
+
+
+def _utc_key(ts: datetime) -> datetime:
+    """Return ``ts`` as a naive UTC datetime; naive values are taken as UTC."""
+
+    if ts.tzinfo is None:
+        return ts
+    return ts.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _in_order(
+    source: str, keyed: Iterable[Tuple[datetime, Dict]]
+) -> Iterator[Tuple[datetime, Dict]]:
+    last = None
+    for entry in keyed:
+        if last is not None and entry[0] < last:
+            raise ValueError(
+                f"events from {source!r} are not in chronological order; "
+                "do not list it in presorted"
+            )
+        last = entry[0]
+        yield entry
 
 
 def bucket_by_day(events: Iterable[Dict]) -> Dict[datetime, List[Dict]]:
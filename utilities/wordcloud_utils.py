@@ -1,9 +1,24 @@
+"""Word clouds backed by an incremental term index.
+
+Documents (transcripts, messages, ...) are tokenised once and stored as
+``(doc_id, term_id, count)`` rows over an interned vocabulary. The word cloud
+for any set of documents - a day, a contact, a month - is then a single
+``SUM(count) ... GROUP BY term`` query with a top-N limit instead of
+re-tokenising the concatenated text. Re-adding a document under the same key
+only rewrites its rows when its text changed.
+"""
+
 import sqlite3
 import hashlib
 import json
 import re
 from dataclasses import dataclass
 from collections import Counter
+from datetime import date
+from typing import Iterable, Optional, Sequence
+
+_WORD = re.compile(r"\b\w+\b")
+_CHUNK = 500
 
 
 @dataclass
@@ -18,22 +33,80 @@ class TopicSummary:
 
 
 class WordCloudCache:
-    """Persistent cache mapping text hashes to word-frequency counts."""
+    """Persistent term index of documents for word-frequency queries.
+
+    ``wordclouds`` holds one row per document with its key, text hash and
+    optional ``contact`` and ``day``; ``wordcloud_terms`` is the vocabulary
+    and ``wordcloud_doc_terms`` the per-document term counts. Texts counted
+    by :meth:`get_or_create` are kept as ``adhoc`` rows, which are reused as
+    a cache but never counted by :meth:`top_terms`.
+
+    Parameters
+    ----------
+    db_path: str, optional
+        Location of the SQLite database file. Use ``":memory:"`` for an
+        in-memory index.
+    """
 
     def __init__(self, db_path: str = "wordcloud_cache.sqlite"):
         self.conn = sqlite3.connect(db_path)
+        self._term_ids: dict[str, int] = {}
+        # Terms inserted by a transaction that may not have been committed.
+        self._new_terms: set[str] = set()
         self._init_db()
 
     def _init_db(self) -> None:
         cur = self.conn.cursor()
+        columns = {row[1] for row in cur.execute("PRAGMA table_info(wordclouds)")}
+        legacy = "counts" in columns
+        if legacy:
+            cur.execute("ALTER TABLE wordclouds RENAME TO wordclouds_legacy")
         cur.execute(
             """
             CREATE TABLE IF NOT EXISTS wordclouds (
-                text_hash TEXT PRIMARY KEY,
-                counts TEXT NOT NULL
+                doc_id INTEGER PRIMARY KEY,
+                doc_key TEXT NOT NULL UNIQUE,
+                text_hash TEXT NOT NULL,
+                contact TEXT,
+                day TEXT,
+                adhoc INTEGER NOT NULL DEFAULT 0
             )
             """
         )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_wordclouds_hash ON wordclouds(text_hash)"
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_wordclouds_contact_day "
+            "ON wordclouds(contact, day)"
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_wordclouds_day ON wordclouds(day)")
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS wordcloud_terms (
+                term_id INTEGER PRIMARY KEY,
+                term TEXT NOT NULL UNIQUE
+            )
+            """
+        )
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS wordcloud_doc_terms (
+                doc_id INTEGER NOT NULL,
+                term_id INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (doc_id, term_id)
+            ) WITHOUT ROWID
+            """
+        )
+        if legacy:
+            # Earlier versions stored a JSON Counter per text hash.
+            rows = cur.execute("SELECT text_hash, counts FROM wordclouds_legacy")
+            for text_hash, counts in rows.fetchall():
+                self._store(
+                    text_hash, text_hash, json.loads(counts), None, None, adhoc=True
+                )
+            cur.execute("DROP TABLE wordclouds_legacy")
         self.conn.commit()
 
     @staticmethod
@@ -41,24 +114,235 @@ class WordCloudCache:
         return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
     def _compute_counts(self, text: str) -> dict[str, int]:
-        words = re.findall(r"\b\w+\b", text.lower())
-        return dict(Counter(words))
+        return dict(Counter(_WORD.findall(text.lower())))
+
+    # ------------------------------------------------------------------
+    def _select_ids(self, terms: list[str]) -> None:
+        for i in range(0, len(terms), _CHUNK):
+            chunk = terms[i : i + _CHUNK]
+            marks = ",".join("?" * len(chunk))
+            self._term_ids.update(
+                self.conn.execute(
+                    f"SELECT term, term_id FROM wordcloud_terms WHERE term IN ({marks})",
+                    chunk,
+                )
+            )
+
+    def _settle_terms(self) -> None:
+        """Drop cached ids of terms whose transaction was rolled back.
+
+        Called before a write starts a transaction: ids cached for terms
+        inserted earlier are re-read, so a ``rollback()`` after
+        ``add_document(commit=False)`` cannot leave dangling ids behind.
+        """
+        if not self._new_terms or self.conn.in_transaction:
+            return
+        terms = list(self._new_terms)
+        self._new_terms.clear()
+        for term in terms:
+            del self._term_ids[term]
+        self._select_ids(terms)
+
+    def _ids_for(self, terms: Iterable[str]) -> dict[str, int]:
+        """Return term ids for ``terms``, adding unseen terms to the vocabulary."""
+        known = self._term_ids
+        missing = [term for term in terms if term not in known]
+        if missing:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO wordcloud_terms(term) VALUES (?)",
+                ((term,) for term in missing),
+            )
+            self._select_ids(missing)
+            self._new_terms.update(missing)
+        return known
+
+    def _store(
+        self,
+        key: str,
+        text_hash: str,
+        counts: dict[str, int],
+        contact: Optional[str],
+        day: Optional[str],
+        adhoc: bool = False,
+    ) -> int:
+        self._settle_terms()
+        row = self.conn.execute(
+            "SELECT doc_id FROM wordclouds WHERE doc_key=?", (key,)
+        ).fetchone()
+        if row:
+            doc_id = row[0]
+            self.conn.execute(
+                "UPDATE wordclouds SET text_hash=?, contact=?, day=?, adhoc=? "
+                "WHERE doc_id=?",
+                (text_hash, contact, day, adhoc, doc_id),
+            )
+            self.conn.execute(
+                "DELETE FROM wordcloud_doc_terms WHERE doc_id=?", (doc_id,)
+            )
+        else:
+            doc_id = self.conn.execute(
+                "INSERT INTO wordclouds(doc_key, text_hash, contact, day, adhoc) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, text_hash, contact, day, adhoc),
+            ).lastrowid
+        ids = self._ids_for(counts)
+        self.conn.executemany(
+            "INSERT INTO wordcloud_doc_terms(doc_id, term_id, count) VALUES (?, ?, ?)",
+            ((doc_id, ids[term], count) for term, count in counts.items()),
+        )
+        return doc_id
+
+    def add_document(
+        self,
+        text: str,
+        key: Optional[str] = None,
+        *,
+        contact: Optional[str] = None,
+        day: Optional[date] = None,
+        commit: bool = True,
+    ) -> int:
+        """Index ``text`` and return its document id.
+
+        Parameters
+        ----------
+        text:
+            Document text.
+        key:
+            Stable identifier such as a transcript path. Defaults to the
+            text hash. Re-adding a key whose text is unchanged does nothing;
+            changed text replaces the document's term counts.
+        contact, day:
+            Optional attributes for :meth:`top_terms` filters.
+        commit:
+            Commit the transaction; pass ``False`` when adding many
+            documents and commit once afterwards.
+        """
+        text_hash = self._hash_text(text)
+        key = key or text_hash
+        day_key = day.isoformat() if day is not None else None
+        row = self.conn.execute(
+            "SELECT doc_id, text_hash, contact, day, adhoc FROM wordclouds "
+            "WHERE doc_key=?",
+            (key,),
+        ).fetchone()
+        if row and row[1:] == (text_hash, contact, day_key, 0):
+            return row[0]
+        if row and row[1] == text_hash:
+            self.conn.execute(
+                "UPDATE wordclouds SET contact=?, day=?, adhoc=0 WHERE doc_id=?",
+                (contact, day_key, row[0]),
+            )
+            doc_id = row[0]
+        else:
+            counts = self._compute_counts(text)
+            doc_id = self._store(key, text_hash, counts, contact, day_key)
+        if commit:
+            self.conn.commit()
+        return doc_id
+
+    def remove_document(self, key: str) -> bool:
+        """Remove the document stored under ``key``; return whether it existed."""
+        row = self.conn.execute(
+            "SELECT doc_id FROM wordclouds WHERE doc_key=?", (key,)
+        ).fetchone()
+        if not row:
+            return False
+        with self.conn:
+            self.conn.execute("DELETE FROM wordcloud_doc_terms WHERE doc_id=?", row)
+            self.conn.execute("DELETE FROM wordclouds WHERE doc_id=?", row)
+        return True
+
+    def document_counts(self, doc_id: int) -> dict[str, int]:
+        """Return the term counts of one document, most frequent first."""
+        rows = self.conn.execute(
+            """
+            SELECT t.term, d.count
+            FROM wordcloud_doc_terms AS d
+            JOIN wordcloud_terms AS t USING (term_id)
+            WHERE d.doc_id = ?
+            ORDER BY d.count DESC, t.term
+            """,
+            (doc_id,),
+        )
+        return dict(rows)
+
+    def top_terms(
+        self,
+        limit: Optional[int] = 100,
+        *,
+        keys: Optional[Sequence[str]] = None,
+        contact: Optional[str] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> dict[str, int]:
+        """Return the most frequent terms over a set of documents.
+
+        Documents are selected by ``keys`` and/or their ``contact`` and
+        ``day`` (``start``/``end`` inclusive); with no filters the whole
+        corpus is used. Counts are summed in SQL and the ``limit`` most
+        frequent terms returned, most frequent first. Texts counted by
+        :meth:`get_or_create` are not part of the corpus.
+        """
+        clauses = ["w.adhoc = 0"]
+        params: list = []
+        if keys is not None:
+            if not keys:
+                return {}
+            keys = list(dict.fromkeys(keys))
+            if len(keys) > _CHUNK:
+                totals: Counter = Counter()
+                for i in range(0, len(keys), _CHUNK):
+                    totals.update(
+                        self.top_terms(
+                            None,
+                            keys=keys[i : i + _CHUNK],
+                            contact=contact,
+                            start=start,
+                            end=end,
+                        )
+                    )
+                ranked = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+                return dict(ranked if limit is None else ranked[:limit])
+            clauses.append(f"w.doc_key IN ({','.join('?' * len(keys))})")
+            params.extend(keys)
+        if contact is not None:
+            clauses.append("w.contact = ?")
+            params.append(contact)
+        if start is not None:
+            clauses.append("w.day >= ?")
+            params.append(start.isoformat())
+        if end is not None:
+            clauses.append("w.day <= ?")
+            params.append(end.isoformat())
+        where = f"WHERE {' AND '.join(clauses)}"
+        params.append(-1 if limit is None else limit)
+        rows = self.conn.execute(
+            f"""
+            SELECT t.term, SUM(d.count) AS total
+            FROM wordclouds AS w
+            JOIN wordcloud_doc_terms AS d ON d.doc_id = w.doc_id
+            JOIN wordcloud_terms AS t ON t.term_id = d.term_id
+            {where}
+            GROUP BY d.term_id
+            ORDER BY total DESC, t.term
+            LIMIT ?
+            """,
+            params,
+        )
+        return dict(rows)
 
     def get_or_create(self, text: str) -> dict[str, int]:
         """Return word-frequency counts for ``text``, generating if needed."""
-        h = self._hash_text(text)
-        cur = self.conn.cursor()
-        cur.execute("SELECT counts FROM wordclouds WHERE text_hash=?", (h,))
-        row = cur.fetchone()
+        text_hash = self._hash_text(text)
+        row = self.conn.execute(
+            "SELECT doc_id FROM wordclouds WHERE text_hash=? LIMIT 1", (text_hash,)
+        ).fetchone()
         if row:
-            return json.loads(row[0])
+            return self.document_counts(row[0])
         counts = self._compute_counts(text)
-        cur.execute(
-            "INSERT INTO wordclouds(text_hash, counts) VALUES(?, ?)",
-            (h, json.dumps(counts)),
-        )
+        self._store(text_hash, text_hash, counts, None, None, adhoc=True)
         self.conn.commit()
-        return counts
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
 
     def close(self) -> None:
         self.conn.close()
@@ -96,4 +380,23 @@ def generate_wordcloud(text: str, cache: WordCloudCache | None = None) -> TopicS
     return TopicSummary(word_counts=counts, wordcloud_html=html)
 
 
-__all__ = ["TopicSummary", "WordCloudCache", "generate_wordcloud"]
+def generate_corpus_wordcloud(
+    cache: WordCloudCache, limit: Optional[int] = 100, **filters
+) -> TopicSummary:
+    """Generate a word cloud over indexed documents.
+
+    ``filters`` are passed to :meth:`WordCloudCache.top_terms`, e.g.
+    ``contact="Alice"`` or ``start=date(2024, 5, 1), end=date(2024, 5, 31)``.
+    """
+    counts = cache.top_terms(limit, **filters)
+    return TopicSummary(
+        word_counts=counts, wordcloud_html=_build_html_from_counts(counts)
+    )
+
+
+__all__ = [
+    "TopicSummary",
+    "WordCloudCache",
+    "generate_corpus_wordcloud",
+    "generate_wordcloud",
+]